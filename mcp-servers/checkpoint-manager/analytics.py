@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Analytics
+A fixed set of aggregate reports across checkpoints, per project
+(working_directory) and branch: open todos in each branch's latest
+checkpoint, todo completion over time, the most-touched files and decision
+volume. Each report is one statement built on window functions, and every
+per-checkpoint count is answered from an index alone: a partial index over
+incomplete todos, the checkpoint_id indexes, and a covering index on
+(checkpoint_id, file_path). Results are compact tables (column names plus
+row lists). Child rows of checkpoints in cold storage are not counted.
+
+Usage:
+    analytics.py open_todos|completion|top_files|decisions [--working-directory DIR]
+        [--branch NAME] [--since YYYY-MM-DD] [--period day|week|month] [--top N]
+        [--limit N] [--format table|json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+
+PERIODS = {"day": "%Y-%m-%d", "week": "%Y-W%W", "month": "%Y-%m"}
+
+INDEXES = (
+    # Open todos per checkpoint, skipping completed rows; covers both the counts
+    # here and the open_todos tool's listing, so neither reads the table
+    "CREATE INDEX IF NOT EXISTS idx_todos_open ON todos(checkpoint_id, status, priority, title, description) "
+    "WHERE status != 'completed'",
+    # File paths per checkpoint without touching the (wide) table rows
+    "CREATE INDEX IF NOT EXISTS idx_file_modifications_checkpoint_path ON file_modifications(checkpoint_id, file_path)",
+    # Per-branch partitions, ordered by recency
+    "CREATE INDEX IF NOT EXISTS idx_checkpoints_project ON checkpoints(working_directory, git_branch, updated_at)",
+)
+
+OPEN_TODOS = """
+    WITH ranked AS (
+        SELECT id, name, working_directory, git_branch, updated_at, archived,
+            ROW_NUMBER() OVER branch_recency AS recency,
+            COUNT(*) OVER (PARTITION BY working_directory, git_branch) AS checkpoints
+        FROM checkpoints c
+        {where}
+        WINDOW branch_recency AS (PARTITION BY working_directory, git_branch ORDER BY updated_at DESC, id DESC)
+    )
+    SELECT working_directory, git_branch, checkpoints, name AS latest_checkpoint, updated_at, archived,
+        (SELECT COUNT(*) FROM todos t
+         WHERE t.checkpoint_id = ranked.id AND t.status != 'completed') AS open_todos,
+        (SELECT COUNT(*) FROM todos t
+         WHERE t.checkpoint_id = ranked.id AND t.status != 'completed' AND t.status = 'in_progress') AS in_progress
+    FROM ranked
+    WHERE recency = 1
+    ORDER BY open_todos DESC, updated_at DESC
+    LIMIT :limit
+"""
+
+COMPLETION = """
+    WITH per_checkpoint AS (
+        SELECT id, working_directory, git_branch, updated_at, strftime(:format, updated_at) AS period,
+            (SELECT COUNT(*) FROM todos t WHERE t.checkpoint_id = c.id) AS total,
+            (SELECT COUNT(*) FROM todos t WHERE t.checkpoint_id = c.id AND t.status != 'completed') AS open
+        FROM checkpoints c
+        {where}
+    ),
+    last_in_period AS (
+        SELECT *, ROW_NUMBER() OVER (
+            PARTITION BY working_directory, git_branch, period ORDER BY updated_at DESC, id DESC
+        ) AS recency
+        FROM per_checkpoint
+        WHERE total > 0
+    )
+    SELECT working_directory, git_branch, period, total AS todos, total - open AS completed,
+        ROUND(100.0 * (total - open) / total, 1) AS completion_pct,
+        ROUND(100.0 * (total - open) / total - LAG(100.0 * (total - open) / total) OVER project_periods, 1)
+            AS change_pct
+    FROM last_in_period
+    WHERE recency = 1
+    WINDOW project_periods AS (PARTITION BY working_directory, git_branch ORDER BY period)
+    ORDER BY working_directory, git_branch, period DESC
+    LIMIT :limit
+"""
+
+TOP_FILES = """
+    WITH touches AS (
+        SELECT c.working_directory, f.file_path,
+            COUNT(DISTINCT f.checkpoint_id) AS checkpoints, MAX(c.updated_at) AS last_touched
+        FROM checkpoints c JOIN file_modifications f ON f.checkpoint_id = c.id
+        {where}
+        GROUP BY c.working_directory, f.file_path
+    )
+    SELECT working_directory, file_path, checkpoints, last_touched, rank
+    FROM (
+        SELECT *, RANK() OVER (PARTITION BY working_directory ORDER BY checkpoints DESC) AS rank
+        FROM touches
+    )
+    WHERE rank <= :top
+    ORDER BY working_directory, rank, file_path
+    LIMIT :limit
+"""
+
+DECISIONS = """
+    SELECT working_directory, git_branch, period, checkpoints, decisions, distinct_titles,
+        SUM(decisions) OVER (PARTITION BY working_directory, git_branch ORDER BY period) AS running_decisions
+    FROM (
+        SELECT c.working_directory, c.git_branch, strftime(:format, c.updated_at) AS period,
+            COUNT(DISTINCT c.id) AS checkpoints, COUNT(d.id) AS decisions,
+            COUNT(DISTINCT d.title) AS distinct_titles
+        FROM checkpoints c LEFT JOIN key_decisions d ON d.checkpoint_id = c.id
+        {where}
+        GROUP BY 1, 2, 3
+    )
+    ORDER BY working_directory, git_branch, period DESC
+    LIMIT :limit
+"""
+
+# Report name: (statement, description, sort order for merging shards as (column, descending))
+REPORTS = {
+    "open_todos": (OPEN_TODOS, "Open todos in the latest checkpoint of each project and branch",
+                   [("open_todos", True), ("updated_at", True)]),
+    "completion": (COMPLETION, "Todo completion rate per period (latest checkpoint in each) with change",
+                   [("working_directory", False), ("git_branch", False), ("period", True)]),
+    "top_files": (TOP_FILES, "Files recorded in the most checkpoints, per project",
+                  [("working_directory", False), ("rank", False), ("file_path", False)]),
+    "decisions": (DECISIONS, "Key decisions per period with a running total",
+                  [("working_directory", False), ("git_branch", False), ("period", True)]),
+}
+
+
+def ensure_indexes(cursor: sqlite3.Cursor):
+    for statement in INDEXES:
+        cursor.execute(statement)
+
+
+def run_report(
+    conn: sqlite3.Connection,
+    report: str,
+    working_directory: Optional[str] = None,
+    git_branch: Optional[str] = None,
+    since: Optional[str] = None,
+    period: str = "week",
+    top: int = 10,
+    limit: int = 100,
+) -> Dict[str, Any]:
+    """
+    Run one report.
+
+    Args:
+        conn: Checkpoint database connection
+        report: One of REPORTS
+        working_directory: Only this project
+        git_branch: Only this branch
+        since: Only checkpoints updated on or after this date (YYYY-MM-DD)
+        period: Bucket for time series reports (day, week or month)
+        top: Files per project (top_files)
+        limit: Maximum rows returned
+
+    Returns:
+        Dict with the report name, columns and rows
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report '{report}' (choose from {', '.join(REPORTS)})")
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}' (choose from {', '.join(PERIODS)})")
+
+    where, params = [], {"format": PERIODS[period], "top": top, "limit": limit}
+    for clause, key, value in (("c.working_directory = :working_directory", "working_directory", working_directory),
+                               ("c.git_branch = :git_branch", "git_branch", git_branch),
+                               ("c.updated_at >= :since", "since", since)):
+        if value is not None:
+            where.append(clause)
+            params[key] = value
+    sql = REPORTS[report][0].format(where=f"WHERE {' AND '.join(where)}" if where else "")
+
+    cursor = conn.execute(sql, params)
+    return {
+        "report": report,
+        "columns": [d[0] for d in cursor.description],
+        "rows": [list(row) for row in cursor.fetchall()],
+    }
+
+
+def merge(results: List[Dict[str, Any]], limit: int = 100) -> Dict[str, Any]:
+    """
+    Combine one report's results from several databases (shards) in report
+    order. Each shard aggregates its own checkpoints only, so a project
+    spread over shards appears once per shard.
+    """
+    first = results[0]
+    columns = first["columns"]
+    rows = [row for result in results for row in result["rows"]]
+    for column, descending in reversed(REPORTS[first["report"]][2]):
+        index = columns.index(column)
+        rows.sort(key=lambda row: (row[index] is None, "" if row[index] is None else row[index]),
+                  reverse=descending)
+    return {"report": first["report"], "columns": columns, "rows": rows[:limit]}
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    lines = ["\t".join(result["columns"])]
+    lines += ["\t".join("" if value is None else str(value) for value in row) for row in result["rows"]]
+    return "\n".join(lines)
+
+
+def _databases(db_path: str, shard_dir: Optional[str]) -> List[str]:
+    if shard_dir:
+        shards = os.path.join(os.path.expanduser(shard_dir), "shards")
+        return [os.path.join(shards, f) for f in sorted(os.listdir(shards)) if f.endswith(".db")]
+    return [os.path.expanduser(db_path)]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Aggregate reports across checkpoints")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("--working-directory", help="Only this project")
+    parser.add_argument("--branch", help="Only this branch")
+    parser.add_argument("--since", help="Only checkpoints updated since (YYYY-MM-DD)")
+    parser.add_argument("--period", choices=sorted(PERIODS), default="week")
+    parser.add_argument("--top", type=int, default=10, help="Files per project (top_files)")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--format", choices=["table", "json"], default="table")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = []
+    try:
+        for path in _databases(os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH), os.getenv("CHECKPOINT_SHARD_DIR")):
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                results.append(run_report(conn, args.report, args.working_directory, args.branch,
+                                          args.since, args.period, args.top, args.limit))
+            finally:
+                conn.close()
+    except (ValueError, sqlite3.Error, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not results:
+        print("Error: No checkpoint databases found", file=sys.stderr)
+        sys.exit(1)
+
+    result = merge(results, args.limit)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(json.dumps(result, indent=2) if args.format == "json" else format_table(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Backups
+Online backups of the checkpoint database (or, when sharded, the catalog and
+every shard) through SQLite's backup API. Pages are copied a few at a time
+with a pause after each step, so a rollback-journal source is only locked for
+one short step at a time and the server keeps writing throughout; a WAL
+source is copied from one pinned read snapshot, which never blocks writers.
+Each copy is checked with PRAGMA quick_check before it replaces anything,
+and backups are kept in timestamped directories rotated down to the newest
+`keep`. Derived files
+(published snapshots, semantic vector matrices) are rebuilt from the
+database and are not copied.
+
+Usage:
+    python3 backup.py [--dest DIR] [--keep 7] [--pages 64] [--sleep 0.005] [--no-verify]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("checkpoint-manager")
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+DEFAULT_PAGES = 64
+DEFAULT_SLEEP = 0.005
+DEFAULT_KEEP = 7
+
+# In rollback-journal mode a write from another connection restarts the copy;
+# after this many restarts the rest is copied in one step instead
+MAX_RESTARTS = 5
+
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+_STAMP = re.compile(r"\d{8}-\d{6}(-\d+)?$")
+
+
+class _Restarted(Exception):
+    """Raised from the progress callback to stop an incremental copy that keeps restarting"""
+
+
+def database_files(db_path: Optional[str] = None, shard_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Databases to back up, as {path relative to the backup directory: source path}:
+    catalog.db and shards/*.db under shard_dir when given, else db_path alone,
+    each followed by its cold-storage archive (archive/<name>) if it has one.
+    """
+    if shard_dir:
+        shard_dir = os.path.expanduser(shard_dir)
+        files = {"catalog.db": os.path.join(shard_dir, "catalog.db")}
+        shards = os.path.join(shard_dir, "shards")
+        if os.path.isdir(shards):
+            for filename in sorted(os.listdir(shards)):
+                if filename.endswith(".db"):
+                    files[f"shards/{filename}"] = os.path.join(shards, filename)
+                    files[f"shards/archive/{filename}"] = os.path.join(shards, "archive", filename)
+        return {name: path for name, path in files.items() if os.path.exists(path)}
+    db_path = os.path.expanduser(db_path or DEFAULT_DB_PATH)
+    filename = os.path.basename(db_path)
+    files = {filename: db_path, f"archive/{filename}": os.path.join(os.path.dirname(db_path), "archive", filename)}
+    return {name: path for name, path in files.items() if os.path.exists(path)}
+
+
+def backup_file(source: str, dest: str, pages: int = DEFAULT_PAGES, sleep: float = DEFAULT_SLEEP,
+                verify: bool = True) -> Dict[str, Any]:
+    """
+    Copy one live database with Connection.backup, pausing sleep seconds
+    after every pages-page step. The copy is written next to dest and only
+    renamed into place once complete (and, with verify, once quick_check
+    passes); a failed check raises RuntimeError.
+    """
+    partial = f"{dest}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    progress_state = {"steps": 0, "restarts": 0, "remaining": None, "pages": 0}
+
+    def progress(status: int, remaining: int, total: int):
+        progress_state["steps"] += 1
+        progress_state["pages"] = total
+        if progress_state["remaining"] is not None and remaining > progress_state["remaining"]:
+            progress_state["restarts"] += 1
+            if progress_state["restarts"] > MAX_RESTARTS:
+                raise _Restarted()
+        progress_state["remaining"] = remaining
+        if remaining and sleep > 0:
+            time.sleep(sleep)
+
+    start = time.perf_counter()
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(partial)
+    single_step = False
+    try:
+        wal = src.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        if wal:
+            # One read snapshot for the whole copy: WAL writers never wait on it
+            # and their commits cannot restart the copy
+            src.execute("BEGIN")
+            src.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except _Restarted:
+            # Writers keep invalidating the copy; finish with one brief lock instead
+            single_step = True
+            src.backup(dst, pages=-1)
+
+        check = None
+        if verify:
+            check = [row[0] for row in dst.execute("PRAGMA quick_check")]
+            if check != ["ok"]:
+                raise RuntimeError(f"Backup of {source} failed quick_check: {'; '.join(check[:5])}")
+    except Exception:
+        src.close()
+        dst.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    if wal:
+        src.rollback()
+    src.close()
+    dst.close()
+    os.replace(partial, dest)
+
+    return {
+        "source": source,
+        "file": dest,
+        "bytes": os.path.getsize(dest),
+        "pages": progress_state["pages"],
+        "steps": progress_state["steps"] + (1 if single_step else 0),
+        "restarts": progress_state["restarts"],
+        "single_step_fallback": single_step,
+        "snapshot": wal,
+        "quick_check": "ok" if check else None,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def rotate(dest_dir: str, keep: int) -> List[str]:
+    """Delete all but the newest keep timestamped backups in dest_dir; returns what was removed"""
+    if keep <= 0 or not os.path.isdir(dest_dir):
+        return []
+    backups = sorted(
+        entry for entry in os.listdir(dest_dir)
+        if _STAMP.match(entry) and os.path.isdir(os.path.join(dest_dir, entry))
+    )
+    removed = backups[:-keep]
+    for entry in removed:
+        shutil.rmtree(os.path.join(dest_dir, entry))
+    return removed
+
+
+def run_backup(files: Dict[str, str], dest_dir: str, keep: int = DEFAULT_KEEP, pages: int = DEFAULT_PAGES,
+               sleep: float = DEFAULT_SLEEP, verify: bool = True) -> Dict[str, Any]:
+    """
+    Back up every database in files into a new timestamped directory under
+    dest_dir, then rotate. A failed copy removes the partial backup and
+    raises, so rotation never discards a good backup for a bad one.
+
+    Args:
+        files: From database_files()
+        dest_dir: Directory holding the timestamped backups
+        keep: Backups to retain (0 keeps all)
+        pages: Pages copied per step (-1 copies everything in one step)
+        sleep: Seconds to pause between steps
+        verify: Run PRAGMA quick_check on each copy
+
+    Returns:
+        Report with the backup directory, per-file results and removed backups
+    """
+    if not files:
+        raise ValueError("No database to back up")
+    dest_dir = os.path.expanduser(dest_dir)
+    stamp = datetime.now().strftime(STAMP_FORMAT)
+    target = os.path.join(dest_dir, stamp)
+    suffix = 1
+    while os.path.exists(target):
+        target = os.path.join(dest_dir, f"{stamp}-{suffix}")
+        suffix += 1
+
+    start = time.perf_counter()
+    results = []
+    try:
+        for name, source in files.items():
+            dest = os.path.join(target, name)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            results.append(backup_file(source, dest, pages, sleep, verify))
+    except (sqlite3.Error, OSError, RuntimeError) as e:
+        logger.error(f"Backup failed: {e}")
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+    removed = rotate(dest_dir, keep)
+
+    logger.info(f"Backed up {len(results)} databases to {target}")
+    return {
+        "status": "success",
+        "backup": target,
+        "files": results,
+        "bytes": sum(result["bytes"] for result in results),
+        "verified": verify,
+        "rotated_out": removed,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+class BackupScheduler:
+    """
+    Runs run_backup on a daemon thread every interval seconds.
+
+    Args:
+        db_path: Unsharded database (ignored when shard_dir is set)
+        shard_dir: Sharded layout to back up instead (catalog plus shards)
+        dest_dir: Directory holding the timestamped backups
+        interval: Seconds between scheduled backups (0 disables the thread)
+        keep, pages, sleep: As for run_backup
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str],
+        shard_dir: Optional[str] = None,
+        dest_dir: Optional[str] = None,
+        interval: float = 0.0,
+        keep: int = DEFAULT_KEEP,
+        pages: int = DEFAULT_PAGES,
+        sleep: float = DEFAULT_SLEEP,
+    ):
+        self.db_path = db_path
+        self.shard_dir = shard_dir
+        base = shard_dir or os.path.dirname(os.path.expanduser(db_path or DEFAULT_DB_PATH))
+        self.dest_dir = os.path.expanduser(dest_dir or os.path.join(base, "backups"))
+        self.interval = interval
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, db_path: Optional[str], shard_dir: Optional[str] = None) -> "BackupScheduler":
+        """Build from CHECKPOINT_BACKUP_* variables"""
+        return cls(
+            db_path,
+            shard_dir,
+            dest_dir=os.getenv("CHECKPOINT_BACKUP_DIR"),
+            interval=float(os.getenv("CHECKPOINT_BACKUP_INTERVAL", "0")),
+            keep=int(os.getenv("CHECKPOINT_BACKUP_KEEP", str(DEFAULT_KEEP))),
+            pages=int(os.getenv("CHECKPOINT_BACKUP_PAGES", str(DEFAULT_PAGES))),
+            sleep=float(os.getenv("CHECKPOINT_BACKUP_SLEEP", str(DEFAULT_SLEEP))),
+        )
+
+    def run_once(self, dest_dir: Optional[str] = None, keep: Optional[int] = None, pages: Optional[int] = None,
+                 sleep: Optional[float] = None, verify: bool = True) -> Dict[str, Any]:
+        """Take one backup now; arguments override the configured defaults"""
+        with self._run_lock:
+            report = run_backup(
+                database_files(self.db_path, self.shard_dir),
+                dest_dir or self.dest_dir,
+                self.keep if keep is None else keep,
+                self.pages if pages is None else pages,
+                self.sleep if sleep is None else sleep,
+                verify,
+            )
+            self.last_report = report
+            return report
+
+    def start(self):
+        """Start the background thread (no-op if the interval is 0)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-backup", daemon=True)
+        self._thread.start()
+        logger.info(f"Backup scheduler started (every {self.interval:.0f}s into {self.dest_dir}, keep {self.keep})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Scheduled backup failed: {e}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Online backup of the checkpoint database")
+    parser.add_argument("--dest", help="Backup directory (default: CHECKPOINT_BACKUP_DIR or <db dir>/backups)")
+    parser.add_argument("--keep", type=int, help=f"Backups to retain, 0 keeps all (default {DEFAULT_KEEP})")
+    parser.add_argument("--pages", type=int, help=f"Pages per step, -1 for one step (default {DEFAULT_PAGES})")
+    parser.add_argument("--sleep", type=float, help=f"Seconds between steps (default {DEFAULT_SLEEP})")
+    parser.add_argument("--no-verify", action="store_true", help="Skip PRAGMA quick_check on the copies")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    scheduler = BackupScheduler.from_env(
+        os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH), os.getenv("CHECKPOINT_SHARD_DIR")
+    )
+    try:
+        report = scheduler.run_once(args.dest, args.keep, args.pages, args.sleep, not args.no_verify)
+    except (ValueError, RuntimeError, sqlite3.Error, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
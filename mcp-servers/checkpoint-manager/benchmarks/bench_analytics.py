@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Analytics Benchmark
+Populates a checkpoint database with checkpoints spread over the last few
+months and times every analytics report, once with the partial and covering
+indexes from analytics.INDEXES and once with them dropped, recording the
+query plan of each so regressions to table scans show up.
+
+Usage:
+    python3 benchmarks/bench_analytics.py --population 500 --profile medium
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+from workload import PROFILES, generate_workload  # noqa: E402
+
+
+def query_plan(conn: sqlite3.Connection, report: str) -> list:
+    from analytics import PERIODS, REPORTS
+
+    sql = REPORTS[report][0].format(where="")
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", {"format": PERIODS["week"], "top": 10, "limit": 100})
+    return [row[3] for row in rows]
+
+
+def measure(manager, iterations: int) -> Dict[str, Any]:
+    """Latency, row count and plan of every report"""
+    from analytics import REPORTS
+
+    results = {}
+    with manager._connect() as conn:
+        for report in REPORTS:
+            results[report] = bench(lambda i: manager.analytics(report), iterations)
+            results[report]["rows"] = len(manager.analytics(report)["rows"])
+            results[report]["plan"] = query_plan(conn, report)
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the analytics reports with and without their indexes")
+    parser.add_argument("--profile", default="medium", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--population", type=int, default=500, help="Checkpoints in the database")
+    parser.add_argument("--days", type=int, default=90, help="Spread of updated_at over the past days")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-analytics-bench-") as work_dir:
+        from analytics import INDEXES
+        from metrics import Metrics
+        from server import CheckpointManager
+
+        manager = CheckpointManager(os.path.join(work_dir, "checkpoints.db"), metrics=Metrics(enabled=False))
+        for name, data in generate_workload(args.population, args.profile, args.seed):
+            manager.save_checkpoint(name, data)
+        with sqlite3.connect(manager.db_path) as conn:
+            conn.execute("UPDATE checkpoints SET updated_at = datetime('now', '-' || (id * 7919 % ?) || ' hours')",
+                         (args.days * 24,))
+            conn.execute("ANALYZE")
+
+        indexed = measure(manager, args.iterations)
+
+        with sqlite3.connect(manager.db_path) as conn:
+            for statement in INDEXES:
+                index = re.search(r"EXISTS (\w+)", statement).group(1)
+                conn.execute(f"DROP INDEX {index}")
+            conn.execute("ANALYZE")
+        unindexed = measure(manager, args.iterations)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "population": args.population,
+            "days": args.days,
+            "iterations": args.iterations,
+        },
+        "results": {
+            "indexed": indexed,
+            "unindexed": unindexed,
+            "speedup": {
+                name: round(unindexed[name]["median_ms"] / indexed[name]["median_ms"], 2)
+                for name in indexed
+            },
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Backup Benchmark
+Backs up a populated checkpoint database while a writer thread keeps
+updating a checkpoint at a fixed pace, as the server would between tool
+calls, once per journal mode. Compares a plain file copy (the old approach,
+unsafe while writing), a single-step Connection.backup (locks the source for
+the whole copy) and the incremental backup.py path at a few step sizes. Reports how long each
+backup took and the writer's commit latency while it ran.
+
+Usage:
+    python3 benchmarks/bench_backup.py --population 20 --profile large --write-interval 0.01
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit, summarize  # noqa: E402
+from workload import PROFILES, generate_workload  # noqa: E402
+
+
+def under_writes(manager, target: str, interval: float, fn: Callable[[], Any]) -> Dict[str, Any]:
+    """Run fn while a writer updates target every interval seconds; time both"""
+    samples = []
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            manager.update_checkpoint(target, {"summary": f"Concurrent update {i}"})
+            samples.append(time.perf_counter() - start)
+            i += 1
+            stop.wait(interval)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(interval * 5)
+    start = time.perf_counter()
+    detail = fn()
+    elapsed = time.perf_counter() - start
+    time.sleep(interval * 5)
+    stop.set()
+    thread.join()
+
+    result = {"backup_ms": round(elapsed * 1000, 1), "writer": summarize(samples)}
+    if isinstance(detail, dict):
+        result.update(detail)
+    return result
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark online backups against a busy writer")
+    parser.add_argument("--profile", default="large", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--population", type=int, default=20, help="Checkpoints in the database")
+    parser.add_argument("--write-interval", type=float, default=0.01, help="Seconds between writer updates")
+    parser.add_argument("--pages", default="16,64,256", help="Comma-separated pages-per-step values")
+    parser.add_argument("--sleep", type=float, default=0.005, help="Seconds between backup steps")
+    parser.add_argument("--journal-modes", default="delete,wal", help="Comma-separated journal modes to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="checkpoint-backup-bench-") as work_dir:
+        from backup import backup_file
+        from metrics import Metrics
+        from server import CheckpointManager
+
+        database_bytes = 0
+        for mode in args.journal_modes.split(","):
+            db_path = os.path.join(work_dir, f"checkpoints-{mode}.db")
+            manager = CheckpointManager(db_path, metrics=Metrics(enabled=False))
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(f"PRAGMA journal_mode = {mode}")
+            names = []
+            for name, data in generate_workload(args.population, args.profile, args.seed):
+                manager.save_checkpoint(name, data)
+                names.append(name)
+            target = names[0]
+
+            def dest(label: str) -> str:
+                return os.path.join(work_dir, f"{mode}-{label}.db")
+
+            def single_step():
+                src, dst = sqlite3.connect(db_path), sqlite3.connect(dest("single"))
+                src.backup(dst)
+                src.close()
+                dst.close()
+
+            results[f"{mode}.idle"] = under_writes(manager, target, args.write_interval, lambda: time.sleep(0.5))
+            results[f"{mode}.file_copy"] = under_writes(
+                manager, target, args.write_interval, lambda: shutil.copyfile(db_path, dest("copy"))
+            )
+            results[f"{mode}.backup.single_step"] = under_writes(manager, target, args.write_interval, single_step)
+            for pages in [int(value) for value in args.pages.split(",")]:
+                result = under_writes(
+                    manager, target, args.write_interval,
+                    lambda: backup_file(db_path, dest(f"pages{pages}"), pages, args.sleep)
+                )
+                for key in ("source", "file"):
+                    result.pop(key)
+                results[f"{mode}.backup.pages_{pages}"] = result
+            database_bytes = os.path.getsize(db_path)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "population": args.population,
+            "database_bytes": database_bytes,
+            "write_interval_s": args.write_interval,
+            "sleep_s": args.sleep,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
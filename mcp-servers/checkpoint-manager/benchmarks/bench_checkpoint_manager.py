@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Manager Benchmark Suite
+Times every CheckpointManager method and the three CLI scripts against a
+synthetic workload in a throwaway database, and writes machine-readable
+results that can be compared across commits.
+
+Usage:
+    python3 benchmarks/bench_checkpoint_manager.py --profile medium --output results.json
+    python3 benchmarks/bench_checkpoint_manager.py --compare baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from workload import PROFILES, generate_checkpoint, generate_workload  # noqa: E402
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Reduce raw timings (seconds) to summary statistics in milliseconds"""
+    ordered = sorted(samples)
+    p95_index = max(0, int(round(0.95 * len(ordered))) - 1)
+    return {
+        "iterations": len(ordered),
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def bench(fn: Callable[[int], Any], iterations: int, setup: Optional[Callable[[int], Any]] = None) -> Dict[str, Any]:
+    """
+    Time fn(i) for each iteration; setup(i), if given, runs untimed first.
+
+    Returns:
+        Summary statistics for the timed calls
+    """
+    samples = []
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run_script(script: str, db_path: str, args: List[str] = None, stdin: str = None):
+    """Run one of the CLI scripts against db_path and fail loudly on error"""
+    env = dict(os.environ, CHECKPOINT_DB_PATH=db_path)
+    result = subprocess.run(
+        [sys.executable, os.path.join(SERVER_DIR, script)] + (args or []),
+        input=stdin,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} exited with {result.returncode}: {result.stderr.strip()}")
+
+
+def bench_manager(
+    work_dir: str, profile: str, population: int, iterations: int, seed: int, with_metrics: bool = False
+) -> Dict[str, Any]:
+    """Benchmark every CheckpointManager method"""
+    from metrics import Metrics
+    from server import CheckpointManager
+
+    manager = CheckpointManager(os.path.join(work_dir, "manager.db"), metrics=Metrics(enabled=with_metrics))
+    sizes = PROFILES[profile]
+    results = {}
+
+    # Background population so list/resume see a realistic table size
+    for name, data in generate_workload(population, profile, seed):
+        manager.save_checkpoint(name, data)
+
+    target = f"bench-{profile}-00000"
+    fresh = [generate_checkpoint(f"fresh-{i}", seed=seed, **sizes) for i in range(iterations)]
+
+    results["manager.save_checkpoint.create"] = bench(
+        lambda i: manager.save_checkpoint(fresh[i]["name"], fresh[i]), iterations
+    )
+    results["manager.save_checkpoint.update"] = bench(
+        lambda i: manager.save_checkpoint(target, fresh[i]), iterations
+    )
+    results["manager.resume_checkpoint"] = bench(
+        lambda i: manager.resume_checkpoint(target), iterations
+    )
+    results["manager.list_checkpoints"] = bench(
+        lambda i: manager.list_checkpoints(), iterations
+    )
+    results["manager.update_checkpoint"] = bench(
+        lambda i: manager.update_checkpoint(target, {"summary": f"Updated summary {i}"}), iterations
+    )
+    results["manager.delete_checkpoint"] = bench(
+        lambda i: manager.delete_checkpoint(fresh[i]["name"]), iterations
+    )
+    return results
+
+
+def bench_cli(work_dir: str, profile: str, population: int, iterations: int, seed: int) -> Dict[str, Any]:
+    """Benchmark the save/resume/list CLI scripts (includes interpreter startup)"""
+    db_path = os.path.join(work_dir, "cli.db")
+    sizes = PROFILES[profile]
+    results = {}
+
+    for name, data in generate_workload(population, profile, seed):
+        run_script("save_checkpoint.py", db_path, stdin=json.dumps(data))
+
+    target = f"bench-{profile}-00000"
+    payloads = [json.dumps(generate_checkpoint(target, seed=seed + i + 1, **sizes)) for i in range(iterations)]
+
+    results["cli.save_checkpoint"] = bench(
+        lambda i: run_script("save_checkpoint.py", db_path, stdin=payloads[i]), iterations
+    )
+    results["cli.resume_checkpoint"] = bench(
+        lambda i: run_script("resume_checkpoint.py", db_path, args=[target]), iterations
+    )
+    results["cli.list_checkpoints"] = bench(
+        lambda i: run_script("list_checkpoints.py", db_path), iterations
+    )
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, if running inside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print median timings side by side with a baseline results file"""
+    print(f"{'case':<36} {'baseline ms':>12} {'current ms':>12} {'ratio':>8}")
+    for case, stats in current["results"].items():
+        old = baseline.get("results", {}).get(case)
+        if not old:
+            print(f"{case:<36} {'-':>12} {stats['median_ms']:>12.2f} {'new':>8}")
+            continue
+        ratio = stats["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        print(f"{case:<36} {old['median_ms']:>12.2f} {stats['median_ms']:>12.2f} {ratio:>7.2f}x")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the checkpoint manager")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium")
+    parser.add_argument("--population", type=int, default=50, help="Checkpoints preloaded before timing")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-cli", action="store_true", help="Skip the subprocess CLI benchmarks")
+    parser.add_argument("--metrics", action="store_true", help="Run the manager with statement instrumentation on")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON results file to compare against")
+    args = parser.parse_args()
+
+    # Keep per-call INFO logging out of the timings
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-bench-") as work_dir:
+        # server.py opens its default database at import time; keep it in the sandbox
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "default.db")
+
+        results = bench_manager(
+            work_dir, args.profile, args.population, args.iterations, args.seed, with_metrics=args.metrics
+        )
+        if not args.skip_cli:
+            results.update(bench_cli(work_dir, args.profile, args.population, args.iterations, args.seed))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "population": args.population,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "metrics": args.metrics,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
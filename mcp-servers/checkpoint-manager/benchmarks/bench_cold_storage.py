@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cold Storage Benchmark
+Populates a checkpoint database, ages most checkpoints past the tiering
+threshold and moves them to cold storage, measuring the hot database's size
+and the latency of listing, search, a full-table todo scan and resuming a
+hot checkpoint before and after. Also times the archive pass itself and the
+first resume of an archived checkpoint (which rehydrates it) against a
+second resume of the same checkpoint.
+
+Usage:
+    python3 benchmarks/bench_cold_storage.py --population 200 --profile medium --cold-fraction 0.8
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit, summarize  # noqa: E402
+from workload import PROFILES, generate_workload  # noqa: E402
+
+
+def measure(manager, hot_name: str, iterations: int) -> Dict[str, Any]:
+    """Hot database size and latency of the everyday read paths"""
+    def scan(i):
+        with manager._connect() as conn:
+            conn.execute("SELECT COUNT(*) FROM todos WHERE status != 'completed'").fetchone()
+
+    return {
+        "hot_bytes": os.path.getsize(manager.db_path),
+        "list": bench(lambda i: manager.list_checkpoints(), iterations),
+        "search": bench(lambda i: manager.search_checkpoints("checkpoint"), iterations),
+        "todo_scan": bench(scan, iterations),
+        "resume_hot": bench(lambda i: manager.resume_checkpoint(hot_name), iterations),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark tiering old checkpoints to cold storage")
+    parser.add_argument("--profile", default="medium", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--population", type=int, default=200, help="Checkpoints in the database")
+    parser.add_argument("--cold-fraction", type=float, default=0.8, help="Share of checkpoints aged past the threshold")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed calls per read path")
+    parser.add_argument("--rehydrations", type=int, default=10, help="Archived checkpoints resumed afterwards")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-cold-bench-") as work_dir:
+        from cold_storage import archive_path
+        from metrics import Metrics
+        from server import CheckpointManager
+
+        manager = CheckpointManager(os.path.join(work_dir, "checkpoints.db"), metrics=Metrics(enabled=False))
+        names = []
+        for name, data in generate_workload(args.population, args.profile, args.seed):
+            manager.save_checkpoint(name, data)
+            names.append(name)
+        cold = names[:int(len(names) * args.cold_fraction)]
+        hot_name = names[-1]
+        with sqlite3.connect(manager.db_path) as conn:
+            conn.executemany(
+                "UPDATE checkpoints SET updated_at = datetime('now', '-30 days') WHERE name = ?",
+                [(name,) for name in cold]
+            )
+        manager.compact()
+
+        before = measure(manager, hot_name, args.iterations)
+
+        start = time.perf_counter()
+        archived = rows = raw_bytes = stored_bytes = 0
+        while True:
+            result = manager.archive_checkpoints(7, batch_size=50)
+            archived += len(result["archived"])
+            rows += result["rows"]
+            raw_bytes += result["raw_bytes"]
+            stored_bytes += result["stored_bytes"]
+            if len(result["archived"]) < 50:
+                break
+        archive_ms = (time.perf_counter() - start) * 1000
+        compaction = manager.compact()
+
+        after = measure(manager, hot_name, args.iterations)
+        after["archive_bytes"] = os.path.getsize(archive_path(manager.db_path))
+
+        first, second = [], []
+        for name in cold[:args.rehydrations]:
+            start = time.perf_counter()
+            manager.resume_checkpoint(name)
+            first.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            manager.resume_checkpoint(name)
+            second.append(time.perf_counter() - start)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "population": args.population,
+            "cold_fraction": args.cold_fraction,
+            "iterations": args.iterations,
+        },
+        "results": {
+            "before": before,
+            "archive_pass": {
+                "archived": archived,
+                "rows": rows,
+                "raw_bytes": raw_bytes,
+                "stored_bytes": stored_bytes,
+                "elapsed_ms": round(archive_ms, 1),
+                "reclaimed_bytes": compaction["reclaimed_bytes"],
+            },
+            "after": after,
+            "resume_archived_first": summarize(first),
+            "resume_archived_second": summarize(second),
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
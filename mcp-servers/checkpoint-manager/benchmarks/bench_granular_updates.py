@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Granular Update Benchmark
+Changes one todo's status on a generated checkpoint three ways through the
+MCP dispatcher: a full save_checkpoint re-sending every row (the only option
+before the granular tools), update_todo by id and update_todo by title. For
+each, reports the bytes of the tool arguments an agent has to send and the
+latency of the call, plus a batch_update_checkpoint carrying several edits.
+
+Usage:
+    python3 benchmarks/bench_granular_updates.py --profile large --iterations 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+from workload import PROFILES, generate_checkpoint  # noqa: E402
+
+STATUSES = ("pending", "in_progress", "completed")
+
+
+def payload_bytes(arguments: Dict[str, Any]) -> int:
+    """Size of the tool arguments as JSON, roughly what crosses stdio"""
+    return len(json.dumps(arguments).encode("utf-8"))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark one-todo updates: full save vs granular tools")
+    parser.add_argument("--profile", default="large", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per variant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-granular-bench-") as work_dir:
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "checkpoints.db")
+        os.environ["CHECKPOINT_USAGE_DB_PATH"] = os.path.join(work_dir, "usage.db")
+        os.environ.pop("CHECKPOINT_SHARD_DIR", None)
+        import server
+
+        logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+        data = generate_checkpoint("granular", args.seed, **PROFILES[args.profile])
+        name = data.pop("name")
+        server.checkpoint_manager.save_checkpoint(name, data)
+
+        todos = server.checkpoint_manager.resume_checkpoint(name)["checkpoint_data"]["todos"]
+        titles = [todo["title"] for todo in todos]
+        index = next(i for i, title in enumerate(titles) if titles.count(title) == 1)
+        conn = sqlite3.connect(os.environ["CHECKPOINT_DB_PATH"])
+        todo_id = conn.execute(
+            "SELECT t.id FROM todos t JOIN checkpoints c ON c.id = t.checkpoint_id WHERE c.name = ? AND t.title = ?",
+            (name, titles[index]),
+        ).fetchone()[0]
+        conn.close()
+
+        def status(i: int) -> str:
+            return STATUSES[i % len(STATUSES)]
+
+        def full_arguments(i: int) -> Dict[str, Any]:
+            data["todos"][index]["status"] = status(i)
+            return {"name": name, "data": data}
+
+        # full_save runs last: rewriting the todos gives them new ids
+        variants = {
+            "update_todo_by_id": ("update_todo", lambda i: {"name": name, "id": todo_id,
+                                                            "fields": {"status": status(i)}}),
+            "update_todo_by_key": ("update_todo", lambda i: {"name": name, "key": titles[index],
+                                                             "fields": {"status": status(i)}}),
+            "batch_update": ("batch_update_checkpoint", lambda i: {"name": name, "operations": [
+                {"op": "update_todo", "id": todo_id, "fields": {"status": status(i)}},
+                {"op": "add_todo", "item": {"title": f"follow-up {i}", "priority": "high"}},
+                {"op": "update_checkpoint", "updates": {"current_goal": f"step {i}"}},
+            ]}),
+            "full_save": ("save_checkpoint", full_arguments),
+        }
+
+        results = {}
+        for label, (tool, arguments) in variants.items():
+            result = bench(lambda i: server.dispatch_tool(tool, arguments(i)), args.iterations)
+            result["payload_bytes"] = payload_bytes(arguments(0))
+            results[label] = result
+
+        baseline = results["full_save"]
+        for label, result in results.items():
+            result["payload_ratio"] = round(baseline["payload_bytes"] / result["payload_bytes"], 1)
+            result["speedup"] = round(baseline["median_ms"] / result["median_ms"], 1)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Resume Memory Benchmark
+Measures peak traced allocations (tracemalloc) and time for resuming a
+checkpoint with many child rows: the original approach (fetchall, one dict
+per row, one yaml.dump of the whole document) against the column-oriented
+ChildRows path used by CheckpointManager. Also checks both produce the same
+YAML.
+
+Usage:
+    python3 benchmarks/bench_memory.py --files 50000 --todos 5000
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit  # noqa: E402
+from workload import generate_checkpoint  # noqa: E402
+
+CHECKPOINT_NAME = "memory-target"
+
+
+def legacy_load(db_path: str, name: str) -> Dict[str, Any]:
+    """The dict-per-row load as originally implemented, kept as the baseline"""
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM checkpoints WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        data = {key: row[key] for key in (
+            "name", "summary", "current_goal", "working_directory", "git_branch",
+            "git_status", "git_head", "created_at", "updated_at",
+        )}
+        for table, columns in (
+            ("todos", "title, description, status, priority"),
+            ("file_modifications", "file_path, status, description"),
+            ("key_decisions", "title, rationale, impact"),
+            ("artifacts", "name, artifact_type, path, description"),
+        ):
+            cursor.execute(
+                f"SELECT {columns} FROM {table} WHERE checkpoint_id = ? ORDER BY created_at", (row["id"],)
+            )
+            data[table] = [dict(r) for r in cursor.fetchall()]
+        return data
+
+
+def legacy_resume(db_path: str, name: str) -> str:
+    """Baseline resume: dict rows, then one yaml.dump of the whole document"""
+    return yaml.dump(legacy_load(db_path, name), default_flow_style=False, sort_keys=False)
+
+
+def measure(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """Peak and retained traced memory (MB) plus wall time of one call"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_mb": peak / 1e6,
+        "retained_mb": current / 1e6,
+        "seconds": elapsed,
+        "result": result,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark resume memory: dict rows vs column-oriented rows")
+    parser.add_argument("--files", type=int, default=50000, help="File modifications in the checkpoint")
+    parser.add_argument("--todos", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-memory-bench-") as work_dir:
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "default.db")
+        from server import CheckpointManager
+
+        db_path = os.path.join(work_dir, "memory.db")
+        manager = CheckpointManager(db_path)
+        manager.save_checkpoint(CHECKPOINT_NAME, generate_checkpoint(
+            CHECKPOINT_NAME, seed=args.seed, todos=args.todos, files=args.files, decisions=50, artifacts=5,
+        ))
+
+        cases = {
+            "resume.dict_rows": lambda: legacy_resume(db_path, CHECKPOINT_NAME),
+            "resume.column_rows": lambda: manager.resume_text(CHECKPOINT_NAME),
+            "load.dict_rows": lambda: legacy_load(db_path, CHECKPOINT_NAME),
+            "load.column_rows": lambda: manager._load_checkpoint(CHECKPOINT_NAME),
+        }
+        results = {}
+        outputs = {}
+        for case, fn in cases.items():
+            # retained_mb of a load.* case is what holding the loaded rows costs
+            results[case] = measure(fn)
+            outputs[case] = results[case].pop("result")
+
+        if outputs["resume.dict_rows"] != outputs["resume.column_rows"]:
+            raise SystemExit("Column-oriented resume produced different YAML than the baseline")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "files": args.files,
+            "todos": args.todos,
+            "yaml_bytes": len(outputs["resume.column_rows"]),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
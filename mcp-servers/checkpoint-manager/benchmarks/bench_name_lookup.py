@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Name Lookup Benchmark
+Fills a checkpoint database with many names and measures what a mistyped
+name costs: suggestions from the trigram index, the same suggestions by
+comparing every name (no index), and the full checkpoint listing the CLI
+used to print on a miss. Also times resolving unique prefixes, and reports
+how often the intended name is among the suggestions for names with one
+character deleted, swapped or replaced.
+
+Usage:
+    python3 benchmarks/bench_name_lookup.py --population 5000 --typos 200
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+from workload import BRANCHES, MODULES, WORDS  # noqa: E402
+
+
+def make_names(count: int, rng: random.Random):
+    names = set()
+    while len(names) < count:
+        branch = rng.choice(BRANCHES).split("/")[-1]
+        names.add(f"{rng.choice(MODULES)}-{rng.choice(WORDS)}-{branch}-{rng.randint(1, 999)}")
+    return sorted(names)
+
+
+def typo(name: str, rng: random.Random) -> str:
+    """Delete, swap or replace one character"""
+    i = rng.randrange(len(name) - 1)
+    kind = rng.choice(["delete", "swap", "replace"])
+    if kind == "delete":
+        return name[:i] + name[i + 1:]
+    if kind == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def resolve_prefix(conn, prefix: str):
+    """Resolve a prefix; ambiguous ones (an error for the caller) still cost the lookup"""
+    import name_index
+
+    try:
+        return name_index.resolve(conn, prefix)
+    except ValueError:
+        return None
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy checkpoint name lookup")
+    parser.add_argument("--population", type=int, default=5000, help="Checkpoint names in the database")
+    parser.add_argument("--typos", type=int, default=200, help="Mistyped names looked up")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-names-bench-") as work_dir:
+        import name_index
+        from metrics import Metrics
+        from server import CheckpointManager
+
+        manager = CheckpointManager(os.path.join(work_dir, "checkpoints.db"), metrics=Metrics(enabled=False))
+        names = make_names(args.population, rng)
+        with sqlite3.connect(manager.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO checkpoints (name, summary, working_directory) VALUES (?, ?, ?)",
+                [(name, f"Checkpoint {name}", f"/home/dev/projects/{name.split('-')[0]}") for name in names]
+            )
+        intended = rng.sample(names, args.typos)
+        queries = [typo(name, rng) for name in intended]
+        prefixes = [name[:len(name) - 2] for name in intended]
+
+        def recall(conn):
+            hits = sum(
+                name in name_index.suggest(conn, query)
+                for name, query in zip(intended, queries)
+                if query not in names
+            )
+            return round(hits / len(intended), 3)
+
+        conn = sqlite3.connect(manager.db_path)
+        results = {
+            "suggest_indexed": bench(lambda i: name_index.suggest(conn, queries[i % len(queries)]), args.typos),
+            "recall_indexed": recall(conn),
+            "resolve_prefix": bench(lambda i: resolve_prefix(conn, prefixes[i % len(prefixes)]), args.typos),
+            "list_all": bench(lambda i: manager.list_checkpoints(), 10),
+        }
+        # Without the index every name is compared
+        conn.execute("DROP TABLE checkpoints_names")
+        results["suggest_scan"] = bench(lambda i: name_index.suggest(conn, queries[i % len(queries)]), 20)
+        results["recall_scan"] = recall(conn)
+        conn.close()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "population": args.population,
+            "typos": args.typos,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
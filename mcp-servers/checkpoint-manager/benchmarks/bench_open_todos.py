@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Open Todos Benchmark
+Builds a store of several projects, each with a history of checkpoints that
+carry most of their todos over from the previous one (some finished along the
+way), and compares two ways of collecting a project's open todos: the
+open_todos query against listing the project's checkpoints and resuming each
+one. Also times paging through a large project and a query across every
+project.
+
+Usage:
+    python3 benchmarks/bench_open_todos.py --projects 20 --history 50 --profile small
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+from workload import PROFILES, generate_checkpoint  # noqa: E402
+
+
+def populate(manager, projects: int, history: int, profile: str, seed: int):
+    """Save history checkpoints per project, carrying todos forward"""
+    rng = random.Random(seed)
+    for p in range(projects):
+        todos = []
+        for h in range(history):
+            name = f"project-{p:03d}-{h:04d}"
+            data = generate_checkpoint(name, seed + p * history + h, **PROFILES[profile])
+            data["working_directory"] = f"/home/dev/projects/project-{p:03d}"
+            for todo in todos:
+                if todo["status"] != "completed" and rng.random() < 0.1:
+                    todo["status"] = "completed"
+            # Carry earlier todos over, as agents re-save their running list
+            todos = (todos + data["todos"][:2])[-40:]
+            data["todos"] = [dict(todo) for todo in todos]
+            manager.save_checkpoint(name, data)
+
+
+def resume_each(manager, working_directory: str) -> int:
+    """Baseline: resume every checkpoint of the project and deduplicate"""
+    seen = {}
+    for checkpoint in manager.list_checkpoints(working_directory)["checkpoints"]:
+        data = manager.resume_checkpoint(checkpoint["name"])["checkpoint_data"]
+        for todo in data["todos"]:
+            seen.setdefault((todo["title"], todo.get("description")), todo["status"])
+    return sum(1 for status in seen.values() if status != "completed")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark collecting open todos across checkpoints")
+    parser.add_argument("--profile", default="small", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--projects", type=int, default=20, help="Working directories")
+    parser.add_argument("--history", type=int, default=50, help="Checkpoints per project")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-todos-bench-") as work_dir:
+        from metrics import Metrics
+        from server import CheckpointManager
+
+        manager = CheckpointManager(os.path.join(work_dir, "checkpoints.db"), metrics=Metrics(enabled=False))
+        populate(manager, args.projects, args.history, args.profile, args.seed)
+        with sqlite3.connect(manager.db_path) as conn:
+            # One save per minute, so recency never ties
+            conn.execute("""
+                UPDATE checkpoints
+                SET updated_at = datetime('now', (id - (SELECT MAX(id) FROM checkpoints)) || ' minutes')
+            """)
+        manager.compact()
+        project = "/home/dev/projects/project-000"
+
+        first = manager.open_todos(project, limit=1000)
+        results = {
+            "open_todos": bench(lambda i: manager.open_todos(project), args.iterations),
+            "resume_each": bench(lambda i: resume_each(manager, project), max(1, args.iterations // 10)),
+            "all_projects_first_page": bench(lambda i: manager.open_todos(), args.iterations),
+            "page_by_10": bench(lambda i: manager.open_todos(project, limit=10, offset=10 * (i % 4)), args.iterations),
+            "distinct_open": first["total"],
+            "resume_each_open": resume_each(manager, project),
+            "todo_rows": sum(t["occurrences"] for t in first["todos"]),
+        }
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "projects": args.projects,
+            "history": args.history,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
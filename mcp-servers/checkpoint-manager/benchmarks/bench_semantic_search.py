@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Semantic Search Benchmark
+Fills a throwaway database with enough checkpoints to produce the requested
+number of vectors, then times the full index build, top-k queries through
+CheckpointManager.semantic_search_checkpoints, the bare matrix product, and
+an incremental save with the index enabled.
+
+Usage:
+    python3 benchmarks/bench_semantic_search.py --vectors 100000 --output semantic.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+from workload import generate_checkpoint  # noqa: E402
+
+# summary + goal + decisions per checkpoint
+DECISIONS_PER_CHECKPOINT = 18
+ITEMS_PER_CHECKPOINT = DECISIONS_PER_CHECKPOINT + 2
+
+QUERIES = [
+    "where did we decide to cache tokens",
+    "retry timeout handling for the stream worker",
+    "schema migration for the session database",
+    "latency of the resume query",
+    "prompt review for the agent model",
+]
+
+
+def populate(manager, count: int, seed: int):
+    """Insert checkpoints directly with SQL (saving them one by one would dominate the run)"""
+    with manager._connect() as conn:
+        for i in range(count):
+            data = generate_checkpoint(
+                f"semantic-{i:06d}", seed=seed, todos=0, files=0,
+                decisions=DECISIONS_PER_CHECKPOINT, artifacts=0,
+            )
+            cursor = conn.execute(
+                "INSERT INTO checkpoints (name, summary, current_goal, working_directory, git_branch) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (data["name"], data["summary"], data["current_goal"], data["working_directory"], data["git_branch"]),
+            )
+            conn.executemany(
+                "INSERT INTO key_decisions (checkpoint_id, title, rationale, impact) VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, d["title"], d["rationale"], d["impact"]) for d in data["key_decisions"]],
+            )
+        conn.commit()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark semantic checkpoint search")
+    parser.add_argument("--vectors", type=int, default=100000, help="Approximate number of indexed items")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10, help="k for top-k queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    checkpoints = max(1, args.vectors // ITEMS_PER_CHECKPOINT)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-semantic-bench-") as work_dir:
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "default.db")
+        from server import CheckpointManager
+
+        manager = CheckpointManager(os.path.join(work_dir, "semantic.db"))
+        populate(manager, checkpoints, args.seed)
+
+        start = time.perf_counter()
+        with manager._connect() as conn:
+            vectors = manager.semantic.rebuild(conn)
+        build_seconds = time.perf_counter() - start
+
+        results = {
+            "semantic.build": {
+                "vectors": vectors,
+                "seconds": build_seconds,
+                "vectors_per_second": vectors / build_seconds,
+                "index_bytes": os.path.getsize(manager.semantic.vectors_path),
+            }
+        }
+
+        results["semantic.search"] = bench(
+            lambda i: manager.semantic_search_checkpoints(QUERIES[i % len(QUERIES)], limit=args.limit),
+            args.iterations,
+        )
+
+        # The bare scoring step: one matrix-vector product over every row
+        matrix = manager.semantic._open()[:vectors]
+        query_vectors = manager.semantic.embedder.embed(QUERIES)
+        results["semantic.matmul"] = bench(
+            lambda i: matrix @ query_vectors[i % len(QUERIES)], args.iterations
+        )
+
+        fresh = [
+            generate_checkpoint(f"fresh-{i}", seed=args.seed, decisions=DECISIONS_PER_CHECKPOINT)
+            for i in range(args.iterations)
+        ]
+        results["semantic.save_with_index"] = bench(
+            lambda i: manager.save_checkpoint(fresh[i]["name"], fresh[i]), args.iterations
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "vectors": vectors,
+            "checkpoints": checkpoints,
+            "dim": manager.semantic.embedder.dim,
+            "embedder": manager.semantic.embedder.name,
+            "iterations": args.iterations,
+            "limit": args.limit,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Snapshot Fan-out Benchmark
+Simulates many sub-agents resuming the same checkpoint at once. Each reader
+is a separate process; all start together on a barrier and resume the
+checkpoint repeatedly, either through CheckpointManager.resume_checkpoint
+(SQLite + YAML rendering) or from the published memory-mapped snapshot
+(whole document, or just the todos section).
+
+Usage:
+    python3 benchmarks/bench_snapshot.py --readers 64 --reads 20 --profile medium
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit, summarize  # noqa: E402
+from workload import PROFILES, generate_checkpoint  # noqa: E402
+
+CHECKPOINT_NAME = "fanout-target"
+MODES = ["sqlite", "snapshot", "snapshot-todos"]
+
+
+def reader(mode: str, db_path: str, snapshot_file: str, reads: int, barrier, results):
+    """One simulated sub-agent: open its source, wait for the others, then time each resume"""
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    if mode == "sqlite":
+        from server import CheckpointManager
+
+        manager = CheckpointManager(db_path)
+
+        def resume():
+            return manager.resume_checkpoint(CHECKPOINT_NAME)["checkpoint_yaml"]
+    else:
+        from snapshot import SnapshotReader
+
+        snapshot = SnapshotReader(snapshot_file)
+        sections = ["todos"] if mode == "snapshot-todos" else None
+
+        def resume():
+            return snapshot.text(sections)
+
+    barrier.wait()
+    samples = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        resume()
+        samples.append(time.perf_counter() - start)
+    results.put(samples)
+
+
+def run_mode(mode: str, db_path: str, snapshot_file: str, readers: int, reads: int) -> Dict[str, Any]:
+    """Run all readers for one mode and collect per-read and wall-clock timings"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(readers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=reader, args=(mode, db_path, snapshot_file, reads, barrier, results))
+        for _ in range(readers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Readers finish their setup (imports, connections, mmap) before the clock starts
+    barrier.wait()
+    start = time.perf_counter()
+    samples = []
+    for _ in processes:
+        samples.extend(results.get())
+    wall = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    return dict(summarize(samples), wall_seconds=wall, reads_per_second=len(samples) / wall)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent resume from SQLite vs snapshot")
+    parser.add_argument("--readers", type=int, default=64, help="Concurrent reader processes")
+    parser.add_argument("--reads", type=int, default=20, help="Resumes per reader")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-snapshot-bench-") as work_dir:
+        # Inherited by the spawned readers, so importing server stays in the sandbox
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "default.db")
+        from server import CheckpointManager
+
+        db_path = os.path.join(work_dir, "fanout.db")
+        manager = CheckpointManager(db_path)
+        manager.save_checkpoint(
+            CHECKPOINT_NAME, generate_checkpoint(CHECKPOINT_NAME, seed=args.seed, **PROFILES[args.profile])
+        )
+        published = manager.publish_snapshot(CHECKPOINT_NAME)
+
+        results = {
+            f"resume.{mode}": run_mode(mode, db_path, published["path"], args.readers, args.reads)
+            for mode in MODES
+        }
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "profile": args.profile,
+            "readers": args.readers,
+            "reads": args.reads,
+            "snapshot_bytes": published["bytes"],
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
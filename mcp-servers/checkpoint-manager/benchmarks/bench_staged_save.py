@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Staged Save Benchmark
+Saves a generated checkpoint through the MCP dispatcher in one
+save_checkpoint call and as a staged session (begin, one append per chunk,
+commit). Each tool call is decoded from its JSON message and dispatched with
+tracemalloc running, so the report gives the largest message a client has to
+send, the peak memory the server needs for any single call, and total wall
+time, for increasing numbers of todos.
+
+Usage:
+    python3 benchmarks/bench_staged_save.py --todos 1000,10000,50000 --chunk-rows 1000
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit  # noqa: E402
+from workload import PROFILES, generate_checkpoint  # noqa: E402
+
+
+def run_calls(server, calls: Iterable[Tuple[str, Dict[str, Any]]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dispatch (tool, arguments) pairs as the server receives them, appending each result to results"""
+    largest = peak = count = 0
+    start = time.perf_counter()
+    for tool, arguments in calls:
+        message = json.dumps(arguments)
+        largest = max(largest, len(message.encode("utf-8")))
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        results.append(json.loads(server.dispatch_tool(tool, json.loads(message))[0].text))
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        count += 1
+    return {
+        "calls": count,
+        "largest_message_bytes": largest,
+        "peak_call_memory_bytes": peak,
+        "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def staged_calls(name: str, data: Dict[str, Any], sections, chunk_rows: int, results: List[Dict[str, Any]]):
+    """begin, one append per chunk, commit; lazily, since appends need the id begin returns"""
+    yield "begin_checkpoint_save", {
+        "name": name, "data": {key: value for key, value in data.items() if key not in sections}
+    }
+    session_id = results[-1]["session_id"]
+    for section in sections:
+        rows = data.get(section, [])
+        for i in range(0, len(rows), chunk_rows):
+            yield "append_checkpoint_save", {"session_id": session_id, "section": section,
+                                             "rows": rows[i:i + chunk_rows]}
+    yield "commit_checkpoint_save", {"session_id": session_id}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark one-shot vs staged checkpoint saves")
+    parser.add_argument("--profile", default="large", choices=sorted(PROFILES),
+                        help="Shape of everything but the todos")
+    parser.add_argument("--todos", default="1000,10000,50000", help="Comma-separated todo counts")
+    parser.add_argument("--chunk-rows", type=int, default=1000, help="Rows per append call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="checkpoint-staged-bench-") as work_dir:
+        os.environ["CHECKPOINT_DB_PATH"] = os.path.join(work_dir, "checkpoints.db")
+        os.environ["CHECKPOINT_USAGE_DB_PATH"] = os.path.join(work_dir, "usage.db")
+        os.environ.pop("CHECKPOINT_SHARD_DIR", None)
+        import server
+
+        logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+        tracemalloc.start()
+        for count in [int(value) for value in args.todos.split(",")]:
+            data = generate_checkpoint(f"staged-{count}", args.seed, **dict(PROFILES[args.profile], todos=count))
+            name = data.pop("name")
+            calls: List[Dict[str, Any]] = []
+            one_shot = run_calls(server, [("save_checkpoint", {"name": f"{name}-full", "data": data})], calls)
+            staged = run_calls(server, staged_calls(name, data, server.CHILD_TABLES, args.chunk_rows, calls), calls)
+
+            results[f"todos_{count}"] = {
+                "save_checkpoint": one_shot,
+                "staged": staged,
+                "message_ratio": round(one_shot["largest_message_bytes"] / staged["largest_message_bytes"], 1),
+                "memory_ratio": round(one_shot["peak_call_memory_bytes"] / staged["peak_call_memory_bytes"], 1),
+            }
+        tracemalloc.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "chunk_rows": args.chunk_rows,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Summary Pipeline Benchmark
+Summarises a generated source tree against the stub LM server with injected
+per-request latency, first one file and one request at a time through
+Summarizer (the lm-read-file.sh flow, plus chunking), then through
+SummaryPipeline at increasing concurrency. Every run ignores the cache, so
+each one issues the same number of requests; the report gives wall time,
+requests/s, files/s, speedup over sequential and the number of TCP
+connections the stub accepted (keep-alive reuse).
+
+Usage:
+    python3 benchmarks/bench_summary_pipeline.py --files 24 --latency 0.2 --concurrency 1,2,4,8,16
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit  # noqa: E402
+from lm_stub_server import serve  # noqa: E402
+
+WORDS = "cache token resume schema latency worker stream retry session agent prompt index".split()
+
+
+def generate_tree(root: str, files: int, file_chars: int, seed: int):
+    """Python modules and Markdown notes of roughly file_chars each, all distinct"""
+    rng = random.Random(seed)
+    for i in range(files):
+        package = os.path.join(root, f"pkg{i % 4}")
+        os.makedirs(package, exist_ok=True)
+        if i % 3 == 2:
+            parts = []
+            while sum(map(len, parts)) < file_chars:
+                parts.append(f"## {rng.choice(WORDS).title()} {len(parts)}\n\n"
+                             + " ".join(rng.choice(WORDS) for _ in range(60)) + "\n\n")
+            path = os.path.join(package, f"notes_{i}.md")
+        else:
+            parts = [f'"""Module {i}"""\n\n']
+            while sum(map(len, parts)) < file_chars:
+                name = f"{rng.choice(WORDS)}_{len(parts)}"
+                body = "".join(f"    {rng.choice(WORDS)} = {rng.randint(0, 999)}\n" for _ in range(12))
+                parts.append(f"def {name}():\n{body}    return {name!r}\n\n\n")
+            path = os.path.join(package, f"module_{i}.py")
+        with open(path, "w") as f:
+            f.write("".join(parts))
+
+
+def timed(stub, fn) -> Dict[str, Any]:
+    """Run fn once; report wall time and the stub's request/connection counts"""
+    before = dict(stub.stats)
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    requests = stub.stats["requests"] - before["requests"]
+    return {
+        "wall_ms": round(elapsed * 1000, 1),
+        "requests": requests,
+        "connections": stub.stats["connections"] - before["connections"],
+        "requests_per_second": round(requests / elapsed, 2),
+        "files_per_second": round(result / elapsed, 2),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chunked summaries against a stub LM server")
+    parser.add_argument("--files", type=int, default=24, help="Files in the generated tree")
+    parser.add_argument("--file-chars", type=int, default=20000, help="Approximate characters per file")
+    parser.add_argument("--chunk-chars", type=int, default=6000, help="Characters per map chunk")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the stub waits per request")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated pipeline concurrency levels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    stub = serve(latency=args.latency)
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-summary-bench-") as work_dir:
+        from summarizer import LMClient, Summarizer
+        from summary_pipeline import SummaryPipeline, walk
+
+        tree = os.path.join(work_dir, "tree")
+        generate_tree(tree, args.files, args.file_chars, args.seed)
+        files = walk(tree)["files"]
+
+        client = LMClient(f"http://127.0.0.1:{stub.server_address[1]}/v1", "stub-model")
+        summarizer = Summarizer(os.path.join(work_dir, "summaries.db"), client, chunk_chars=args.chunk_chars)
+
+        def sequential():
+            for path in files:
+                summarizer.summarize_file(path, refresh=True)
+            return len(files)
+
+        results = {"summarize.sequential": timed(stub, sequential)}
+        baseline = results["summarize.sequential"]["wall_ms"]
+
+        for level in levels:
+            pipeline = SummaryPipeline(summarizer, level)
+            result = timed(stub, lambda: len(pipeline.summarize_path(tree, refresh=True)["files"]))
+            result["speedup"] = round(baseline / result["wall_ms"], 2)
+            results[f"pipeline.concurrency_{level}"] = result
+
+        pipeline = SummaryPipeline(summarizer, max(levels))
+        results["pipeline.cached"] = timed(stub, lambda: len(pipeline.summarize_path(tree)["files"]))
+
+    stub.shutdown()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "files": args.files,
+            "file_chars": args.file_chars,
+            "chunk_chars": args.chunk_chars,
+            "latency_s": args.latency,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Transport Load Test
+Runs N concurrent MCP clients against the checkpoint server in three
+topologies: one stdio server process per client (today's setup), one
+shared HTTP+SSE server that every client connects to directly, and the
+shared server reached through stdio_shim.py (for stdio-only clients). Every
+client saves its own checkpoint, then makes a fixed mix of resume, list,
+search and update calls. Reports time to a ready session, call latency
+percentiles, throughput, and the processes and resident memory the
+topology needs.
+
+Usage:
+    python3 benchmarks/bench_transport.py --clients 8 --calls 50 --population 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit, summarize  # noqa: E402
+from workload import PROFILES, WORDS, generate_workload  # noqa: E402
+
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.sse import sse_client  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+
+import transport  # noqa: E402
+
+SERVER = os.path.join(SERVER_DIR, "server.py")
+SHIM = os.path.join(SERVER_DIR, "stdio_shim.py")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def descendants(pid: int) -> List[int]:
+    """Live descendant process ids, from /proc"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def plan_calls(client: int, calls: int, names: List[str], seed: int) -> List[Any]:
+    """The client's call mix: resume, list, search and update, in a seeded order"""
+    rng = random.Random(f"{seed}:{client}")
+    own = f"client-{client}"
+    mix = []
+    for i in range(calls):
+        kind = i % 4
+        if kind == 0:
+            mix.append(("resume_checkpoint", {"name": rng.choice(names)}))
+        elif kind == 1:
+            mix.append(("list_checkpoints", {}))
+        elif kind == 2:
+            mix.append(("search_checkpoints", {"query": rng.choice(WORDS)}))
+        else:
+            mix.append(("update_checkpoint", {"name": own, "updates": {"current_goal": f"step {i}"}}))
+    rng.shuffle(mix)
+    return [("save_checkpoint", {"name": own, "data": {"summary": f"Load test client {client}"}})] + mix
+
+
+async def run_topology(connect, clients: int, plans: List[List[Any]]) -> Dict[str, Any]:
+    """
+    Open every client session, wait until all are ready, run the plans
+    concurrently and sample process memory before the sessions close.
+    """
+    ready_times: List[float] = []
+    latencies: List[float] = []
+    errors = 0
+    all_ready = asyncio.Event()
+    measured = asyncio.Event()
+    ready_count = 0
+    phase = {}
+
+    async def client(index: int):
+        nonlocal ready_count, errors
+        start = time.perf_counter()
+        async with connect(index) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                ready_times.append(time.perf_counter() - start)
+                ready_count += 1
+                if ready_count == clients:
+                    phase["start"] = time.perf_counter()
+                    all_ready.set()
+                await all_ready.wait()
+                for tool, arguments in plans[index]:
+                    call_start = time.perf_counter()
+                    result = await session.call_tool(tool, arguments)
+                    latencies.append(time.perf_counter() - call_start)
+                    errors += int(bool(result.isError) or '"status": "error"' in result.content[0].text)
+                phase["end"] = time.perf_counter()
+                await measured.wait()
+
+    tasks = [asyncio.create_task(client(i)) for i in range(clients)]
+    while len(latencies) < sum(len(plan) for plan in plans):
+        await asyncio.sleep(0.05)
+        for task in tasks:
+            if task.done() and task.exception():
+                raise task.exception()
+    pids = descendants(os.getpid())
+    rss = sum(rss_bytes(pid) for pid in pids)
+    measured.set()
+    await asyncio.gather(*tasks)
+
+    elapsed = phase["end"] - phase["start"]
+    return {
+        "clients": clients,
+        "calls": len(latencies),
+        "errors": errors,
+        "ready": summarize(ready_times),
+        "latency": summarize(latencies),
+        "calls_per_second": round(len(latencies) / elapsed, 1),
+        "processes": len(pids),
+        "rss_mb": round(rss / 1024 / 1024, 1),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load test: per-client stdio servers vs one shared server")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client sessions")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per client after its save")
+    parser.add_argument("--population", type=int, default=50, help="Checkpoints seeded before the run")
+    parser.add_argument("--profile", default="small", choices=sorted(PROFILES), help="Seeded checkpoint size")
+    parser.add_argument("--topologies", default="stdio,shared_sse,shared_shim", help="Comma-separated topologies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="checkpoint-transport-bench-") as work_dir:
+        env = dict(
+            os.environ,
+            CHECKPOINT_DB_PATH=os.path.join(work_dir, "checkpoints.db"),
+            CHECKPOINT_USAGE_DB_PATH=os.path.join(work_dir, "usage.db"),
+            CHECKPOINT_SHARED_LOG=os.path.join(work_dir, "shared.log"),
+        )
+        env.pop("CHECKPOINT_SHARD_DIR", None)
+        os.environ.update(env)
+        from server import CheckpointManager
+
+        manager = CheckpointManager(env["CHECKPOINT_DB_PATH"])
+        names = []
+        for name, data in generate_workload(args.population, args.profile, args.seed):
+            manager.save_checkpoint(name, data)
+            names.append(name)
+        plans = [plan_calls(i, args.calls, names, args.seed) for i in range(args.clients)]
+
+        def stdio(script: str, *script_args: str):
+            return lambda index: stdio_client(StdioServerParameters(
+                command=sys.executable, args=[script, *script_args], env=env
+            ))
+
+        for topology in args.topologies.split(","):
+            shared = None
+            if topology == "stdio":
+                connect = stdio(SERVER)
+            else:
+                port = free_port()
+                shared = subprocess.Popen(
+                    [sys.executable, SERVER, "--transport", "sse", "--port", str(port)],
+                    env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                while transport.health(port=port) is None:
+                    time.sleep(0.05)
+                if topology == "shared_sse":
+                    url = f"{transport.server_url(port=port)}{transport.SSE_PATH}"
+                    connect = lambda index, url=url: sse_client(url)  # noqa: E731
+                else:
+                    connect = stdio(SHIM, "--port", str(port), "--no-autostart")
+            try:
+                results[topology] = asyncio.run(run_topology(connect, args.clients, plans))
+            finally:
+                if shared is not None:
+                    shared.terminate()
+                    shared.wait()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "clients": args.clients,
+            "calls_per_client": args.calls,
+            "population": args.population,
+            "profile": args.profile,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Usage Log Benchmark
+Events/second for the ways an LM call can be logged: the legacy shell path
+(two sqlite3 processes per event, as log-lmstudio-usage.sh did), the
+usage_log.py CLI per event, one connect/insert/commit per event in-process,
+and UsageLogger at several batch sizes. Then times the per day/agent/model
+token report from the daily rollup against the same GROUP BY over the raw
+log.
+
+Usage:
+    python3 benchmarks/bench_usage_log.py --events 20000 --report-events 200000
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import bench, git_commit  # noqa: E402
+
+AGENTS = ["file-reader", "file-writer", "checkpoint-manager", "reviewer", "tester", "docs", "planner", "coder"]
+MODELS = ["meta-llama-3.1-8b-instruct", "qwen2.5-coder-7b", "mistral-7b-instruct", "phi-3-mini"]
+
+LEGACY_SCHEMA = """CREATE TABLE IF NOT EXISTS lm_studio_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, agent_name TEXT, prompt_length INTEGER,
+    response_length INTEGER, total_chars INTEGER, estimated_tokens INTEGER, model_used TEXT,
+    task_type TEXT, timestamp DATETIME);"""
+
+RAW_REPORT_SQL = """
+    SELECT date(timestamp) AS day, agent_name, model_used, COUNT(*), SUM(prompt_length),
+           SUM(response_length), SUM(estimated_tokens)
+    FROM lm_studio_usage
+    GROUP BY 1, 2, 3
+    ORDER BY day DESC, agent_name, model_used
+"""
+
+
+def random_event(rng: random.Random):
+    return (rng.choice(AGENTS), rng.randint(200, 40000), rng.randint(50, 4000), rng.choice(MODELS), "bench")
+
+
+def throughput(fn: Callable[[], int]) -> Dict[str, Any]:
+    """Run fn once; it returns how many events it logged"""
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    return {"events": count, "seconds": round(elapsed, 3), "events_per_second": round(count / elapsed, 1)}
+
+
+def legacy_shell(db_path: str, events) -> int:
+    """What log-lmstudio-usage.sh did per call: CREATE TABLE IF NOT EXISTS, then an interpolated INSERT"""
+    for agent, prompt, response, model, task in events:
+        total = prompt + response
+        subprocess.run(["sqlite3", db_path, LEGACY_SCHEMA], check=True)
+        subprocess.run(["sqlite3", db_path], check=True, text=True, input=(
+            "INSERT INTO lm_studio_usage (session_id, agent_name, prompt_length, response_length, total_chars, "
+            "estimated_tokens, model_used, task_type, timestamp) VALUES "
+            f"('unknown', '{agent}', {prompt}, {response}, {total}, {total // 4}, '{model}', '{task}', "
+            "datetime('now'));"
+        ))
+    return len(events)
+
+
+def cli_per_event(db_path: str, events) -> int:
+    env = dict(os.environ, CHECKPOINT_USAGE_DB_PATH=db_path)
+    script = os.path.join(SERVER_DIR, "usage_log.py")
+    for event in events:
+        subprocess.run([sys.executable, script, "log", *map(str, event)], env=env, check=True)
+    return len(events)
+
+
+def connect_per_event(db_path: str, events) -> int:
+    """Unbuffered in-process baseline: one connection and commit per event"""
+    from usage_log import INSERT_SQL, ensure_schema
+
+    for agent, prompt, response, model, task in events:
+        conn = sqlite3.connect(db_path)
+        with conn:
+            ensure_schema(conn)
+            total = prompt + response
+            conn.execute(INSERT_SQL, ("unknown", agent, prompt, response, total, total // 4, model, task,
+                                      time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())))
+        conn.close()
+    return len(events)
+
+
+def buffered(db_path: str, events, batch_size: int) -> int:
+    from usage_log import UsageLogger
+
+    usage = UsageLogger(db_path, batch_size=batch_size)
+    for event in events:
+        usage.record(*event)
+    usage.close()
+    return len(events)
+
+
+def populate_report(db_path: str, count: int, seed: int):
+    """count events spread over 90 days, written through UsageLogger so the rollup matches"""
+    from usage_log import UsageLogger
+
+    rng = random.Random(seed)
+    usage = UsageLogger(db_path, batch_size=5000)
+    now = time.time()
+    for _ in range(count):
+        usage.record(*random_event(rng), timestamp=now - rng.uniform(0, 90 * 86400))
+    usage.close()
+    return usage
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark LM usage logging throughput and reports")
+    parser.add_argument("--events", type=int, default=20000, help="Events per in-process run")
+    parser.add_argument("--process-events", type=int, default=100, help="Events per subprocess-based run")
+    parser.add_argument("--batch-sizes", default="1,10,100,1000", help="Comma-separated UsageLogger batch sizes")
+    parser.add_argument("--report-events", type=int, default=200000, help="Events behind the report timings")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed report queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    events = [random_event(rng) for _ in range(args.events)]
+    few = events[:args.process_events]
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="checkpoint-usage-bench-") as work_dir:
+        def fresh(name: str) -> str:
+            return os.path.join(work_dir, f"{name}.db")
+
+        if shutil.which("sqlite3"):
+            results["log.legacy_shell"] = throughput(lambda: legacy_shell(fresh("shell"), few))
+        results["log.cli_per_event"] = throughput(lambda: cli_per_event(fresh("cli"), few))
+        results["log.connect_per_event"] = throughput(lambda: connect_per_event(fresh("connect"), events))
+        for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+            results[f"log.buffered_batch_{batch_size}"] = throughput(
+                lambda: buffered(fresh(f"batch{batch_size}"), events, batch_size)
+            )
+
+        report_db = fresh("report")
+        usage = populate_report(report_db, args.report_events, args.seed)
+        results["report.rollup"] = bench(lambda i: usage.totals(), args.iterations)
+        results["report.rollup_by_agent"] = bench(lambda i: usage.totals(["agent"]), args.iterations)
+        conn = sqlite3.connect(report_db)
+        results["report.raw_group_by"] = bench(lambda i: conn.execute(RAW_REPORT_SQL).fetchall(), args.iterations)
+        conn.close()
+        usage.close()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "events": args.events,
+            "process_events": args.process_events,
+            "report_events": args.report_events,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
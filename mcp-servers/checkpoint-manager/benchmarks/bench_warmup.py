@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Startup Warm-up Benchmark
+Launches a fresh stdio server per trial, started from a project directory
+that owns some of the checkpoints, and measures how long it takes to become
+ready and how long the first and second resume of the project's latest
+checkpoint take, with the startup warm-up disabled and enabled. Before each
+launch the database files are dropped from the OS page cache
+(posix_fadvise DONTNEED), as after a reboot or a long pause.
+
+Usage:
+    python3 benchmarks/bench_warmup.py --population 200 --profile medium --trials 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+SERVER = os.path.join(SERVER_DIR, "server.py")
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit, summarize  # noqa: E402
+from workload import PROFILES, generate_workload  # noqa: E402
+
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+
+
+def drop_page_cache(paths: List[str]):
+    """Ask the kernel to evict the files' clean pages"""
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+async def trial(params: StdioServerParameters, name: str, delay: float) -> Dict[str, float]:
+    """Start a server, wait delay seconds after it is ready, resume twice"""
+    start = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            ready = time.perf_counter() - start
+            await asyncio.sleep(delay)
+            timings = {"ready": ready}
+            for call in ("first_resume", "second_resume"):
+                call_start = time.perf_counter()
+                result = await session.call_tool("resume_checkpoint", {"name": name})
+                timings[call] = time.perf_counter() - call_start
+                if result.isError or result.content[0].text.startswith('{\n  "status": "error"'):
+                    raise RuntimeError(result.content[0].text)
+    return timings
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark first-call latency with and without startup warm-up")
+    parser.add_argument("--profile", default="medium", choices=sorted(PROFILES), help="Checkpoint size")
+    parser.add_argument("--population", type=int, default=200, help="Checkpoints in the database")
+    parser.add_argument("--project-checkpoints", type=int, default=20, help="Checkpoints owned by the project")
+    parser.add_argument("--trials", type=int, default=5, help="Server launches per mode")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between ready and the first call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-warmup-bench-") as work_dir:
+        project = os.path.join(work_dir, "project")
+        os.makedirs(project)
+        db_path = os.path.join(work_dir, "checkpoints.db")
+        env = dict(
+            os.environ,
+            CHECKPOINT_DB_PATH=db_path,
+            CHECKPOINT_USAGE_DB_PATH=os.path.join(work_dir, "usage.db"),
+            CHECKPOINT_METRICS="1",
+        )
+        env.pop("CHECKPOINT_SHARD_DIR", None)
+        os.environ.update(env)
+        from cold_storage import archive_path
+        from server import CheckpointManager
+
+        manager = CheckpointManager(db_path)
+        latest = None
+        step = max(1, args.population // args.project_checkpoints)
+        for index, (name, data) in enumerate(generate_workload(args.population, args.profile, args.seed)):
+            if index % step == 0:
+                data["working_directory"] = project
+                latest = name
+            manager.save_checkpoint(name, data)
+        with sqlite3.connect(db_path) as conn:
+            # One save per minute, so "most recent" is unambiguous
+            conn.execute("""
+                UPDATE checkpoints
+                SET updated_at = datetime('now', (id - (SELECT MAX(id) FROM checkpoints)) || ' minutes')
+            """)
+        files = [db_path, f"{db_path}-wal", archive_path(db_path)]
+
+        results: Dict[str, Any] = {}
+        for mode, checkpoints in (("cold", "0"), ("warm", "5")):
+            params = StdioServerParameters(
+                command=sys.executable, args=[SERVER], cwd=project,
+                env=dict(env, CHECKPOINT_WARMUP_CHECKPOINTS=checkpoints)
+            )
+            timings: Dict[str, List[float]] = {"ready": [], "first_resume": [], "second_resume": []}
+            for _ in range(args.trials):
+                drop_page_cache(files)
+                for key, value in asyncio.run(trial(params, latest, args.delay)).items():
+                    timings[key].append(value)
+            results[mode] = {key: summarize(values) for key, values in timings.items()}
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "population": args.population,
+            "project_checkpoints": args.project_checkpoints,
+            "trials": args.trials,
+            "delay": args.delay,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Stub LM Server
+A tiny OpenAI-compatible endpoint for exercising summarizer.py without LM
+Studio. POST /v1/chat/completions answers with a deterministic "summary" of
+the user message; GET /v1/models lists one model; GET /stats reports request
+and connection counts so keep-alive reuse can be checked. Connections are
+HTTP/1.1 keep-alive, and --latency adds a fixed delay to every completion.
+
+Usage:
+    python3 benchmarks/lm_stub_server.py --port 1234 --latency 0.2
+    CHECKPOINT_LM_URL=http://127.0.0.1:1234/v1 python3 summarizer.py README.md brief
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+MODEL = "stub-model"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self._send(200, {"object": "list", "data": [{"id": MODEL, "object": "model"}]})
+        elif self.path == "/stats":
+            with self.server.lock:
+                self._send(200, dict(self.server.stats))
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": "not found"})
+            return
+
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["prompt_chars"] += sum(len(m.get("content", "")) for m in request.get("messages", []))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        prompt = request["messages"][-1]["content"]
+        instruction, _, content = prompt.partition("\n\n")
+        first_line = content.strip().splitlines()[0][:80] if content.strip() else ""
+        summary = f"Summary of {len(content)} chars ({instruction[:40]}): {first_line}"
+        self._send(200, {
+            "id": f"stub-{self.server.stats['requests']}",
+            "object": "chat.completion",
+            "model": request.get("model", MODEL),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": summary}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(summary) // 4,
+                "total_tokens": (len(prompt) + len(summary)) // 4,
+            },
+        })
+
+
+def serve(port: int = 0, latency: float = 0.0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the stub on a daemon thread; server.server_address holds the bound port"""
+    httpd = ThreadingHTTPServer((host, port), StubHandler)
+    httpd.daemon_threads = True
+    httpd.latency = latency
+    httpd.lock = threading.Lock()
+    httpd.stats = {"requests": 0, "connections": 0, "prompt_chars": 0}
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible server for summarizer tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every completion")
+    args = parser.parse_args()
+
+    httpd = serve(args.port, args.latency, args.host)
+    print(f"Stub LM server on http://{args.host}:{httpd.server_address[1]}/v1 (latency {args.latency}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
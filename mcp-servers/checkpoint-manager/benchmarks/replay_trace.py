@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Trace Replay Driver
+Replays tool-call traces recorded with CHECKPOINT_TRACE_FILE against a real
+server.py subprocess over stdio MCP, on a scratch database. Each recorded
+session becomes its own stream of calls, issued in order at the recorded
+pace scaled by --speed (0 replays back to back); --concurrency runs that
+many copies of the whole trace at once, each with its own identifiers.
+Argument templates are filled with generated text of the recorded sizes,
+and checkpoints the trace reads before saving are seeded first. Reports
+throughput and latency percentiles overall and per tool, next to the
+latencies recorded in the trace.
+
+Usage:
+    CHECKPOINT_TRACE_FILE=~/trace-{pid}.jsonl python3 server.py   # record
+    python3 benchmarks/replay_trace.py ~/trace-*.jsonl --speed 4 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, SERVER_DIR)
+
+from bench_checkpoint_manager import git_commit, summarize  # noqa: E402
+from workload import PROFILES, WORDS, generate_checkpoint  # noqa: E402
+
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+
+from trace_recorder import IDENTIFIER_PATTERN, STRING_PATTERN, load_trace  # noqa: E402
+
+SERVER = os.path.join(SERVER_DIR, "server.py")
+
+# Tools that need a local LLM or touch files outside the scratch database
+DEFAULT_EXCLUDE = "summarize_file,summarize_directory,backup_checkpoints,run_maintenance"
+
+# Calls that create the checkpoint they name
+CREATING_TOOLS = {"save_checkpoint", "begin_checkpoint_save"}
+
+
+def load_streams(paths: List[str], exclude: set) -> Tuple[List[List[Dict[str, Any]]], int]:
+    """
+    Group trace entries into per-session streams ordered by start time.
+
+    Returns:
+        (streams, skipped) where skipped counts excluded calls
+    """
+    streams: Dict[Tuple[int, int], List[Dict[str, Any]]] = defaultdict(list)
+    skipped = 0
+    for index, path in enumerate(paths):
+        for entry in load_trace(path):
+            if entry["tool"] in exclude:
+                skipped += 1
+                continue
+            streams[(index, entry.get("session", 0))].append(entry)
+    ordered = [sorted(stream, key=lambda entry: entry["ts"]) for _, stream in sorted(streams.items())]
+    return ordered, skipped
+
+
+def referenced_before_save(streams: List[List[Dict[str, Any]]]) -> List[str]:
+    """Checkpoint pseudonyms the trace uses successfully before (or without) creating them"""
+    created, missing = set(), []
+    for entry in sorted((entry for stream in streams for entry in stream), key=lambda entry: entry["ts"]):
+        if entry.get("error"):
+            continue
+        args = entry.get("args") or {}
+        names = [args.get(key) for key in ("name", "from_name", "to_name")]
+        if entry["tool"] in CREATING_TOOLS:
+            created.add(args.get("name"))
+            continue
+        for name in names:
+            if isinstance(name, str) and IDENTIFIER_PATTERN.match(name) and name not in created and name not in missing:
+                missing.append(name)
+    return missing
+
+
+class Filler:
+    """Turns argument templates into concrete arguments for one replica"""
+
+    def __init__(self, replica: int, replicas: int, seed: int):
+        self.suffix = f"-r{replica}" if replicas > 1 else ""
+        self.rng = random.Random(f"{seed}:{replica}")
+        self.returned: Dict[str, str] = {}
+
+    def identifier(self, template: str) -> str:
+        if template in self.returned:
+            return self.returned[template]
+        return f"id-{IDENTIFIER_PATTERN.match(template).group(1)}{self.suffix}"
+
+    def text(self, length: int) -> str:
+        words, size = [], 0
+        while size < length:
+            word = self.rng.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+        return " ".join(words)[:length]
+
+    def fill(self, template: Any) -> Any:
+        if isinstance(template, dict):
+            return {key: self.fill(value) for key, value in template.items()}
+        if isinstance(template, list):
+            return [self.fill(item) for item in template]
+        if isinstance(template, str):
+            match = STRING_PATTERN.match(template)
+            if match:
+                return self.text(int(match.group(1)))
+            if IDENTIFIER_PATTERN.match(template):
+                return self.identifier(template)
+        return template
+
+    def note_result(self, entry: Dict[str, Any], text: str):
+        """Map identifiers the recorded call returned to the ones returned now"""
+        if not entry.get("result_ids"):
+            return
+        try:
+            result = json.loads(text)
+        except ValueError:
+            return
+        for key, template in entry["result_ids"].items():
+            if isinstance(result, dict) and isinstance(result.get(key), str):
+                self.returned[template] = result[key]
+
+
+async def replay_stream(
+    session: ClientSession,
+    stream: List[Dict[str, Any]],
+    filler: Filler,
+    t0: float,
+    start: float,
+    speed: float,
+    samples: Dict[str, List[float]],
+    errors: Dict[str, int],
+    messages: List[str],
+):
+    """Issue one session's calls in order, no earlier than their scaled offsets"""
+    for entry in stream:
+        if speed > 0:
+            delay = start + (entry["ts"] - t0) / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        arguments = filler.fill(entry.get("args") or {})
+        call_start = time.perf_counter()
+        result = await session.call_tool(entry["tool"], arguments)
+        samples[entry["tool"]].append(time.perf_counter() - call_start)
+        text = "".join(getattr(item, "text", "") for item in result.content)
+        if result.isError or '"status": "error"' in text:
+            errors[entry["tool"]] += 1
+            if len(messages) < 20:
+                messages.append(f"{entry['tool']}: {text[:200]}")
+        else:
+            filler.note_result(entry, text)
+
+
+async def replay(
+    streams: List[List[Dict[str, Any]]],
+    env: Dict[str, str],
+    concurrency: int,
+    speed: float,
+    server_per_replica: bool,
+    seed: int,
+) -> Dict[str, Any]:
+    """Run every replica's streams against one server (or one server per replica)"""
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    messages: List[str] = []
+    t0 = min(stream[0]["ts"] for stream in streams)
+    params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env)
+
+    async def run_replicas(session: ClientSession, replicas: List[int], start: float):
+        jobs = []
+        for replica in replicas:
+            filler = Filler(replica, concurrency, seed)
+            jobs += [
+                replay_stream(session, stream, filler, t0, start, speed, samples, errors, messages)
+                for stream in streams
+            ]
+        await asyncio.gather(*jobs)
+
+    async def serve(replicas: List[int], ready: asyncio.Event, go: asyncio.Event, clock: Dict[str, float]):
+        async with stdio_client(params) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                ready.set()
+                await go.wait()
+                await run_replicas(session, replicas, clock["start"])
+
+    groups = [[replica] for replica in range(concurrency)] if server_per_replica else [list(range(concurrency))]
+    readies = [asyncio.Event() for _ in groups]
+    go = asyncio.Event()
+    clock: Dict[str, float] = {}
+    tasks = [asyncio.create_task(serve(group, ready, go, clock)) for group, ready in zip(groups, readies)]
+    for ready in readies:
+        waiter = asyncio.create_task(ready.wait())
+        done, _ = await asyncio.wait({waiter, *tasks}, return_when=asyncio.FIRST_COMPLETED)
+        if waiter not in done:
+            waiter.cancel()
+            await asyncio.gather(*tasks)
+    clock["start"] = time.perf_counter()
+    go.set()
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - clock["start"]
+    return {"samples": samples, "errors": errors, "messages": messages, "duration": duration}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Replay recorded tool-call traces against a stdio server")
+    parser.add_argument("traces", nargs="+", help="Trace files written with CHECKPOINT_TRACE_FILE")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pace multiplier; 0 replays back to back")
+    parser.add_argument("--concurrency", type=int, default=1, help="Copies of the trace replayed at once")
+    parser.add_argument("--server-per-replica", action="store_true",
+                        help="Give each copy its own server process instead of sharing one")
+    parser.add_argument("--exclude", default=DEFAULT_EXCLUDE, help="Comma-separated tools not to replay")
+    parser.add_argument("--seed-profile", default="medium", choices=sorted(PROFILES),
+                        help="Size of checkpoints seeded for names read before they are saved")
+    parser.add_argument("--no-seed", action="store_true", help="Do not seed missing checkpoints")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    exclude = {tool for tool in args.exclude.split(",") if tool}
+    streams, skipped = load_streams(args.traces, exclude)
+    if not streams:
+        print("Error: No replayable calls in the given traces", file=sys.stderr)
+        sys.exit(1)
+    recorded: Dict[str, List[float]] = defaultdict(list)
+    recorded_errors: Dict[str, int] = defaultdict(int)
+    for stream in streams:
+        for entry in stream:
+            recorded[entry["tool"]].append(entry["elapsed_ms"] / 1000)
+            recorded_errors[entry["tool"]] += int(bool(entry.get("error")))
+
+    logging.getLogger("checkpoint-manager").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="checkpoint-replay-") as work_dir:
+        env = dict(
+            os.environ,
+            CHECKPOINT_DB_PATH=os.path.join(work_dir, "checkpoints.db"),
+            CHECKPOINT_USAGE_DB_PATH=os.path.join(work_dir, "usage.db"),
+        )
+        for key in ("CHECKPOINT_SHARD_DIR", "CHECKPOINT_TRACE_FILE", "CHECKPOINT_BACKUP_INTERVAL"):
+            env.pop(key, None)
+        os.environ.update(env)
+
+        seeded = 0
+        if not args.no_seed:
+            from server import CheckpointManager
+
+            manager = CheckpointManager(env["CHECKPOINT_DB_PATH"])
+            missing = referenced_before_save(streams)
+            for replica in range(args.concurrency):
+                filler = Filler(replica, args.concurrency, args.seed)
+                for index, template in enumerate(missing):
+                    name = filler.identifier(template)
+                    manager.save_checkpoint(name, generate_checkpoint(name, args.seed + index, **PROFILES[args.seed_profile]))
+                    seeded += 1
+
+        outcome = asyncio.run(replay(streams, env, args.concurrency, args.speed, args.server_per_replica, args.seed))
+
+    samples, errors = outcome["samples"], outcome["errors"]
+    calls = sum(len(values) for values in samples.values())
+    span = max(entry["ts"] for stream in streams for entry in stream) - min(stream[0]["ts"] for stream in streams)
+    by_tool = {}
+    for tool in sorted(samples):
+        by_tool[tool] = {
+            "calls": len(samples[tool]),
+            "errors": errors[tool],
+            "recorded_errors": recorded_errors[tool] * args.concurrency,
+            "replayed": summarize(samples[tool]),
+            "recorded": summarize(recorded[tool]),
+        }
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "traces": args.traces,
+            "streams": len(streams),
+            "trace_calls": sum(len(stream) for stream in streams),
+            "trace_span_s": round(span, 3),
+            "excluded_calls": skipped,
+            "seeded_checkpoints": seeded,
+            "speed": args.speed,
+            "concurrency": args.concurrency,
+            "server_per_replica": args.server_per_replica,
+        },
+        "results": {
+            "calls": calls,
+            "errors": sum(errors.values()),
+            "duration_s": round(outcome["duration"], 3),
+            "calls_per_second": round(calls / outcome["duration"], 1) if outcome["duration"] else None,
+            "latency": summarize([value for values in samples.values() for value in values]),
+            "by_tool": by_tool,
+            "error_samples": outcome["messages"],
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
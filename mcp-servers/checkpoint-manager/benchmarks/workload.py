@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Synthetic Workload Generator
+Produces deterministic, realistic checkpoint payloads for benchmarking the
+checkpoint manager. The same seed always yields the same checkpoints, so
+results can be compared across commits.
+"""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+# Size profiles: number of child rows per checkpoint and artifact body size in KB
+PROFILES = {
+    "small": {"todos": 10, "files": 10, "decisions": 3, "artifacts": 2, "artifact_kb": 1},
+    "medium": {"todos": 100, "files": 200, "decisions": 20, "artifacts": 10, "artifact_kb": 4},
+    "large": {"todos": 1000, "files": 5000, "decisions": 100, "artifacts": 50, "artifact_kb": 16},
+}
+
+WORDS = [
+    "refactor", "cache", "token", "session", "checkpoint", "resume", "database",
+    "index", "query", "latency", "agent", "model", "prompt", "summary", "review",
+    "parser", "schema", "migration", "handler", "request", "response", "config",
+    "retry", "timeout", "stream", "buffer", "worker", "queue", "batch", "metric",
+]
+DIRECTORIES = ["src", "lib", "tests", "scripts", "docs", "api", "core", "utils", "models", "services"]
+MODULES = ["auth", "client", "server", "store", "router", "cache", "loader", "writer", "runner", "types"]
+EXTENSIONS = [".py", ".ts", ".md", ".sh", ".json", ".sql"]
+TODO_STATUSES = ["pending", "in_progress", "completed"]
+PRIORITIES = ["low", "medium", "high"]
+FILE_STATUSES = ["created", "modified", "deleted"]
+ARTIFACT_TYPES = ["code", "snippet", "config", "doc", "log"]
+BRANCHES = ["main", "develop", "feature/token-cache", "fix/resume-latency", "release/1.2"]
+
+
+def _sentence(rng: random.Random, min_words: int = 6, max_words: int = 14) -> str:
+    """Build a pseudo-English sentence from the vocabulary"""
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 4) -> str:
+    """Build a paragraph of several sentences"""
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _file_path(rng: random.Random) -> str:
+    """Build a plausible nested project file path"""
+    depth = rng.randint(1, 4)
+    parts = [rng.choice(DIRECTORIES) for _ in range(depth)]
+    filename = f"{rng.choice(MODULES)}_{rng.randint(0, 999)}{rng.choice(EXTENSIONS)}"
+    return "/".join(parts + [filename])
+
+
+def _artifact_body(rng: random.Random, size_kb: int) -> str:
+    """Build a code-like artifact body of roughly size_kb kilobytes"""
+    target = size_kb * 1024
+    lines = []
+    length = 0
+    while length < target:
+        indent = "    " * rng.randint(0, 3)
+        line = f"{indent}{rng.choice(WORDS)}_{rng.choice(MODULES)} = {rng.choice(WORDS)}({rng.randint(0, 9999)})"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def generate_checkpoint(
+    name: str,
+    seed: int = 0,
+    todos: int = 10,
+    files: int = 10,
+    decisions: int = 3,
+    artifacts: int = 2,
+    artifact_kb: int = 1,
+) -> Dict[str, Any]:
+    """
+    Generate one checkpoint payload in the shape accepted by both
+    CheckpointManager.save_checkpoint and save_checkpoint.py.
+
+    Args:
+        name: Checkpoint name (also mixed into the seed)
+        seed: Base seed for deterministic output
+        todos, files, decisions, artifacts: Number of child rows to generate
+        artifact_kb: Approximate size of each artifact body in KB
+
+    Returns:
+        Checkpoint data dictionary (including 'name')
+    """
+    rng = random.Random(f"{seed}:{name}")
+    project = f"/home/dev/projects/{rng.choice(MODULES)}-{rng.choice(WORDS)}"
+
+    return {
+        "name": name,
+        "summary": _paragraph(rng, sentences=rng.randint(3, 6)),
+        "current_goal": _sentence(rng),
+        "working_directory": project,
+        "git_branch": rng.choice(BRANCHES),
+        "git_status": "\n".join(f" M {_file_path(rng)}" for _ in range(rng.randint(0, 8))),
+        "todos": [
+            {
+                "title": _sentence(rng, 3, 8),
+                "description": _sentence(rng),
+                "status": rng.choice(TODO_STATUSES),
+                "priority": rng.choice(PRIORITIES),
+            }
+            for _ in range(todos)
+        ],
+        "file_modifications": [
+            {
+                "file_path": _file_path(rng),
+                "status": rng.choice(FILE_STATUSES),
+                "description": _sentence(rng, 3, 8),
+            }
+            for _ in range(files)
+        ],
+        "key_decisions": [
+            {
+                "title": _sentence(rng, 3, 6),
+                "rationale": _paragraph(rng, sentences=2),
+                "impact": _sentence(rng),
+            }
+            for _ in range(decisions)
+        ],
+        "artifacts": [
+            {
+                "name": f"{rng.choice(MODULES)}-{rng.choice(WORDS)}-{i}",
+                "artifact_type": rng.choice(ARTIFACT_TYPES),
+                "path": _file_path(rng),
+                "description": _artifact_body(rng, artifact_kb),
+            }
+            for i in range(artifacts)
+        ],
+    }
+
+
+def generate_workload(count: int, profile: str = "medium", seed: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Generate a list of (name, data) checkpoint pairs using a size profile.
+
+    Args:
+        count: Number of checkpoints to generate
+        profile: One of PROFILES
+        seed: Base seed for deterministic output
+
+    Returns:
+        List of (name, data) tuples
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}' (choose from {', '.join(PROFILES)})")
+
+    sizes = PROFILES[profile]
+    workload = []
+    for i in range(count):
+        name = f"bench-{profile}-{i:05d}"
+        workload.append((name, generate_checkpoint(name, seed=seed, **sizes)))
+    return workload
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Change Log
+Triggers append every insert, delete and content update of a checkpoint to a
+small change log table, so watchers can ask "what changed since cursor N" with one
+indexed range query instead of re-reading the checkpoint list. Long-polling
+waits on PRAGMA data_version, which only moves when another connection
+commits, so an idle watch never touches the log itself.
+"""
+
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Entries kept in the log; watchers further behind are told to re-list
+CHANGE_LOG_RETENTION = 10000
+
+# Longest a single watch call may block
+MAX_WATCH_TIMEOUT = 60.0
+
+
+def install(cursor: sqlite3.Cursor, table: str, columns: Sequence[str]):
+    """
+    Create the change log and the triggers that feed it from table (keyed by
+    its name column). Every UPDATE that sets one of columns is logged, whether
+    or not the values differ: updated_at only has one-second resolution, so
+    granular edits and re-saves within a second leave it unchanged. Leaving
+    the bookkeeping columns (pinned, archived) out of columns keeps their
+    writes from waking watchers.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for op, event, row in (("created", "INSERT", "NEW"), ("deleted", "DELETE", "OLD")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_log_{op} AFTER {event} ON {table}
+            BEGIN
+                INSERT INTO checkpoint_changes (name, op) VALUES ({row}.name, '{op}');
+            END
+        """)
+    # Replaces the triggers of older versions, which fired on any column or
+    # only when a value changed
+    for stale in ("updated", "content_updated"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {table}_log_{stale}")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_log_modified
+        AFTER UPDATE OF {", ".join(columns)} ON {table}
+        BEGIN
+            INSERT INTO checkpoint_changes (name, op) VALUES (NEW.name, 'updated');
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS checkpoint_changes_trim AFTER INSERT ON checkpoint_changes
+        BEGIN
+            DELETE FROM checkpoint_changes WHERE seq <= NEW.seq - {CHANGE_LOG_RETENTION};
+        END
+    """)
+
+
+def changes_since(conn: sqlite3.Connection, since: int, limit: int = 500) -> Dict[str, Any]:
+    """
+    Latest change per checkpoint after cursor `since`.
+
+    Returns:
+        Dict with changes (name, op, version, changed_at) in version order,
+        the cursor to pass next time, and reset=True when entries between
+        `since` and the oldest retained one were trimmed
+    """
+    oldest, latest = conn.execute("SELECT MIN(seq), MAX(seq) FROM checkpoint_changes").fetchone()
+    # The bare op/changed_at columns come from the row holding MAX(seq)
+    rows = conn.execute("""
+        SELECT name, op, MAX(seq) AS version, changed_at
+        FROM checkpoint_changes
+        WHERE seq > ?
+        GROUP BY name
+        ORDER BY version
+        LIMIT ?
+    """, (since, limit)).fetchall()
+
+    changes = [{"name": row[0], "op": row[1], "version": row[2], "changed_at": row[3]} for row in rows]
+    more = len(changes) == limit
+    return {
+        "cursor": changes[-1]["version"] if more else max(latest or 0, since),
+        "changes": changes,
+        "more": more,
+        "reset": oldest is not None and since < oldest - 1,
+    }
+
+
+def watch(
+    connect: Callable[[], sqlite3.Connection],
+    since: Optional[int] = None,
+    timeout: float = 0.0,
+    limit: int = 500,
+    poll_interval: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Return changes after `since`, waiting up to timeout seconds for one.
+
+    Args:
+        connect: Opens a connection to the database holding the log
+        since: Cursor from a previous call; None returns the current cursor
+               without changes (start watching from now)
+        timeout: Seconds to long-poll when nothing has changed yet
+        limit: Maximum checkpoints per response
+        poll_interval: Seconds between PRAGMA data_version checks
+    """
+    timeout = min(max(timeout, 0.0), MAX_WATCH_TIMEOUT)
+    conn = connect()
+    try:
+        if since is None:
+            latest = conn.execute("SELECT MAX(seq) FROM checkpoint_changes").fetchone()[0]
+            return {"cursor": latest or 0, "changes": [], "more": False, "reset": False}
+
+        deadline = time.monotonic() + timeout
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        while True:
+            result = changes_since(conn, since, limit)
+            if result["changes"] or result["reset"] or time.monotonic() >= deadline:
+                return result
+            # Sleep until some other connection commits (or the deadline passes)
+            while time.monotonic() < deadline:
+                time.sleep(poll_interval)
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current != version:
+                    version = current
+                    break
+    finally:
+        conn.close()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Diff
+Computes the delta between two checkpoints with set operations in SQLite, so
+only changed keys ever reach Python. Works with both the MCP server's column
+layout and the one written by save_checkpoint.py.
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+# Scalar checkpoint columns compared directly
+SCALAR_COLUMNS = ["summary", "current_goal", "working_directory", "git_branch", "git_status", "git_head"]
+
+# Per child table: candidate key columns and candidate value columns, in
+# preference order (server layout first, save_checkpoint.py layout second)
+TABLE_SPECS = {
+    "todos": {
+        "key": ["title", "content"],
+        "values": [["status"], ["priority"], ["description", "active_form"]],
+    },
+    "file_modifications": {
+        "key": ["file_path"],
+        "values": [["status", "modification_type"], ["description"]],
+    },
+    "key_decisions": {
+        "key": ["title", "decision_title"],
+        "values": [["rationale", "decision_content"], ["impact"]],
+    },
+    "artifacts": {
+        "key": ["name", "artifact_title"],
+        "values": [["artifact_type"], ["path"], ["description", "artifact_content"]],
+    },
+}
+
+# Long text values are clipped in the delta to keep it compact
+MAX_VALUE_CHARS = 120
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _resolve(conn: sqlite3.Connection, schema: str, table: str) -> Tuple[str, List[Optional[str]]]:
+    """Pick the key column and, per value slot, the column present in this layout (or None)"""
+    available = set(_columns(conn, schema, table))
+    spec = TABLE_SPECS[table]
+    key = next((c for c in spec["key"] if c in available), None)
+    if key is None:
+        raise ValueError(f"Table {schema}.{table} has none of the key columns {spec['key']}")
+    values = [next((c for c in candidates if c in available), None) for candidates in spec["values"]]
+    return key, values
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS] + "..."
+    return value
+
+
+def _checkpoint(conn: sqlite3.Connection, schema: str, name: str) -> sqlite3.Row:
+    row = conn.execute(f"SELECT * FROM {schema}.checkpoints WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        raise ValueError(f"Checkpoint '{name}' not found")
+    return row
+
+
+def _diff_table(
+    conn: sqlite3.Connection,
+    table: str,
+    schema_a: str,
+    id_a: int,
+    schema_b: str,
+    id_b: int,
+    limit: int,
+) -> Dict[str, Any]:
+    """Added, removed and changed rows of one child table, keyed by normalised key"""
+    key_a, slots_a = _resolve(conn, schema_a, table)
+    key_b, slots_b = _resolve(conn, schema_b, table)
+    # Compare only the value slots both layouts have
+    shared = [i for i in range(len(slots_a)) if slots_a[i] and slots_b[i]]
+    values_a = [slots_a[i] for i in shared]
+    values_b = [slots_b[i] for i in shared]
+    count = len(shared)
+
+    select_a = ", ".join([f"lower(trim({key_a})) AS k", f"{key_a} AS label"] +
+                         [f"{c} AS v{i}" for i, c in enumerate(values_a)])
+    select_b = ", ".join([f"lower(trim({key_b})) AS k", f"{key_b} AS label"] +
+                         [f"{c} AS v{i}" for i, c in enumerate(values_b)])
+    value_names = [f"v{i}" for i in range(count)]
+
+    # Materialise both sides once, indexed on the normalised key
+    for side, schema, select, checkpoint_id in (("a", schema_a, select_a, id_a), ("b", schema_b, select_b, id_b)):
+        conn.execute(f"DROP TABLE IF EXISTS temp.diff_{side}")
+        conn.execute(
+            f"CREATE TEMP TABLE diff_{side} AS SELECT {select} FROM {schema}.{table} WHERE checkpoint_id = ?",
+            (checkpoint_id,),
+        )
+        conn.execute(f"CREATE INDEX temp.idx_diff_{side}_k ON diff_{side}(k)")
+    params = {"limit": limit}
+
+    def keyed(side: str, other: str) -> Tuple[int, List[str]]:
+        """Keys present on one side only: count plus the first `limit` labels"""
+        only = f"SELECT k FROM diff_{side} EXCEPT SELECT k FROM diff_{other}"
+        total = conn.execute(f"SELECT COUNT(*) FROM ({only})").fetchone()[0]
+        labels = conn.execute(f"""
+            SELECT MIN(label) FROM diff_{side}
+            WHERE k IN ({only})
+            GROUP BY k ORDER BY k LIMIT :limit
+        """, params).fetchall()
+        return total, [row[0] for row in labels]
+
+    added_count, added = keyed("b", "a")
+    removed_count, removed = keyed("a", "b")
+
+    changed = []
+    changed_count = 0
+    if value_names:
+        # Rows of b whose values are not in a, restricted to keys both sides share
+        tuple_cols = ", ".join(["k"] + value_names)
+        changed_keys = f"""
+            SELECT k FROM (SELECT {tuple_cols} FROM diff_b EXCEPT SELECT {tuple_cols} FROM diff_a)
+            INTERSECT SELECT k FROM diff_a
+        """
+        changed_count = conn.execute(f"SELECT COUNT(*) FROM ({changed_keys})").fetchone()[0]
+        old_cols = ", ".join(f"a.{v}" for v in value_names)
+        new_cols = ", ".join(f"b.{v}" for v in value_names)
+        rows = conn.execute(f"""
+            SELECT b.label, {old_cols}, {new_cols}
+            FROM diff_b AS b JOIN diff_a AS a ON a.k = b.k
+            WHERE b.k IN ({changed_keys})
+            GROUP BY b.k ORDER BY b.k LIMIT :limit
+        """, params).fetchall()
+        for row in rows:
+            old, new = row[1:1 + count], row[1 + count:]
+            fields = {
+                values_b[i]: {"from": _clip(old[i]), "to": _clip(new[i])}
+                for i in range(count) if old[i] != new[i]
+            }
+            changed.append({"key": row[0], "fields": fields})
+
+    conn.execute("DROP TABLE temp.diff_a")
+    conn.execute("DROP TABLE temp.diff_b")
+
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "counts": {"added": added_count, "removed": removed_count, "changed": changed_count},
+        "truncated": max(added_count, removed_count, changed_count) > limit,
+    }
+
+
+def diff_checkpoints(
+    conn: sqlite3.Connection,
+    name_a: str,
+    name_b: str,
+    attach_path: Optional[str] = None,
+    limit: int = 200,
+) -> Dict[str, Any]:
+    """
+    Compute the delta from checkpoint a to checkpoint b.
+
+    Args:
+        conn: Connection to the database holding checkpoint a
+        name_a, name_b: Checkpoint names ("from" and "to")
+        attach_path: Database holding checkpoint b, if it is not conn's own
+        limit: Maximum keys listed per category (counts are always exact)
+
+    Returns:
+        Dict with changed scalar fields and per-table added/removed/changed keys
+    """
+    conn.row_factory = sqlite3.Row
+    schema_b = "main"
+    if attach_path:
+        conn.execute("ATTACH DATABASE ? AS diff_other", (attach_path,))
+        schema_b = "diff_other"
+
+    try:
+        row_a = _checkpoint(conn, "main", name_a)
+        row_b = _checkpoint(conn, schema_b, name_b)
+        # Archived stubs have no child rows here; callers rehydrate their own database first
+        for name, row in ((name_a, row_a), (name_b, row_b)):
+            if "archived" in row.keys() and row["archived"]:
+                raise ValueError(f"Checkpoint '{name}' is in cold storage; resume it from its own database first")
+
+        scalars = {}
+        for column in SCALAR_COLUMNS:
+            if column in row_a.keys() and column in row_b.keys() and row_a[column] != row_b[column]:
+                scalars[column] = {"from": _clip(row_a[column]), "to": _clip(row_b[column])}
+
+        tables = {
+            table: _diff_table(conn, table, "main", row_a["id"], schema_b, row_b["id"], limit)
+            for table in TABLE_SPECS
+        }
+
+        return {
+            "status": "success",
+            "from": name_a,
+            "to": name_b,
+            "identical": not scalars and not any(
+                sum(t["counts"].values()) for t in tables.values()
+            ),
+            "scalars": scalars,
+            **tables,
+        }
+    finally:
+        if attach_path:
+            conn.execute("DETACH DATABASE diff_other")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Content Chunking
+Splits file content into request-sized chunks along structural boundaries:
+top-level definitions in code, headings in Markdown, paragraphs elsewhere.
+Comments and decorators directly above a definition stay with it. Segments
+are packed greedily up to the chunk size; a single segment larger than a
+chunk falls back to paragraphs, then lines, and a single line larger than a
+chunk is cut where it has to be.
+"""
+
+import os
+import re
+from typing import Iterable, List, Optional
+
+# Lines that start a new top-level unit, by file extension
+_CODE = {
+    ".py": r"(?:async\s+def|def|class)\s|@",
+    ".js": r"(?:export|function|class|const|let|var|async\s+function)\b",
+    ".go": r"(?:func|type|var|const)\b",
+    ".rs": r"(?:pub|fn|impl|struct|enum|trait|mod|macro_rules!)\b",
+    ".java": r"(?:public|private|protected|class|interface|enum|record|@)",
+    ".c": r"[A-Za-z_][\w\s\*]*\(|(?:struct|typedef|enum|#define)\b",
+    ".sh": r"(?:function\s|[A-Za-z_][\w-]*\s*\(\)\s*\{)",
+    ".sql": r"(?:CREATE|ALTER|INSERT|DROP|WITH|SELECT)\b",
+}
+for _ext, _alias in ((".ts", ".js"), (".tsx", ".js"), (".jsx", ".js"), (".mjs", ".js"), (".kt", ".java"),
+                     (".cs", ".java"), (".h", ".c"), (".cpp", ".c"), (".hpp", ".c"), (".cc", ".c"),
+                     (".bash", ".sh"), (".zsh", ".sh")):
+    _CODE[_ext] = _CODE[_alias]
+BOUNDARIES = {ext: re.compile(pattern, re.IGNORECASE if ext == ".sql" else 0) for ext, pattern in _CODE.items()}
+
+HEADING = re.compile(r"#{1,6}\s")
+MARKDOWN = {".md", ".markdown", ".mdx"}
+
+# Comment prefixes that attach to the definition below them
+COMMENTS = {".py": ("#",), ".sh": ("#",), ".bash": ("#",), ".zsh": ("#",), ".sql": ("--",)}
+DEFAULT_COMMENTS = ("//", "/*", " *", "*/")
+
+
+def split_lines(text: str, size: int) -> List[str]:
+    """Split text into pieces of at most size characters, on line boundaries where possible"""
+    if len(text) <= size:
+        return [text]
+    chunks = []
+    current: List[str] = []
+    length = 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > size:
+            # A single line longer than a chunk is cut where it has to be
+            if current:
+                chunks.append("".join(current))
+                current, length = [], 0
+            chunks.append(line[:size])
+            line = line[size:]
+        if length + len(line) > size and current:
+            chunks.append("".join(current))
+            current, length = [], 0
+        current.append(line)
+        length += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def segments(text: str, path: Optional[str] = None) -> List[str]:
+    """Split text into structural units (concatenating them gives text back)"""
+    ext = os.path.splitext(path or "")[1].lower()
+    lines = text.splitlines(keepends=True)
+    pattern = BOUNDARIES.get(ext)
+    comments = COMMENTS.get(ext, DEFAULT_COMMENTS)
+
+    starts = []
+    for i, line in enumerate(lines):
+        if ext in MARKDOWN:
+            is_start = bool(HEADING.match(line))
+        elif pattern is not None:
+            is_start = bool(pattern.match(line))
+        else:
+            # Paragraphs: first non-blank line after a blank one
+            is_start = bool(line.strip()) and i > 0 and not lines[i - 1].strip()
+        if not is_start or i == 0:
+            continue
+        if pattern is not None and ext not in MARKDOWN:
+            previous = lines[i - 1]
+            if previous.startswith("@") or (previous[:1].strip() and not previous.startswith(comments) and
+                                            pattern.match(previous)):
+                # Decorators and consecutive one-line definitions stay together
+                continue
+            start = i
+            while start > 0 and lines[start - 1].startswith(comments):
+                start -= 1
+            i = start
+        if not starts or i > starts[-1]:
+            starts.append(i)
+
+    bounds = [0] + starts + [len(lines)]
+    return ["".join(lines[a:b]) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def pack(parts: Iterable[str], size: int, separator: str = "") -> List[List[str]]:
+    """Group consecutive parts so each group, joined with separator, stays within size"""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for part in parts:
+        extra = len(part) + (len(separator) if current else 0)
+        if current and length + extra > size:
+            groups.append(current)
+            current, length = [], 0
+            extra = len(part)
+        current.append(part)
+        length += extra
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_structural(text: str, size: int, path: Optional[str] = None) -> List[str]:
+    """
+    Chunks of at most size characters cut on structural boundaries of the
+    file type at path. An oversized unit (a long class, say) is cut on its
+    paragraphs next, then on lines.
+    """
+    if len(text) <= size:
+        return [text]
+    chunks = []
+    for group in pack(segments(text, path), size):
+        if len(group) == 1 and len(group[0]) > size:
+            if path is None:
+                chunks.extend(split_lines(group[0], size))
+            else:
+                chunks.extend(split_structural(group[0], size))
+        else:
+            chunks.append("".join(group))
+    return chunks
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Cold Storage
+Second tier for checkpoints nobody has touched in a while. Their child rows
+(todos, file modifications, decisions, artifacts) move into a separate
+archive database, compressed into one blob per checkpoint, so they stop
+inflating the hot database's scans and page cache. The checkpoint row stays
+behind as a stub (archived = 1) for listing and search; loading it restores
+the rows, ids and timestamps included. The archive is attached to every
+connection as `archive`, so a move commits in the same transaction as the
+hot-side delete. A restored checkpoint keeps its archived copy until it is
+archived again, saved over or deleted, so a backup that copies the hot
+database before the archive never misses rows.
+"""
+
+import json
+import os
+import sqlite3
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+SCHEMA = "archive"
+
+COMPRESSION_LEVEL = 6
+
+
+def archive_path(db_path: str) -> str:
+    """Archive database of a hot database: archive/<same name> beside it"""
+    directory, filename = os.path.split(db_path)
+    return os.path.join(directory, "archive", filename)
+
+
+def attach(conn: sqlite3.Connection, db_path: str):
+    """Attach db_path's archive database to conn as `archive`"""
+    path = archive_path(db_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (path,))
+
+
+def ensure_schema(cursor: sqlite3.Cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.archived_checkpoints (
+            checkpoint_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            raw_bytes INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def archive(cursor: sqlite3.Cursor, checkpoint_id: int, name: str, tables: Iterable[str]) -> Tuple[int, int, int]:
+    """
+    Move a checkpoint's child rows from tables into the archive.
+
+    Returns:
+        (rows moved, uncompressed bytes, compressed bytes)
+    """
+    sections = {}
+    rows = 0
+    for table in tables:
+        cursor.execute(f"SELECT * FROM main.{table} WHERE checkpoint_id = ?", (checkpoint_id,))
+        section = cursor.fetchall()
+        sections[table] = {"columns": [d[0] for d in cursor.description], "rows": section}
+        rows += len(section)
+        cursor.execute(f"DELETE FROM main.{table} WHERE checkpoint_id = ?", (checkpoint_id,))
+
+    raw = json.dumps(sections, separators=(",", ":")).encode()
+    payload = zlib.compress(raw, COMPRESSION_LEVEL)
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO {SCHEMA}.archived_checkpoints (checkpoint_id, name, rows, raw_bytes, payload)
+        VALUES (?, ?, ?, ?, ?)
+    """, (checkpoint_id, name, rows, len(raw), payload))
+    return rows, len(raw), len(payload)
+
+
+def restore(cursor: sqlite3.Cursor, checkpoint_id: int, tables: Iterable[str]) -> int:
+    """
+    Copy a checkpoint's archived rows back into tables. Raises ValueError
+    when the archive has no entry for it.
+
+    Returns:
+        Rows restored
+    """
+    cursor.execute(f"SELECT payload FROM {SCHEMA}.archived_checkpoints WHERE checkpoint_id = ?",
+                   (checkpoint_id,))
+    entry = cursor.fetchone()
+    if entry is None:
+        raise ValueError(f"Archived rows of checkpoint {checkpoint_id} are missing from the archive database")
+
+    sections = json.loads(zlib.decompress(entry[0]))
+    rows = 0
+    for table in tables:
+        section = sections.get(table)
+        if not section or not section["rows"]:
+            continue
+        columns = section["columns"]
+        cursor.executemany(
+            f"INSERT INTO main.{table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            section["rows"]
+        )
+        rows += len(section["rows"])
+    return rows
+
+
+def rehydrate(cursor: sqlite3.Cursor, checkpoint_id: int, tables: Iterable[str]) -> Optional[int]:
+    """
+    Clear a checkpoint's archived flag and restore its rows into tables, in
+    the caller's transaction.
+
+    Returns:
+        Rows restored, or None if it was not archived (e.g. another
+        connection rehydrated it first)
+    """
+    cursor.execute("UPDATE checkpoints SET archived = 0 WHERE id = ? AND archived = 1", (checkpoint_id,))
+    if not cursor.rowcount:
+        return None
+    return restore(cursor, checkpoint_id, tables)
+
+
+def discard(cursor: sqlite3.Cursor, checkpoint_ids: List[int]):
+    """Drop archived rows of checkpoints that were deleted or overwritten"""
+    placeholders = ", ".join("?" for _ in checkpoint_ids)
+    cursor.execute(f"DELETE FROM {SCHEMA}.archived_checkpoints WHERE checkpoint_id IN ({placeholders})",
+                   checkpoint_ids)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Connection Pool
+Keeps a few idle SQLite connections per database so tool calls skip the
+connect and schema parse (and keep a warm page cache) instead of opening a
+fresh connection each time. A leased connection belongs to one caller until
+its with block ends; it then commits or rolls back as sqlite3.Connection
+does, is reset and goes back to the pool.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class _Lease:
+    """Context manager yielding a pooled connection and returning it afterwards"""
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        try:
+            return self._conn.__exit__(*exc)
+        finally:
+            self._pool.release(self._conn)
+
+
+class ConnectionPool:
+    """
+    Bounded set of idle connections to one database.
+
+    Args:
+        open_connection: Opens a new connection; called with
+            check_same_thread=False, since a connection may be leased by a
+            different thread each time
+        size: Idle connections kept; more can be leased at once, the surplus
+            is closed on release
+    """
+
+    def __init__(self, open_connection: Callable[..., sqlite3.Connection], size: int = 4):
+        self._open = open_connection
+        self.size = size
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def lease(self) -> _Lease:
+        """A connection for one with block"""
+        conn: Optional[sqlite3.Connection] = None
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                self.reused += 1
+            else:
+                self.opened += 1
+        if conn is None:
+            conn = self._open(check_same_thread=False)
+        return _Lease(self, conn)
+
+    def release(self, conn: sqlite3.Connection):
+        """Reset a connection and keep it if there is room, else close it"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "opened": self.opened, "reused": self.reused}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Diff Checkpoints
+Shows what changed between two checkpoints (or the same checkpoint in two
+databases, e.g. a backup) without printing either checkpoint in full.
+
+Usage:
+    diff_checkpoints.py <from-name> <to-name> [--to-db PATH] [--limit N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+import cold_storage
+from checkpoint_diff import TABLE_SPECS, diff_checkpoints
+from metrics import Metrics
+from slow_query_log import SlowQueryLog
+
+# Determine DB path: Use env var if set, otherwise default to 'checkpoints.db' in the repo root
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "checkpoints.db")
+DB_PATH = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH)
+SEPARATOR = "=" * 80
+
+SECTION_TITLES = {
+    "todos": "TODOS",
+    "file_modifications": "FILES MODIFIED",
+    "key_decisions": "KEY DECISIONS",
+    "artifacts": "ARTIFACTS",
+}
+
+
+def print_delta(delta):
+    """Print a diff result in the same plain layout as resume_checkpoint.py"""
+    print(f"\n{SEPARATOR}")
+    print(f"DIFF: {delta['from']} -> {delta['to']}")
+    print(SEPARATOR)
+    print()
+
+    if delta["identical"]:
+        print("No differences.")
+        print(SEPARATOR)
+        return
+
+    if delta["scalars"]:
+        print("FIELDS:")
+        for field, change in delta["scalars"].items():
+            print(f"  ~ {field}: {change['from']!r} -> {change['to']!r}")
+        print()
+
+    for table in TABLE_SPECS:
+        section = delta[table]
+        counts = section["counts"]
+        if not any(counts.values()):
+            continue
+        print(f"{SECTION_TITLES[table]} (+{counts['added']} -{counts['removed']} ~{counts['changed']}):")
+        for key in section["added"]:
+            print(f"  + {key}")
+        for key in section["removed"]:
+            print(f"  - {key}")
+        for change in section["changed"]:
+            fields = ", ".join(f"{f}: {v['from']!r} -> {v['to']!r}" for f, v in change["fields"].items())
+            print(f"  ~ {change['key']} ({fields})")
+        if section["truncated"]:
+            print("  ... (truncated, raise --limit to see more)")
+        print()
+
+    print(SEPARATOR)
+
+
+def rehydrate(conn, names):
+    """Move archived checkpoints' rows back from cold storage, as the server does before a diff."""
+    if "archived" not in {row[1] for row in conn.execute("PRAGMA table_info(checkpoints)")}:
+        return
+    placeholders = ", ".join("?" for _ in names)
+    archived = conn.execute(
+        f"SELECT id FROM checkpoints WHERE archived = 1 AND name IN ({placeholders})", names
+    ).fetchall()
+    if not archived:
+        return
+    cold_storage.attach(conn, DB_PATH)
+    cursor = conn.cursor()
+    for (checkpoint_id,) in archived:
+        cold_storage.rehydrate(cursor, checkpoint_id, TABLE_SPECS)
+    conn.commit()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Diff two checkpoints")
+    parser.add_argument("from_name")
+    parser.add_argument("to_name")
+    parser.add_argument("--to-db", help="Database holding the 'to' checkpoint (default: same database)")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum keys listed per category")
+    parser.add_argument("--json", action="store_true", help="Print the delta as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f"Error: Database not found at {DB_PATH}", file=sys.stderr)
+        sys.exit(1)
+
+    conn = Metrics(slow_query_log=SlowQueryLog.from_env()).connect(DB_PATH)
+    try:
+        # Checkpoints in --to-db are left alone; diff_checkpoints refuses archived ones there
+        rehydrate(conn, [args.from_name] if args.to_db else [args.from_name, args.to_name])
+        delta = diff_checkpoints(conn, args.from_name, args.to_name, attach_path=args.to_db, limit=args.limit)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    if args.json:
+        print(json.dumps(delta, indent=2))
+    else:
+        print_delta(delta)
+
+
+if __name__ == "__main__":
+    main()
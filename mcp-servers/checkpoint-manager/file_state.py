@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+File State Capture
+Records size, mtime and git blob hash for a checkpoint's modified files and
+later reports which of them drifted. Stats come from os.stat; hashes come from
+one batched `git hash-object --stdin-paths` call (or an identical pure-Python
+blob hash when git is unavailable), never one subprocess per file.
+"""
+
+import hashlib
+import os
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional
+
+GIT_TIMEOUT = 30
+
+
+def resolve_path(working_directory: Optional[str], file_path: str) -> str:
+    """Absolute path of a recorded file, relative paths taken from working_directory"""
+    path = os.path.expanduser(file_path)
+    if not os.path.isabs(path):
+        path = os.path.join(working_directory or os.getcwd(), path)
+    return os.path.normpath(path)
+
+
+def _blob_hash(path: str) -> str:
+    """Same result as `git hash-object --no-filters <path>`"""
+    digest = hashlib.sha1()
+    digest.update(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths: List[str], cwd: Optional[str] = None) -> Dict[str, str]:
+    """
+    Git blob hashes for many files using a single git invocation. Files that
+    cannot be read (e.g. deleted since they were stat'ed) are left out.
+    """
+    if not paths:
+        return {}
+    try:
+        result = subprocess.run(
+            ["git", "hash-object", "--no-filters", "--stdin-paths"],
+            input="\n".join(paths) + "\n",
+            capture_output=True,
+            text=True,
+            cwd=cwd if cwd and os.path.isdir(cwd) else None,
+            timeout=GIT_TIMEOUT,
+            check=True,
+        )
+        hashes = result.stdout.split()
+        if len(hashes) == len(paths):
+            return dict(zip(paths, hashes))
+    except (OSError, subprocess.SubprocessError):
+        pass
+    # git missing or failed: hash in-process (slower, same hashes)
+    hashes = {}
+    for path in paths:
+        try:
+            hashes[path] = _blob_hash(path)
+        except OSError:
+            continue
+    return hashes
+
+
+def git_summary(working_directory: Optional[str]) -> Dict[str, Any]:
+    """Branch, HEAD commit and porcelain status from one `git status` call"""
+    if not working_directory or not os.path.isdir(working_directory):
+        return {}
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain=v2", "--branch"],
+            capture_output=True,
+            text=True,
+            cwd=working_directory,
+            timeout=GIT_TIMEOUT,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return {}
+
+    summary: Dict[str, Any] = {}
+    changes = []
+    for line in result.stdout.splitlines():
+        if line.startswith("# branch.oid "):
+            oid = line.split(" ", 2)[2]
+            summary["git_head"] = None if oid == "(initial)" else oid
+        elif line.startswith("# branch.head "):
+            head = line.split(" ", 2)[2]
+            summary["git_branch"] = None if head == "(detached)" else head
+        elif not line.startswith("#"):
+            changes.append(line)
+    summary["git_status"] = "\n".join(changes)
+    return summary
+
+
+def capture(working_directory: Optional[str], file_paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Stat and hash recorded files that currently exist.
+
+    Returns:
+        {file_path: {"size", "mtime_ns", "blob_hash"}} keyed by the path as recorded
+    """
+    stats = {}
+    for file_path in file_paths:
+        path = resolve_path(working_directory, file_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            stats[file_path] = (path, st)
+
+    hashes = hash_files([path for path, _ in stats.values()], cwd=working_directory)
+    return {
+        file_path: {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "blob_hash": hashes.get(path)}
+        for file_path, (path, st) in stats.items()
+    }
+
+
+def verify(working_directory: Optional[str], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare recorded file state with the filesystem.
+
+    Stat first: same size and mtime means unchanged, a different size means
+    drifted. Only files whose size matches but mtime moved are hashed, all in
+    one batch.
+
+    Args:
+        records: Rows with file_path, status, size, mtime_ns, blob_hash
+
+    Returns:
+        Summary with drifted, missing, reappeared and unrecorded files
+    """
+    drifted = []
+    missing = []
+    reappeared = []
+    unrecorded = []
+    unchanged = 0
+    to_hash = {}
+
+    for record in records:
+        file_path = record["file_path"]
+        path = resolve_path(working_directory, file_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+
+        if record.get("status") == "deleted":
+            if st is None:
+                unchanged += 1
+            else:
+                reappeared.append(file_path)
+            continue
+        if record.get("size") is None:
+            unrecorded.append(file_path)
+            continue
+        if st is None:
+            missing.append(file_path)
+        elif st.st_size != record["size"]:
+            drifted.append({"file_path": file_path, "reason": "size", "size": [record["size"], st.st_size]})
+        elif st.st_mtime_ns == record["mtime_ns"]:
+            unchanged += 1
+        else:
+            to_hash[path] = record
+
+    hashes = hash_files(list(to_hash), cwd=working_directory)
+    hashed = len(to_hash)
+    for path, record in to_hash.items():
+        if hashes.get(path) == record["blob_hash"]:
+            unchanged += 1
+        else:
+            drifted.append({"file_path": record["file_path"], "reason": "content"})
+
+    return {
+        "unchanged": unchanged,
+        "drifted": drifted,
+        "missing": missing,
+        "reappeared": reappeared,
+        "unrecorded": unrecorded,
+        "hashed": hashed,
+    }
@@ -6,7 +6,11 @@ import sqlite3
 import os
 from datetime import datetime
 
-DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+from metrics import Metrics
+from slow_query_log import SlowQueryLog
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+DB_PATH = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH)
 
 def format_timestamp(timestamp_str):
     """Format ISO timestamp to readable format."""
@@ -41,7 +45,8 @@ def list_checkpoints():
         return 0
 
     try:
-        conn = sqlite3.connect(DB_PATH)
+        # Plain connection unless CHECKPOINT_SLOW_QUERY_MS enables the slow query log
+        conn = Metrics(slow_query_log=SlowQueryLog.from_env()).connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
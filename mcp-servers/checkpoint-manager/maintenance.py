@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Maintenance
+Retention policy and a background worker that prunes stale checkpoints in
+small batches, moves untouched ones to cold storage, expires abandoned
+staged saves and compacts the database while the server is idle.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("checkpoint-manager")
+
+
+def _env_int(name: str) -> Optional[int]:
+    """Read an optional positive integer from the environment"""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+class RetentionPolicy:
+    """
+    Which checkpoints to keep. Pinned checkpoints are always kept.
+
+    Args:
+        max_count: Keep at most this many checkpoints overall
+        max_age_days: Drop checkpoints not updated for this many days
+        max_per_branch: Keep at most this many per (working_directory, git_branch)
+    """
+
+    def __init__(
+        self,
+        max_count: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+        max_per_branch: Optional[int] = None,
+    ):
+        self.max_count = max_count
+        self.max_age_days = max_age_days
+        self.max_per_branch = max_per_branch
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build from CHECKPOINT_RETENTION_* environment variables"""
+        return cls(
+            max_count=_env_int("CHECKPOINT_RETENTION_MAX_COUNT"),
+            max_age_days=_env_int("CHECKPOINT_RETENTION_MAX_AGE_DAYS"),
+            max_per_branch=_env_int("CHECKPOINT_RETENTION_MAX_PER_BRANCH"),
+        )
+
+    def is_empty(self) -> bool:
+        """True when no limit is configured (nothing is ever pruned)"""
+        return self.max_count is None and self.max_age_days is None and self.max_per_branch is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_count": self.max_count,
+            "max_age_days": self.max_age_days,
+            "max_per_branch": self.max_per_branch,
+        }
+
+
+class MaintenanceWorker:
+    """
+    Periodically prunes checkpoints and compacts the database on a daemon thread.
+
+    Pruning runs in batches of batch_size, each in its own short transaction
+    with a pause in between so tool calls are never blocked for long.
+    Checkpoints neither updated nor read for archive_after_days move to cold
+    storage the same way. Compaction (incremental vacuum, ANALYZE, PRAGMA
+    optimize) only runs once no tool call has been seen for idle_seconds.
+
+    Args:
+        manager: CheckpointManager to maintain
+        policy: Retention policy to enforce
+        interval: Seconds between maintenance passes (0 disables the thread)
+        idle_seconds: Required quiet period before compacting
+        batch_size: Checkpoints deleted per transaction
+        batch_pause: Seconds to sleep between batches
+        archive_after_days: Days untouched before cold storage (None disables)
+    """
+
+    def __init__(
+        self,
+        manager,
+        policy: RetentionPolicy,
+        interval: float = 600.0,
+        idle_seconds: float = 30.0,
+        batch_size: int = 50,
+        batch_pause: float = 0.05,
+        archive_after_days: Optional[float] = None,
+    ):
+        self.manager = manager
+        self.policy = policy
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.archive_after_days = archive_after_days
+        self.last_activity = time.monotonic()
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, manager) -> "MaintenanceWorker":
+        """Build from CHECKPOINT_MAINTENANCE_* and CHECKPOINT_RETENTION_* variables"""
+        return cls(
+            manager,
+            RetentionPolicy.from_env(),
+            interval=float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL", "600")),
+            idle_seconds=float(os.getenv("CHECKPOINT_MAINTENANCE_IDLE_SECONDS", "30")),
+            batch_size=int(os.getenv("CHECKPOINT_MAINTENANCE_BATCH_SIZE", "50")),
+            archive_after_days=float(os.getenv("CHECKPOINT_ARCHIVE_AFTER_DAYS") or 0) or None,
+        )
+
+    def note_activity(self):
+        """Record that a tool call happened (postpones idle compaction)"""
+        self.last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self.last_activity >= self.idle_seconds
+
+    def start(self):
+        """Start the background thread (no-op if the interval is 0)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Maintenance worker started (every {self.interval:.0f}s, policy {self.policy.to_dict()})")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self, dry_run: bool = False, compact: Optional[bool] = None,
+                 archive_after_days: Optional[float] = None, vacuum: bool = False) -> Dict[str, Any]:
+        """
+        Run one maintenance pass.
+
+        Args:
+            dry_run: Only report what would be pruned or archived
+            compact: Force compaction on/off; None compacts only when idle
+            archive_after_days: Override the cold-storage threshold for this pass
+            vacuum: Allow the one-off full VACUUM of a database not yet in
+                incremental auto-vacuum mode (never done by the background thread)
+
+        Returns:
+            Report with pruned and archived checkpoint names and reclaimed bytes
+        """
+        with self._run_lock:
+            started = time.perf_counter()
+            pruned = []
+
+            while True:
+                result = self.manager.prune_checkpoints(self.policy, self.batch_size, dry_run=dry_run)
+                pruned.extend(result["pruned"])
+                if dry_run or len(result["pruned"]) < self.batch_size or self._stop.is_set():
+                    break
+                time.sleep(self.batch_pause)
+
+            # One sweep per pass: it scans every child table
+            orphans = 0 if dry_run or self.policy.is_empty() else self.manager.remove_orphans()
+
+            archived = []
+            archived_rows = 0
+            archive_after_days = archive_after_days or self.archive_after_days
+            while archive_after_days:
+                result = self.manager.archive_checkpoints(archive_after_days, self.batch_size, dry_run=dry_run)
+                archived.extend(result["archived"])
+                archived_rows += result["rows"]
+                if dry_run or len(result["archived"]) < self.batch_size or self._stop.is_set():
+                    break
+                time.sleep(self.batch_pause)
+
+            expired = 0 if dry_run else self.manager.expire_save_sessions()
+
+            if compact is None:
+                compact = not dry_run and (vacuum or self.is_idle())
+            compaction = None
+            if compact and not dry_run:
+                # Planner statistics only go stale when rows were removed
+                compaction = self.manager.compact(analyze=bool(pruned or orphans or archived), vacuum=vacuum)
+
+            report = {
+                "status": "success",
+                "ran_at": datetime.now().isoformat(timespec="seconds"),
+                "dry_run": dry_run,
+                "policy": self.policy.to_dict(),
+                "pruned_count": len(pruned),
+                "pruned": pruned,
+                "orphans_removed": orphans,
+                "archive_after_days": archive_after_days,
+                "archived_count": len(archived),
+                "archived": archived,
+                "archived_rows": archived_rows,
+                "expired_save_sessions": expired,
+                "compaction": compaction,
+                "reclaimed_bytes": compaction["reclaimed_bytes"] if compaction else 0,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            if not dry_run:
+                self.last_report = report
+            return report
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                report = self.run_once()
+                if report["pruned_count"] or report["archived_count"] or report["reclaimed_bytes"]:
+                    logger.info(
+                        f"Maintenance pruned {report['pruned_count']} checkpoints, "
+                        f"archived {report['archived_count']}, "
+                        f"reclaimed {report['reclaimed_bytes']} bytes"
+                    )
+            except Exception as e:
+                logger.error(f"Maintenance pass failed: {e}")
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Manager Metrics
+Per-tool call counts, latency histograms, payload sizes and SQLite statement
+timings for the checkpoint MCP server. Disabled by default; when neither
+metrics nor the slow query log are enabled, connections are plain sqlite3
+connections and all bookkeeping is skipped.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from slow_query_log import SlowQueryLog
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is +Inf)
+LATENCY_BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Tool currently being served, so statement stats can be attributed to it
+_current_tool: contextvars.ContextVar = contextvars.ContextVar("checkpoint_current_tool", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so the same statement always maps to one key"""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)"""
+
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        """Record one observation in milliseconds"""
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value_ms
+        self.count += 1
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export as a JSON-friendly dict with cumulative bucket counts"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS_MS + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+class ToolStats:
+    """Aggregated counters for one MCP tool"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.statements = 0
+
+
+class StatementStats:
+    """Aggregated counters for one normalised SQL statement"""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.rows_read = 0
+        self.rows_written = 0
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute*() calls and counts rows read and written"""
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(sql, parameters, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(sql, seq_of_parameters[0] if seq_of_parameters else (), start)
+
+    def executescript(self, sql_script):
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._record(sql_script, (), start)
+
+    def __next__(self):
+        row = super().__next__()
+        self.connection.metrics.record_rows_read(self._sql, 1)
+        return row
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self.connection.metrics.record_rows_read(self._sql, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        self.connection.metrics.record_rows_read(self._sql, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self.connection.metrics.record_rows_read(self._sql, len(rows))
+        return rows
+
+    def _record(self, sql: str, parameters: Any, start: float):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._sql = sql
+        metrics = self.connection.metrics
+        metrics.record_statement(sql, elapsed_ms, max(self.rowcount, 0))
+        if metrics.slow_query_log is not None:
+            metrics.slow_query_log.observe(self.connection, sql, parameters, elapsed_ms)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors are instrumented. sqlite3.Connection.execute and
+    friends run their statement on a new cursor from C, bypassing the cursor's
+    Python-level execute(), so they are routed through cursor() here.
+    """
+
+    metrics: "Metrics" = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+class Metrics:
+    """
+    Collects tool and statement metrics for the checkpoint server.
+
+    Args:
+        enabled: Whether to collect anything at all
+        dump_path: Optional file to periodically write metrics to
+        dump_format: 'prometheus' (file rewritten in text exposition format)
+                     or 'jsonl' (one JSON snapshot appended per dump)
+        dump_interval: Minimum seconds between dumps
+        slow_query_log: Optional SlowQueryLog fed from the same statement timings
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        dump_path: Optional[str] = None,
+        dump_format: str = "jsonl",
+        dump_interval: float = 60.0,
+        slow_query_log: Optional[SlowQueryLog] = None,
+    ):
+        if dump_format not in ("prometheus", "jsonl"):
+            raise ValueError(f"Unknown metrics dump format: {dump_format}")
+
+        self.enabled = enabled
+        self.dump_path = os.path.expanduser(dump_path) if dump_path else None
+        self.dump_format = dump_format
+        self.dump_interval = dump_interval
+        self.slow_query_log = slow_query_log
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+        # Startup facts, kept across reset(): each tool's first call and the warm-up report
+        self._created = time.monotonic()
+        self.first_calls: Dict[str, Dict[str, Any]] = {}
+        self.warmup: Optional[Dict[str, Any]] = None
+        self.reset()
+
+        if self.enabled and self.dump_path:
+            atexit.register(self.dump)
+
+    @classmethod
+    def from_env(cls) -> "Metrics":
+        """Build from CHECKPOINT_METRICS* environment variables"""
+        return cls(
+            enabled=os.getenv("CHECKPOINT_METRICS", "").lower() in ("1", "true", "yes"),
+            dump_path=os.getenv("CHECKPOINT_METRICS_DUMP"),
+            dump_format=os.getenv("CHECKPOINT_METRICS_FORMAT", "jsonl"),
+            dump_interval=float(os.getenv("CHECKPOINT_METRICS_DUMP_INTERVAL", "60")),
+            slow_query_log=SlowQueryLog.from_env(),
+        )
+
+    def reset(self):
+        """Clear all collected metrics"""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self.tools: Dict[str, ToolStats] = {}
+            self.statements: Dict[str, StatementStats] = {}
+
+    def connect(self, db_path: str, **kwargs) -> sqlite3.Connection:
+        """Open a connection, instrumented only when metrics or the slow log are on"""
+        if not self.enabled and self.slow_query_log is None:
+            return sqlite3.connect(db_path, **kwargs)
+        conn = sqlite3.connect(db_path, factory=InstrumentedConnection, **kwargs)
+        conn.metrics = self
+        return conn
+
+    # Tool-level hooks
+
+    def start_tool(self, name: str) -> Optional[contextvars.Token]:
+        """Mark the start of a tool call; returns a token for finish_tool"""
+        if not self.enabled:
+            return None
+        return _current_tool.set(name)
+
+    def finish_tool(
+        self,
+        token: Optional[contextvars.Token],
+        name: str,
+        elapsed_ms: float,
+        bytes_in: int,
+        bytes_out: int,
+        error: bool,
+    ):
+        """Record a completed tool call and dump if the interval has passed"""
+        if token is None:
+            return
+        _current_tool.reset(token)
+        with self._lock:
+            stats = self.tools.setdefault(name, ToolStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(elapsed_ms)
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            if name not in self.first_calls:
+                self.first_calls[name] = {
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "seconds_after_start": round(time.monotonic() - self._created, 3),
+                    "after_warmup": self.warmup is not None,
+                }
+        if self.dump_path and time.monotonic() - self._last_dump >= self.dump_interval:
+            self.dump()
+
+    def record_warmup(self, report: Dict[str, Any]):
+        """Keep the startup warm-up report, to compare first calls against"""
+        with self._lock:
+            self.warmup = report
+
+    # Statement-level hooks (called by InstrumentedCursor)
+
+    def record_statement(self, sql: str, elapsed_ms: float, rows_written: int):
+        """Record one executed statement"""
+        if not self.enabled:
+            return
+        key = normalize_sql(sql)
+        is_write = not key[:6].upper().startswith("SELECT")
+        written = rows_written if is_write else 0
+        with self._lock:
+            stats = self.statements.setdefault(key, StatementStats())
+            stats.latency.observe(elapsed_ms)
+            stats.rows_written += written
+            tool = _current_tool.get()
+            if tool is not None:
+                tool_stats = self.tools.setdefault(tool, ToolStats())
+                tool_stats.statements += 1
+                tool_stats.rows_written += written
+
+    def record_rows_read(self, sql: Optional[str], rows: int):
+        """Record rows fetched from a statement's result set"""
+        if not rows or not self.enabled:
+            return
+        with self._lock:
+            if sql is not None:
+                self.statements.setdefault(normalize_sql(sql), StatementStats()).rows_read += rows
+            tool = _current_tool.get()
+            if tool is not None:
+                self.tools.setdefault(tool, ToolStats()).rows_read += rows
+
+    # Export
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-friendly dict"""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "latency": s.latency.to_dict(),
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                    "rows_read": s.rows_read,
+                    "rows_written": s.rows_written,
+                    "statements": s.statements,
+                }
+                for name, s in self.tools.items()
+            }
+            statements = [
+                {
+                    "sql": sql,
+                    "latency": s.latency.to_dict(),
+                    "rows_read": s.rows_read,
+                    "rows_written": s.rows_written,
+                }
+                for sql, s in self.statements.items()
+            ]
+        statements.sort(key=lambda s: s["latency"]["sum_ms"], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "since": self.started_at,
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+            "tools": tools,
+            "statements": statements,
+            "first_calls": dict(self.first_calls),
+            "warmup": self.warmup,
+        }
+
+    def render_prometheus(self) -> str:
+        """Render tool metrics in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def family(metric: str, kind: str, help_text: str):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+
+        family("checkpoint_tool_calls_total", "counter", "Tool calls handled")
+        for tool, s in snap["tools"].items():
+            lines.append(f'checkpoint_tool_calls_total{{tool="{tool}"}} {s["calls"]}')
+
+        family("checkpoint_tool_errors_total", "counter", "Tool calls that returned an error")
+        for tool, s in snap["tools"].items():
+            lines.append(f'checkpoint_tool_errors_total{{tool="{tool}"}} {s["errors"]}')
+
+        family("checkpoint_tool_latency_ms", "histogram", "Tool call latency in milliseconds")
+        for tool, s in snap["tools"].items():
+            for bound, count in s["latency"]["buckets"].items():
+                lines.append(f'checkpoint_tool_latency_ms_bucket{{tool="{tool}",le="{bound}"}} {count}')
+            lines.append(f'checkpoint_tool_latency_ms_sum{{tool="{tool}"}} {s["latency"]["sum_ms"]}')
+            lines.append(f'checkpoint_tool_latency_ms_count{{tool="{tool}"}} {s["latency"]["count"]}')
+
+        for metric, key, help_text in (
+            ("checkpoint_tool_bytes_in_total", "bytes_in", "Tool argument payload bytes"),
+            ("checkpoint_tool_bytes_out_total", "bytes_out", "Tool response payload bytes"),
+            ("checkpoint_tool_rows_read_total", "rows_read", "Rows fetched by tool calls"),
+            ("checkpoint_tool_rows_written_total", "rows_written", "Rows written by tool calls"),
+            ("checkpoint_tool_statements_total", "statements", "SQL statements executed by tool calls"),
+        ):
+            family(metric, "counter", help_text)
+            for tool, s in snap["tools"].items():
+                lines.append(f'{metric}{{tool="{tool}"}} {s[key]}')
+
+        family("checkpoint_tool_first_call_ms", "gauge", "Latency of each tool's first call since start")
+        for tool, first in snap["first_calls"].items():
+            lines.append(f'checkpoint_tool_first_call_ms{{tool="{tool}"}} {first["elapsed_ms"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Write metrics to dump_path in the configured format"""
+        if not self.dump_path:
+            return
+        self._last_dump = time.monotonic()
+        os.makedirs(os.path.dirname(self.dump_path) or ".", exist_ok=True)
+        if self.dump_format == "prometheus":
+            # Rewrite atomically so scrapers never see a partial file
+            tmp_path = f"{self.dump_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, self.dump_path)
+        else:
+            with open(self.dump_path, "a") as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Name Index
+Fuzzy lookup of checkpoint names, so a mistyped name is answered with the few
+closest names instead of a bare "not found" (or a dump of every checkpoint).
+Names are kept in an FTS5 table with the trigram tokenizer, maintained by
+triggers on the indexed table, so writers that bypass the server (the CLI
+scripts) keep it current too. A miss looks up names sharing trigrams with
+the query and ranks those candidates by trigram similarity. Where SQLite
+lacks FTS5 trigram support, or the index was never created, names are
+compared one by one instead. Exact names and unique prefixes resolve through
+the table's own name index.
+"""
+
+import difflib
+import sqlite3
+from typing import List, Optional
+
+# Candidates fetched from the index before ranking by similarity
+CANDIDATES = 50
+
+# Minimum trigram similarity (shared / combined trigrams) for a suggestion
+MIN_SIMILARITY = 0.2
+
+# Highest code point, for turning a prefix into an indexable range
+PREFIX_END = "\U0010ffff"
+
+# Matches listed when a prefix is ambiguous
+AMBIGUOUS_SHOWN = 10
+
+
+def _index(table: str) -> str:
+    return f"{table}_names"
+
+
+def ensure_schema(cursor: sqlite3.Cursor, table: str = "checkpoints", key: str = "id") -> bool:
+    """
+    Create the trigram name index of table, filled from its current rows on
+    creation and kept in sync by triggers. The index stores its own copy of
+    the names, so rows replaced without firing delete triggers (INSERT OR
+    REPLACE) leave at most a stale entry that lookups skip.
+
+    Returns:
+        False when this SQLite build has no FTS5 trigram tokenizer
+    """
+    index = _index(table)
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)
+    ).fetchone()
+    if not exists:
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE {index} USING fts5(name, tokenize = 'trigram')")
+        except sqlite3.OperationalError:
+            return False
+        cursor.execute(f"INSERT INTO {index} (rowid, name) SELECT {key}, name FROM {table}")
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {index} (rowid, name) VALUES (new.{key}, new.name);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {index} WHERE rowid = old.{key};
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_rename AFTER UPDATE OF name ON {table} BEGIN
+            DELETE FROM {index} WHERE rowid = old.{key};
+            INSERT INTO {index} (rowid, name) VALUES (new.{key}, new.name);
+        END
+    """)
+    return True
+
+
+def trigrams(text: str) -> set:
+    """Lowercase trigrams of text, padded so short names and word edges count"""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Shared trigrams over all trigrams of both (as pg_trgm's similarity)"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def _candidates(conn: sqlite3.Connection, name: str, table: str, key: str) -> Optional[List[str]]:
+    """Names sharing at least one trigram with name; None without the index"""
+    index = _index(table)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)).fetchone():
+        return None
+    lowered = name.lower()
+    grams = {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+    if not grams:
+        return []
+    query = " OR ".join('"{}"'.format(gram.replace('"', '""')) for gram in sorted(grams))
+    # Joined back to the table so stale index entries never surface
+    rows = conn.execute(f"""
+        SELECT t.name
+        FROM {index} JOIN {table} t ON t.{key} = {index}.rowid
+        WHERE {index} MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """, (query, CANDIDATES))
+    return [row[0] for row in rows]
+
+
+def suggest(conn: sqlite3.Connection, name: str, limit: int = 5,
+            table: str = "checkpoints", key: str = "id") -> List[str]:
+    """
+    Closest existing names to name, best first.
+
+    Candidates come from the trigram index (or every name when there is
+    none), names starting with name are always included, and all are ranked
+    by trigram similarity.
+    """
+    candidates = _candidates(conn, name, table, key)
+    if candidates is None:
+        candidates = [row[0] for row in conn.execute(f"SELECT name FROM {table}")]
+    candidates = list(dict.fromkeys(prefix_matches(conn, name, limit, table) + candidates))
+
+    scored = [(similarity(name, candidate), candidate) for candidate in candidates]
+    ranked = sorted(
+        (item for item in scored if item[0] >= MIN_SIMILARITY or item[1].startswith(name)),
+        key=lambda item: (-item[0], item[1])
+    )
+    if not ranked:
+        # Very short or heavily garbled names share too few trigrams
+        return difflib.get_close_matches(name, candidates, n=limit)
+    return [candidate for _, candidate in ranked[:limit]]
+
+
+def prefix_matches(conn: sqlite3.Connection, prefix: str, limit: int = 2,
+                   table: str = "checkpoints") -> List[str]:
+    """Names starting with prefix (case-sensitive), in name order"""
+    rows = conn.execute(
+        f"SELECT name FROM {table} WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+        (prefix, prefix + PREFIX_END, limit)
+    )
+    return [row[0] for row in rows]
+
+
+def resolve(conn: sqlite3.Connection, name: str, table: str = "checkpoints") -> Optional[str]:
+    """
+    The name itself if it exists, else the only name it is a prefix of, else
+    None when no name starts with it. Raises ValueError listing the matches
+    when it is a prefix of several names.
+    """
+    matches = prefix_matches(conn, name, AMBIGUOUS_SHOWN + 1, table)
+    if name in matches:
+        return name
+    if len(matches) <= 1:
+        return matches[0] if matches else None
+    shown = ", ".join(matches[:AMBIGUOUS_SHOWN]) + (", ..." if len(matches) > AMBIGUOUS_SHOWN else "")
+    raise ValueError(f"Checkpoint name '{name}' is an ambiguous prefix, matches: {shown}")
+
+
+def not_found(conn: sqlite3.Connection, name: str, table: str = "checkpoints", key: str = "id") -> ValueError:
+    """The "not found" error for name, naming the closest checkpoints"""
+    suggestions = suggest(conn, name, table=table, key=key)
+    if not suggestions:
+        return ValueError(f"Checkpoint '{name}' not found")
+    return ValueError(f"Checkpoint '{name}' not found. Closest names: {', '.join(suggestions)}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Compact Checkpoint Records
+Column-oriented storage for checkpoint child rows. Instead of one dict per
+row, each column is a list; low-cardinality columns (status, priority,
+artifact type) hold interned strings, and file paths share a directory
+prefix table. YAML is rendered in fixed-size chunks, so PyYAML's node tree
+never covers more than a chunk of rows at a time.
+"""
+
+import sqlite3
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import yaml
+
+# Rows rendered per yaml.dump call
+CHUNK_SIZE = 500
+
+
+class PathTable:
+    """Directory prefixes shared by many file paths"""
+
+    __slots__ = ("directories", "_index")
+
+    def __init__(self):
+        self.directories: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def split(self, path: Optional[str]):
+        """Return (directory id, basename) for a path, registering its directory"""
+        if path is None:
+            return 0xFFFFFFFF, None
+        directory, sep, base = path.rpartition("/")
+        key = directory + sep
+        index = self._index.get(key)
+        if index is None:
+            index = len(self.directories)
+            self.directories.append(key)
+            self._index[key] = index
+        return index, base
+
+    def join(self, index: int, base: Optional[str]) -> Optional[str]:
+        if base is None:
+            return None
+        return self.directories[index] + base
+
+
+class ChildRows:
+    """
+    Rows of one child table stored by column.
+
+    Args:
+        fields: Column names, in output order
+        interned: Columns with few distinct values (stored as interned strings)
+        path_field: Column holding file paths (stored via a PathTable)
+    """
+
+    __slots__ = ("fields", "columns", "interned", "path_field", "paths", "_dirs", "_count")
+
+    def __init__(self, fields: Sequence[str], interned: Iterable[str] = (), path_field: Optional[str] = None):
+        self.fields = list(fields)
+        self.interned = frozenset(interned)
+        self.path_field = path_field
+        self.paths = PathTable() if path_field else None
+        self._dirs = array("I")
+        self.columns: Dict[str, List[Any]] = {field: [] for field in self.fields}
+        self._count = 0
+
+    @classmethod
+    def from_cursor(cls, cursor: sqlite3.Cursor, interned: Iterable[str] = (),
+                    path_field: Optional[str] = None, batch: int = 1000) -> "ChildRows":
+        """Consume an executed cursor in batches without building per-row dicts"""
+        rows = cls([d[0] for d in cursor.description], interned, path_field)
+        while True:
+            chunk = cursor.fetchmany(batch)
+            if not chunk:
+                break
+            rows.extend(chunk)
+        return rows
+
+    def extend(self, tuples: Iterable[Sequence[Any]]):
+        """Append rows given as tuples in field order"""
+        intern = sys.intern
+        for values in tuples:
+            for field, value in zip(self.fields, values):
+                if field == self.path_field:
+                    directory, value = self.paths.split(value)
+                    self._dirs.append(directory)
+                elif field in self.interned and isinstance(value, str):
+                    value = intern(value)
+                self.columns[field].append(value)
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def value(self, field: str, index: int) -> Any:
+        if field == self.path_field:
+            return self.paths.join(self._dirs[index], self.columns[field][index])
+        return self.columns[field][index]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {field: self.value(field, index) for field in self.fields}
+
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """Rows as short-lived dicts, size at a time"""
+        for start in range(0, self._count, size):
+            yield [self.row(i) for i in range(start, min(start + size, self._count))]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in range(self._count)]
+
+
+def dump_section(key: str, rows, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    YAML for `{key: rows}`, identical to yaml.dump of the whole mapping but
+    rendered chunk by chunk. rows may be ChildRows or a list of dicts.
+    """
+    if not len(rows):
+        return yaml.dump({key: []}, default_flow_style=False, sort_keys=False)
+
+    if isinstance(rows, ChildRows):
+        chunks = rows.chunks(chunk_size)
+    else:
+        chunks = (rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size))
+
+    # PyYAML does not indent sequences nested in a mapping, so a top-level
+    # list renders exactly like the value under the (plain) key
+    parts = [f"{key}:\n"]
+    for chunk in chunks:
+        parts.append(yaml.dump(chunk, default_flow_style=False, sort_keys=False))
+    return "".join(parts)
@@ -2,25 +2,54 @@
 """
 Resume Checkpoint Viewer
 Retrieves and displays checkpoint data from the SQLite database in a
-structured format that's easy for Claude to parse.
+structured format that's easy for Claude to parse. Rows are streamed from
+the database cursor straight to stdout, so output starts immediately and
+memory stays flat however large the checkpoint is.
+
+Usage:
+    resume_checkpoint.py <name> [--sections todos,key_decisions] [--limit N] [--format text|json|yaml] [--resolve]
 """
 
+import argparse
+import json
 import sys
 import sqlite3
 import os
 from datetime import datetime
 import textwrap
 
+import yaml
+
+import cold_storage
+import name_index
+from metrics import Metrics
+from slow_query_log import SlowQueryLog
+
 # Determine DB path: Use env var if set, otherwise default to 'checkpoints.db' in the repo root
 DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "checkpoints.db")
 DB_PATH = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH)
 SEPARATOR = "=" * 80
 
+# Output sections, matching the MCP server's resume sections
+SECTIONS = ["checkpoint", "todos", "file_modifications", "key_decisions", "artifacts"]
+CHILD_SECTIONS = SECTIONS[1:]
+SECTION_TITLES = {
+    "todos": "TODOS",
+    "file_modifications": "FILES MODIFIED",
+    "key_decisions": "KEY DECISIONS",
+    "artifacts": "ARTIFACTS",
+}
+
+# Rows fetched per cursor round trip, and stdout buffer size
+FETCH_SIZE = 500
+OUTPUT_BUFFER = 64 * 1024
+
 
 def get_db_connection():
     """Create and return a database connection."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        # Plain connection unless CHECKPOINT_SLOW_QUERY_MS enables the slow query log
+        conn = Metrics(slow_query_log=SlowQueryLog.from_env()).connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         return conn
     except sqlite3.Error as e:
@@ -56,7 +85,7 @@ def wrap_text(text, width=80, initial_indent="", subsequent_indent=""):
 def format_todo(todo):
     """Format a single todo item."""
     status = todo['status'] if todo['status'] else 'pending'
-    content = todo['content'] if todo['content'] else 'Untitled'
+    title = todo['title'] if todo['title'] else 'Untitled'
 
     # Create status indicator
     status_map = {
@@ -66,25 +95,33 @@ def format_todo(todo):
     }
     status_indicator = status_map.get(status, f'[{status}]')
 
-    return f"  {status_indicator} {content}"
+    output = f"  {status_indicator} {title}"
+    if todo['description']:
+        output += "\n" + wrap_text(todo['description'], width=76, initial_indent="      ", subsequent_indent="      ")
+    return output
 
 
 def format_file_modification(file_mod):
     """Format a single file modification."""
-    action = file_mod['modification_type'] if file_mod['modification_type'] else 'modified'
+    action = file_mod['status'] if file_mod['status'] else 'modified'
     path = file_mod['file_path'] if file_mod['file_path'] else 'unknown'
-    return f"  - {path} ({action})"
+    output = f"  - {path} ({action})"
+    if file_mod['description']:
+        output += f": {file_mod['description']}"
+    return output
 
 
 def format_decision(idx, decision):
     """Format a single key decision."""
-    title = decision['decision_title'] if decision['decision_title'] else 'Untitled Decision'
-    content = decision['decision_content'] if decision['decision_content'] else ''
+    title = decision['title'] if decision['title'] else 'Untitled Decision'
 
     output = f"  {idx}. {title}\n"
 
-    if content:
-        wrapped = wrap_text(content, width=76, subsequent_indent="     ")
+    if decision['rationale']:
+        wrapped = wrap_text(decision['rationale'], width=76, subsequent_indent="     ")
+        output += f"     {wrapped}\n"
+    if decision['impact']:
+        wrapped = wrap_text(f"Impact: {decision['impact']}", width=76, subsequent_indent="     ")
         output += f"     {wrapped}\n"
 
     return output
@@ -92,143 +129,236 @@ def format_decision(idx, decision):
 
 def format_artifact(idx, artifact):
     """Format a single artifact."""
-    name = artifact['artifact_title'] if artifact['artifact_title'] else 'Unnamed'
+    name = artifact['name'] if artifact['name'] else 'Unnamed'
     artifact_type = artifact['artifact_type'] if artifact['artifact_type'] else 'unknown'
-    content = artifact['artifact_content'] if artifact['artifact_content'] else ''
+    description = artifact['description'] if artifact['description'] else ''
 
     # Preview first 200 characters
-    preview = content[:200] if content else '[No content]'
-    if len(content) > 200:
+    preview = description[:200] if description else '[No description]'
+    if len(description) > 200:
         preview += '...'
 
     output = f"  {idx}. {name} (type: {artifact_type})\n"
+    if artifact['path']:
+        output += f"     Path: {artifact['path']}\n"
     output += f"     {preview}\n"
 
     return output
 
 
-def resume_checkpoint(name):
-    """Retrieve and display a checkpoint from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def fetch_rows(conn, table, checkpoint_id, limit=None):
+    """Yield a section's rows lazily, FETCH_SIZE at a time."""
+    sql = f"SELECT * FROM {table} WHERE checkpoint_id = ? ORDER BY created_at"
+    params = [checkpoint_id]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
 
-    try:
-        # Query checkpoint by name
-        cursor.execute(
-            "SELECT * FROM checkpoints WHERE name = ? LIMIT 1",
-            (name,)
-        )
-        checkpoint = cursor.fetchone()
 
-        if not checkpoint:
-            list_checkpoints()
-            print(f"\nCheckpoint '{name}' not found")
-            sys.exit(1)
+def count_rows(conn, table, checkpoint_id):
+    """Number of rows in a section (indexed on checkpoint_id)."""
+    return conn.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE checkpoint_id = ?", (checkpoint_id,)
+    ).fetchone()[0]
 
-        # Get related data
-        cursor.execute(
-            "SELECT * FROM todos WHERE checkpoint_id = ? ORDER BY created_at",
-            (checkpoint['id'],)
-        )
-        todos = cursor.fetchall()
 
-        cursor.execute(
-            "SELECT * FROM file_modifications WHERE checkpoint_id = ? ORDER BY created_at",
-            (checkpoint['id'],)
-        )
-        files = cursor.fetchall()
+def row_fields(row):
+    """Row as a plain dict without internal ids, for JSON/YAML output."""
+    return {key: row[key] for key in row.keys() if key not in ("id", "checkpoint_id")}
 
-        cursor.execute(
-            "SELECT * FROM key_decisions WHERE checkpoint_id = ? ORDER BY created_at",
-            (checkpoint['id'],)
-        )
-        decisions = cursor.fetchall()
 
-        cursor.execute(
-            "SELECT * FROM artifacts WHERE checkpoint_id = ? ORDER BY created_at",
-            (checkpoint['id'],)
-        )
-        artifacts = cursor.fetchall()
-
-        # Format and display checkpoint
-        print(f"\n{SEPARATOR}")
-        print(f"CHECKPOINT: {checkpoint['name']}")
-        print(SEPARATOR)
-        print()
+def render_text(out, conn, checkpoint, sections, limit):
+    """Human-readable layout, streamed row by row."""
+    out.write(f"\n{SEPARATOR}\n")
+    out.write(f"CHECKPOINT: {checkpoint['name']}\n")
+    out.write(f"{SEPARATOR}\n\n")
 
+    if "checkpoint" in sections:
         # Timestamps
         created = format_timestamp(checkpoint['created_at'])
         updated = format_timestamp(checkpoint['updated_at'])
-        print(f"CREATED: {created}")
-        print(f"UPDATED: {updated}")
-        print()
+        out.write(f"CREATED: {created}\n")
+        out.write(f"UPDATED: {updated}\n\n")
 
         # Summary
         if checkpoint['summary']:
-            print("SUMMARY:")
-            summary_text = wrap_text(
-                checkpoint['summary'],
-                width=76,
-                initial_indent="  ",
-                subsequent_indent="  "
-            )
-            print(summary_text)
-            print()
+            out.write("SUMMARY:\n")
+            out.write(wrap_text(checkpoint['summary'], width=76, initial_indent="  ", subsequent_indent="  "))
+            out.write("\n\n")
 
         # Current Goal
         if checkpoint['current_goal']:
-            print("CURRENT GOAL:")
-            goal_text = wrap_text(
-                checkpoint['current_goal'],
-                width=76,
-                initial_indent="  ",
-                subsequent_indent="  "
-            )
-            print(goal_text)
-            print()
+            out.write("CURRENT GOAL:\n")
+            out.write(wrap_text(checkpoint['current_goal'], width=76, initial_indent="  ", subsequent_indent="  "))
+            out.write("\n\n")
 
         # Environment
         if any([checkpoint['working_directory'], checkpoint['git_branch'],
                 checkpoint['git_status']]):
-            print("ENVIRONMENT:")
+            out.write("ENVIRONMENT:\n")
             if checkpoint['working_directory']:
-                print(f"  Working Directory: {checkpoint['working_directory']}")
+                out.write(f"  Working Directory: {checkpoint['working_directory']}\n")
             if checkpoint['git_branch']:
-                print(f"  Git Branch: {checkpoint['git_branch']}")
+                out.write(f"  Git Branch: {checkpoint['git_branch']}\n")
             if checkpoint['git_status']:
-                print(f"  Git Status: {checkpoint['git_status']}")
-            print()
-
-        # Todos
-        if todos:
-            print(f"TODOS ({len(todos)} total):")
-            for todo in todos:
-                print(format_todo(todo))
-            print()
-
-        # Files Modified
-        if files:
-            print(f"FILES MODIFIED ({len(files)} total):")
-            for file_mod in files:
-                print(format_file_modification(file_mod))
-            print()
-
-        # Key Decisions
-        if decisions:
-            print(f"KEY DECISIONS ({len(decisions)} total):")
-            for idx, decision in enumerate(decisions, 1):
-                print(format_decision(idx, decision), end='')
-            print()
-
-        # Artifacts
-        if artifacts:
-            print(f"ARTIFACTS ({len(artifacts)} total):")
-            for idx, artifact in enumerate(artifacts, 1):
-                print(format_artifact(idx, artifact), end='')
-            print()
-
-        print(SEPARATOR)
+                out.write(f"  Git Status: {checkpoint['git_status']}\n")
+            out.write("\n")
+
+    # Get header onto the terminal before the (possibly long) sections
+    out.flush()
+
+    for section in CHILD_SECTIONS:
+        if section not in sections:
+            continue
+        total = count_rows(conn, section, checkpoint['id'])
+        if not total:
+            continue
+
+        out.write(f"{SECTION_TITLES[section]} ({total} total):\n")
+        shown = 0
+        for idx, row in enumerate(fetch_rows(conn, section, checkpoint['id'], limit), 1):
+            if section == "todos":
+                out.write(format_todo(row) + "\n")
+            elif section == "file_modifications":
+                out.write(format_file_modification(row) + "\n")
+            elif section == "key_decisions":
+                out.write(format_decision(idx, row))
+            else:
+                out.write(format_artifact(idx, row))
+            shown = idx
+        if shown < total:
+            out.write(f"  ... {total - shown} more (raise --limit to see them)\n")
+        out.write("\n")
+
+    out.write(f"{SEPARATOR}\n")
+
+
+def render_json(out, conn, checkpoint, sections, limit):
+    """One JSON object, written one row per line."""
+    fields = {"name": checkpoint['name']}
+    if "checkpoint" in sections:
+        fields = row_fields(checkpoint)
+    out.write("{\n")
+    out.write(",\n".join(f"  {json.dumps(key)}: {json.dumps(value)}" for key, value in fields.items()))
+    out.flush()
+
+    counts = {}
+    for section in CHILD_SECTIONS:
+        if section not in sections:
+            continue
+        counts[section] = count_rows(conn, section, checkpoint['id'])
+        out.write(f",\n  {json.dumps(section)}: [")
+        separator = "\n    "
+        for row in fetch_rows(conn, section, checkpoint['id'], limit):
+            out.write(separator + json.dumps(row_fields(row)))
+            separator = ",\n    "
+        out.write("\n  ]" if separator != "\n    " else "]")
+
+    out.write(f",\n  \"counts\": {json.dumps(counts)}\n}}\n")
+
+
+def render_yaml(out, conn, checkpoint, sections, limit):
+    """YAML document, dumped FETCH_SIZE rows at a time."""
+    fields = {"name": checkpoint['name']}
+    if "checkpoint" in sections:
+        fields = row_fields(checkpoint)
+    out.write(yaml.dump(fields, default_flow_style=False, sort_keys=False))
+    out.flush()
+
+    counts = {}
+    for section in CHILD_SECTIONS:
+        if section not in sections:
+            continue
+        counts[section] = count_rows(conn, section, checkpoint['id'])
+        if not counts[section]:
+            out.write(f"{section}: []\n")
+            continue
+        # Sequences under a mapping key are not indented, so batches concatenate cleanly
+        out.write(f"{section}:\n")
+        batch = []
+        for row in fetch_rows(conn, section, checkpoint['id'], limit):
+            batch.append(row_fields(row))
+            if len(batch) == FETCH_SIZE:
+                out.write(yaml.dump(batch, default_flow_style=False, sort_keys=False))
+                batch = []
+        if batch:
+            out.write(yaml.dump(batch, default_flow_style=False, sort_keys=False))
+
+    out.write(yaml.dump({"counts": counts}, default_flow_style=False, sort_keys=False))
+
+
+RENDERERS = {"text": render_text, "json": render_json, "yaml": render_yaml}
+
+
+def print_suggestions(conn, name):
+    """Show the checkpoints closest to a name that was not found."""
+    suggestions = name_index.suggest(conn, name)
+    print(f"Checkpoint '{name}' not found")
+    if not suggestions:
+        print("No similar checkpoint names; run without a name to list all checkpoints")
+        return
+    placeholders = ", ".join("?" for _ in suggestions)
+    updated = dict(conn.execute(
+        f"SELECT name, updated_at FROM checkpoints WHERE name IN ({placeholders})", suggestions
+    ).fetchall())
+    print("\nDid you mean:")
+    for suggestion in suggestions:
+        print(f"  {suggestion} (updated: {format_timestamp(updated.get(suggestion))})")
+
+
+def rehydrate(conn, checkpoint):
+    """Move an archived checkpoint's rows back from cold storage, as the server does on load."""
+    if "archived" not in checkpoint.keys() or not checkpoint["archived"]:
+        return
+    try:
+        cold_storage.attach(conn, DB_PATH)
+        # A no-op if another connection rehydrated it first
+        cold_storage.rehydrate(conn.cursor(), checkpoint["id"], CHILD_SECTIONS)
+        conn.commit()
+    except (sqlite3.Error, ValueError) as e:
+        conn.rollback()
+        print(f"Checkpoint '{checkpoint['name']}' is archived and its rows could not be restored ({e}); "
+              "resume it through the checkpoint-manager server", file=sys.stderr)
+        sys.exit(1)
+
+
+def resume_checkpoint(name, sections=None, limit=None, output_format="text", resolve=False):
+    """Stream a checkpoint from the database to stdout."""
+    conn = get_db_connection()
+    # Large writes go out in chunks instead of one syscall per line
+    out = open(sys.stdout.fileno(), "w", buffering=OUTPUT_BUFFER, encoding="utf-8", closefd=False)
+
+    try:
+        if resolve:
+            try:
+                name = name_index.resolve(conn, name) or name
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
 
+        # Query checkpoint by name
+        checkpoint = conn.execute(
+            "SELECT * FROM checkpoints WHERE name = ? LIMIT 1",
+            (name,)
+        ).fetchone()
+
+        if not checkpoint:
+            print_suggestions(conn, name)
+            sys.exit(1)
+        rehydrate(conn, checkpoint)
+
+        RENDERERS[output_format](out, conn, checkpoint, sections or SECTIONS, limit)
+        out.flush()
+
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     except sqlite3.Error as e:
         print(f"Database error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -271,17 +401,36 @@ def list_checkpoints():
         conn.close()
 
 
+def parse_sections(value):
+    """Comma-separated section names."""
+    sections = [section.strip() for section in value.split(",") if section.strip()]
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown section(s) {', '.join(unknown)}; choose from {', '.join(SECTIONS)}"
+        )
+    return sections
+
+
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: resume_checkpoint.py <checkpoint-name>")
+    parser = argparse.ArgumentParser(description="Display a checkpoint")
+    parser.add_argument("name", nargs="?", help="Checkpoint name")
+    parser.add_argument("--sections", type=parse_sections,
+                        help=f"Comma-separated sections to show ({', '.join(SECTIONS)})")
+    parser.add_argument("--limit", type=int, help="Maximum rows shown per section")
+    parser.add_argument("--format", choices=sorted(RENDERERS), default="text", dest="output_format")
+    parser.add_argument("--resolve", action="store_true", help="Also accept a unique prefix of the name")
+    args = parser.parse_args()
+
+    if not args.name:
+        print("Usage: resume_checkpoint.py <checkpoint-name> [--sections ...] [--limit N] [--format text|json|yaml] [--resolve]")
         print()
         print("Available checkpoints:")
         list_checkpoints()
         sys.exit(1)
 
-    checkpoint_name = sys.argv[1]
-    resume_checkpoint(checkpoint_name)
+    resume_checkpoint(args.name, args.sections, args.limit, args.output_format, args.resolve)
 
 
 if __name__ == "__main__":
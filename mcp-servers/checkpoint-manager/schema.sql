@@ -11,7 +11,8 @@ CREATE TABLE IF NOT EXISTS checkpoints (
     current_goal TEXT,
     working_directory TEXT,
     git_branch TEXT,
-    git_status TEXT
+    git_status TEXT,
+    pinned INTEGER DEFAULT 0  -- pinned checkpoints are never pruned by retention
 );
 
 -- Todos table: Task management for each checkpoint
@@ -69,6 +70,39 @@ CREATE INDEX IF NOT EXISTS idx_key_decisions_checkpoint_id ON key_decisions(chec
 CREATE INDEX IF NOT EXISTS idx_artifacts_checkpoint_id ON artifacts(checkpoint_id);
 CREATE INDEX IF NOT EXISTS idx_checkpoints_name ON checkpoints(name);
 CREATE INDEX IF NOT EXISTS idx_checkpoints_created_at ON checkpoints(created_at);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at ON checkpoints(updated_at);
+
+-- Change log: every checkpoint insert/update/delete, read by watch_checkpoints
+CREATE TABLE IF NOT EXISTS checkpoint_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    op TEXT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS checkpoints_log_created AFTER INSERT ON checkpoints
+BEGIN
+    INSERT INTO checkpoint_changes (name, op) VALUES (NEW.name, 'created');
+END;
+
+-- Only writes to content columns; pinning and archiving are not logged
+CREATE TRIGGER IF NOT EXISTS checkpoints_log_modified
+AFTER UPDATE OF name, summary, current_goal, working_directory, git_branch, git_status, updated_at
+ON checkpoints
+BEGIN
+    INSERT INTO checkpoint_changes (name, op) VALUES (NEW.name, 'updated');
+END;
+
+CREATE TRIGGER IF NOT EXISTS checkpoints_log_deleted AFTER DELETE ON checkpoints
+BEGIN
+    INSERT INTO checkpoint_changes (name, op) VALUES (OLD.name, 'deleted');
+END;
+
+-- Keep the most recent 10000 changes
+CREATE TRIGGER IF NOT EXISTS checkpoint_changes_trim AFTER INSERT ON checkpoint_changes
+BEGIN
+    DELETE FROM checkpoint_changes WHERE seq <= NEW.seq - 10000;
+END;
 
 -- View for quick checkpoint summary with counts
 CREATE VIEW IF NOT EXISTS checkpoint_summary AS
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Semantic Index
+Local, CPU-only semantic search over checkpoints. Every summary, goal, key
+decision and artifact is embedded into one row of a float32 matrix stored as
+a memory-mapped file beside the database, and a query is a single
+matrix-vector product over that matrix. The row -> checkpoint mapping lives
+in the database's semantic_vectors table.
+
+Several server processes may share one database and map the same file.
+Rows are allocated and written under the database write lock, the file only
+ever grows in place, and a rebuild writes a new file that replaces the old
+one by rename, so a process still mapping the old file keeps reading valid
+pages until it notices the new inode and remaps.
+
+The default embedder is a signed hashing-trick model over words, word bigrams
+and character trigrams (no downloads, no model files). Set
+CHECKPOINT_EMBEDDER=hashing:<dim> to change its width, or
+CHECKPOINT_EMBEDDER=package.module:factory to plug in any object with
+`name`, `dim` and `embed(texts) -> float32 array of shape (n, dim)`.
+"""
+
+import importlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Semantic search is unavailable without NumPy
+    np = None
+
+logger = logging.getLogger("checkpoint-manager")
+
+DEFAULT_DIM = 512
+INITIAL_CAPACITY = 1024
+
+# Matches below this cosine similarity are hash-collision noise
+MIN_SCORE = 0.05
+
+# Checkpoint text that gets embedded: (checkpoint_id, kind, label, text)
+ITEMS_SQL = """
+    SELECT id, 'summary', substr(summary, 1, 120), summary
+    FROM checkpoints WHERE id IN (SELECT value FROM json_each(:ids)) AND coalesce(summary, '') != ''
+    UNION ALL
+    SELECT id, 'goal', substr(current_goal, 1, 120), current_goal
+    FROM checkpoints WHERE id IN (SELECT value FROM json_each(:ids)) AND coalesce(current_goal, '') != ''
+    UNION ALL
+    SELECT checkpoint_id, 'decision', title,
+        coalesce(title, '') || '. ' || coalesce(rationale, '') || ' ' || coalesce(impact, '')
+    FROM key_decisions WHERE checkpoint_id IN (SELECT value FROM json_each(:ids))
+    UNION ALL
+    SELECT checkpoint_id, 'artifact', name,
+        coalesce(name, '') || ' ' || coalesce(artifact_type, '') || ' ' || substr(coalesce(description, ''), 1, 2000)
+    FROM artifacts WHERE checkpoint_id IN (SELECT value FROM json_each(:ids))
+"""
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was we were where "
+    "which with".split()
+)
+
+
+def _begin_write(conn: sqlite3.Connection):
+    """Take the database write lock now, unless the caller's transaction already runs"""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def ensure_schema(cursor: sqlite3.Cursor):
+    """Create the row mapping table (rows with a NULL checkpoint_id are free slots)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS semantic_vectors (
+            row INTEGER PRIMARY KEY,
+            checkpoint_id INTEGER,
+            kind TEXT,
+            label TEXT
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_semantic_vectors_checkpoint_id ON semantic_vectors(checkpoint_id)"
+    )
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words, word bigrams and character trigrams"""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    def _features(text: str) -> List[Tuple[str, float]]:
+        words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+        # Trigrams let "caching" match "cache" without a stemmer
+        for word in words:
+            padded = f"<{word}>"
+            features += [(padded[i:i + 3], 0.5) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """L2-normalised float32 vectors, one row per text"""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text or ""):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                values.append(weight if h & 0x80000000 else -weight)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)),
+                  np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+def load_embedder(spec: Optional[str] = None):
+    """
+    Build an embedder from a spec string.
+
+    Args:
+        spec: None or "hashing" (default), "hashing:<dim>", or "module:factory"
+    """
+    if not spec or spec == "hashing":
+        return HashingEmbedder()
+    if spec.startswith("hashing:"):
+        return HashingEmbedder(int(spec.split(":", 1)[1]))
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Invalid CHECKPOINT_EMBEDDER '{spec}' (expected hashing[:dim] or module:factory)")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class SemanticIndex:
+    """
+    Memory-mapped vector matrix for one checkpoint database.
+
+    The index is built lazily on the first search and kept up to date
+    incrementally afterwards; until then saves skip embedding entirely.
+    Callers pass in the connection so mapping changes share their transaction.
+
+    Args:
+        db_path: Database whose checkpoints are indexed
+        embedder_spec: See load_embedder
+    """
+
+    def __init__(self, db_path: str, embedder_spec: Optional[str] = None):
+        base = os.path.splitext(db_path)[0]
+        self.vectors_path = f"{base}.vectors.f32"
+        self.meta_path = f"{base}.vectors.json"
+        self.embedder_spec = embedder_spec
+        self._embedder = None
+        self._matrix = None
+        # (path, inode) of the mapped file, to notice a rebuild by another process
+        self._mapped: Optional[Tuple[str, int]] = None
+        self._built = False
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, db_path: str) -> "SemanticIndex":
+        """Build from CHECKPOINT_EMBEDDER"""
+        return cls(db_path, os.getenv("CHECKPOINT_EMBEDDER"))
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = load_embedder(self.embedder_spec)
+        return self._embedder
+
+    def _meta(self) -> Dict[str, Any]:
+        return {"embedder": self.embedder.name, "dim": self.embedder.dim}
+
+    def is_built(self) -> bool:
+        """True when a vector file exists and matches the configured embedder"""
+        if not self._built:
+            if not self.available or not os.path.exists(self.vectors_path) or not os.path.exists(self.meta_path):
+                return False
+            with open(self.meta_path) as f:
+                self._built = json.load(f) == self._meta()
+        return self._built
+
+    def _open(self, rows_needed: int = 0, path: Optional[str] = None) -> "np.memmap":
+        """
+        Map the vector file (or path), growing it (by doubling) to hold
+        rows_needed rows; remaps when another process grew or replaced it
+        """
+        path = path or self.vectors_path
+        dim = self.embedder.dim
+        row_bytes = dim * 4
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        capacity = size // row_bytes
+
+        if rows_needed > capacity:
+            new_capacity = max(capacity, INITIAL_CAPACITY)
+            while new_capacity < rows_needed:
+                new_capacity *= 2
+            self._close()
+            # Only ever grown: other processes may have the current pages mapped
+            with open(path, "ab") as f:
+                f.truncate(new_capacity * row_bytes)
+            capacity = new_capacity
+
+        mapped = (path, os.stat(path).st_ino)
+        if self._matrix is None or self._matrix.shape[0] != capacity or self._mapped != mapped:
+            self._close()
+            self._matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+            self._mapped = mapped
+        return self._matrix
+
+    def _close(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+            self._mapped = None
+
+    def rebuild(self, conn: sqlite3.Connection, chunk_size: int = 500) -> int:
+        """
+        Re-embed every checkpoint into a new vector file, renamed over the old
+        one just before the new mapping commits
+        """
+        if not self.available:
+            raise RuntimeError("Semantic search requires numpy (pip install numpy)")
+        with self._lock:
+            self._close()
+            self._built = False
+            tmp_path = f"{self.vectors_path}.{os.getpid()}.tmp"
+            open(tmp_path, "wb").close()
+            try:
+                _begin_write(conn)
+                conn.execute("DELETE FROM semantic_vectors")
+
+                ids = [row[0] for row in conn.execute("SELECT id FROM checkpoints ORDER BY id")]
+                total = 0
+                for start in range(0, len(ids), chunk_size):
+                    total += self._write(conn, ids[start:start + chunk_size], free_rows=[], path=tmp_path)
+
+                self._close()
+                os.replace(tmp_path, self.vectors_path)
+                tmp_meta = f"{self.meta_path}.{os.getpid()}.tmp"
+                with open(tmp_meta, "w") as f:
+                    json.dump(self._meta(), f)
+                os.replace(tmp_meta, self.meta_path)
+                conn.commit()
+            except BaseException:
+                self._close()
+                conn.rollback()
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._built = True
+            logger.info(f"Built semantic index with {total} vectors for {len(ids)} checkpoints")
+            return total
+
+    def index_checkpoints(self, conn: sqlite3.Connection, checkpoint_ids: List[int]) -> int:
+        """
+        Re-embed the given checkpoints, reusing their old rows first. Leaves
+        the write transaction that allocated the rows open for the caller to
+        commit.
+        """
+        with self._lock:
+            # Allocation under the write lock, so two processes never pick the same free row
+            _begin_write(conn)
+            free_rows = self.remove(conn, checkpoint_ids)
+            free_rows += [row[0] for row in conn.execute(
+                "SELECT row FROM semantic_vectors WHERE checkpoint_id IS NULL ORDER BY row"
+            )]
+            return self._write(conn, checkpoint_ids, sorted(set(free_rows)))
+
+    def _write(self, conn: sqlite3.Connection, checkpoint_ids: List[int], free_rows: List[int],
+               path: Optional[str] = None) -> int:
+        items = conn.execute(ITEMS_SQL, {"ids": json.dumps(checkpoint_ids)}).fetchall()
+        if not items:
+            return 0
+
+        next_row = conn.execute("SELECT COALESCE(MAX(row), -1) + 1 FROM semantic_vectors").fetchone()[0]
+        rows = free_rows[:len(items)]
+        rows += list(range(next_row, next_row + len(items) - len(rows)))
+
+        vectors = self.embedder.embed([item[3] for item in items])
+        matrix = self._open(max(rows) + 1, path)
+        matrix[np.asarray(rows)] = vectors
+        matrix.flush()
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO semantic_vectors (row, checkpoint_id, kind, label) VALUES (?, ?, ?, ?)",
+            [(row, item[0], item[1], item[2]) for row, item in zip(rows, items)],
+        )
+        return len(items)
+
+    def remove(self, conn: sqlite3.Connection, checkpoint_ids: List[int]) -> List[int]:
+        """Free the rows of deleted checkpoints; returns the freed row numbers"""
+        if not checkpoint_ids:
+            return []
+        with self._lock:
+            _begin_write(conn)
+            ids = json.dumps(checkpoint_ids)
+            rows = [row[0] for row in conn.execute(
+                "SELECT row FROM semantic_vectors WHERE checkpoint_id IN (SELECT value FROM json_each(?))",
+                (ids,),
+            )]
+            if rows:
+                conn.execute("""
+                    UPDATE semantic_vectors SET checkpoint_id = NULL, kind = NULL, label = NULL
+                    WHERE checkpoint_id IN (SELECT value FROM json_each(?))
+                """, (ids,))
+                if self.is_built():
+                    # Zeroed rows score 0, so freed slots never crowd out real matches
+                    matrix = self._open()
+                    matrix[np.asarray([row for row in rows if row < matrix.shape[0]], dtype=np.intp)] = 0
+                    matrix.flush()
+            return rows
+
+    def search(self, conn: sqlite3.Connection, query: str, limit: int = 10,
+               working_directory: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top checkpoints by cosine similarity of their best-matching item.
+
+        Args:
+            query: Free-text query
+            limit: Maximum checkpoints returned
+            working_directory: Only return checkpoints from this directory
+
+        Returns:
+            Checkpoints with score, the matching item and listing fields
+        """
+        with self._lock:
+            used = conn.execute("SELECT COALESCE(MAX(row), -1) + 1 FROM semantic_vectors").fetchone()[0]
+            if used == 0:
+                return []
+            matrix = self._open()[:used]
+            scores = matrix @ self.embedder.embed([query])[0]
+
+            # Oversample rows, since several may belong to one checkpoint or be filtered out
+            pool = min(used, max(limit * 10, 100))
+            while True:
+                candidates = np.argpartition(-scores, pool - 1)[:pool] if pool < used else np.arange(used)
+                candidates = candidates[np.argsort(-scores[candidates])]
+                results = self._resolve(conn, candidates, scores, limit, working_directory)
+                # Stop once the pool already reaches below the noise floor
+                if len(results) >= limit or pool >= used or scores[candidates[-1]] < MIN_SCORE:
+                    return results
+                pool = min(used, pool * 4)
+
+    @staticmethod
+    def _resolve(conn: sqlite3.Connection, candidates: "np.ndarray", scores: "np.ndarray", limit: int,
+                 working_directory: Optional[str]) -> List[Dict[str, Any]]:
+        """Map ranked rows to checkpoints, keeping each checkpoint's best row"""
+        conn.row_factory = sqlite3.Row
+        sql = """
+            SELECT v.row, v.kind, v.label, c.name, c.working_directory, c.git_branch, c.updated_at, c.summary
+            FROM semantic_vectors AS v JOIN checkpoints AS c ON c.id = v.checkpoint_id
+            WHERE v.row IN (SELECT value FROM json_each(?))
+        """
+        params: List[Any] = [json.dumps(candidates.tolist())]
+        if working_directory:
+            sql += " AND c.working_directory = ?"
+            params.append(working_directory)
+        by_row = {row["row"]: row for row in conn.execute(sql, params)}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for row_number in candidates.tolist():
+            row = by_row.get(row_number)
+            score = float(scores[row_number])
+            if row is None or score < MIN_SCORE or row["name"] in results:
+                continue
+            results[row["name"]] = {
+                "name": row["name"],
+                "score": round(score, 4),
+                "match": {"kind": row["kind"], "label": row["label"]},
+                "working_directory": row["working_directory"],
+                "git_branch": row["git_branch"],
+                "updated_at": row["updated_at"],
+                "summary": row["summary"],
+            }
+            if len(results) == limit:
+                break
+        return list(results.values())
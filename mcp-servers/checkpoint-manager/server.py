@@ -4,18 +4,39 @@ MCP Server for Checkpoint Management
 Manages project checkpoints with todos, file modifications, decisions, and artifacts
 """
 
+import argparse
+import asyncio
 import sqlite3
 import os
 import json
-import yaml
 import logging
-from datetime import datetime
-from pathlib import Path
+import time
+import uuid
 from typing import Any, Optional, Dict, List
 
 from mcp.server import Server
-from mcp.types import Tool, TextContent, ToolInput
-import mcp.server.stdio
+from mcp.types import Tool, TextContent
+
+import analytics
+import change_log
+import cold_storage
+import file_state
+import name_index
+import transport
+from backup import BackupScheduler
+from checkpoint_diff import diff_checkpoints
+from connection_pool import ConnectionPool
+from maintenance import MaintenanceWorker, RetentionPolicy
+from metrics import Metrics
+from records import ChildRows
+from semantic_index import SemanticIndex, ensure_schema as ensure_semantic_schema
+from sharding import ShardCatalog, shard_key
+from snapshot import SECTIONS as SNAPSHOT_SECTIONS, SnapshotCache, publish, render_sections, snapshot_path
+from summarizer import SUMMARY_TYPES, Summarizer
+from summary_pipeline import MAX_FILES as SUMMARY_MAX_FILES, SummaryPipeline
+from trace_recorder import TraceRecorder
+from usage_log import GROUP_COLUMNS as USAGE_GROUPS, UsageLogger
+from warmup import Warmup
 
 # Setup logging
 logging.basicConfig(
@@ -27,25 +48,223 @@ logger = logging.getLogger("checkpoint-manager")
 # Initialize MCP server
 server = Server("checkpoint-manager")
 
-# Database path
-DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+# Database path: Use env var if set, otherwise the default install location
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+DB_PATH = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH)
+
+# Optional per-project sharding: directory holding catalog.db and shards/*.db
+SHARD_DIR = os.getenv("CHECKPOINT_SHARD_DIR")
+
+# Idle connections kept per database (0 opens a fresh connection per call)
+POOL_SIZE = int(os.getenv("CHECKPOINT_POOL_SIZE", "4"))
+
+# Reads of a checkpoint are recorded at most this often (seconds) per process;
+# tiering to cold storage works in days
+ACCESS_RESOLUTION = 3600.0
+
+# Tables holding per-checkpoint rows, keyed by checkpoint_id
+CHILD_TABLES = ("todos", "file_modifications", "key_decisions", "artifacts")
+
+# Resumed child sections: (table, columns, low-cardinality columns, path column)
+CHILD_QUERIES = (
+    ("todos", "title, description, status, priority", ("status", "priority"), None),
+    ("file_modifications", "file_path, status, description", ("status",), "file_path"),
+    ("key_decisions", "title, rationale, impact", (), None),
+    ("artifacts", "name, artifact_type, path, description", ("artifact_type",), None),
+)
+
+# Checkpoint columns update_checkpoint may change
+UPDATABLE_FIELDS = ("summary", "current_goal", "working_directory", "git_branch", "git_status")
+
+# Granular child-row edits: table -> (operation noun, lookup key column, settable columns)
+CHILD_OPERATIONS = {
+    "todos": ("todo", "title", ("title", "description", "status", "priority")),
+    "file_modifications": ("file_modification", "file_path", ("file_path", "status", "description")),
+    "key_decisions": ("decision", "title", ("title", "rationale", "impact")),
+    "artifacts": ("artifact", "name", ("name", "artifact_type", "path", "description")),
+}
+CHILD_DEFAULTS = {"todos": {"status": "pending", "priority": "medium"}}
+
+# Ordering of open todos: in progress first, then by priority (unknown last)
+TODO_PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+PRIORITY_RANK_SQL = "CASE priority {} ELSE {} END".format(
+    " ".join(f"WHEN '{priority}' THEN {rank}" for priority, rank in TODO_PRIORITY_ORDER.items()),
+    len(TODO_PRIORITY_ORDER)
+)
+
+# Operation name -> (action, table), e.g. "update_todo" -> ("update", "todos")
+OPERATIONS = {
+    f"{action}_{noun}": (action, table)
+    for table, (noun, _, _) in CHILD_OPERATIONS.items()
+    for action in ("add", "update", "remove")
+}
+
+# Single-operation tools -> (operation, argument holding the new row or rows)
+GRANULAR_TOOLS = {
+    "add_todo": ("add_todo", "todo"),
+    "update_todo": ("update_todo", None),
+    "remove_todo": ("remove_todo", None),
+    "append_file_modifications": ("add_file_modification", "file_modifications"),
+    "append_decision": ("add_decision", "decision"),
+    "attach_artifact": ("add_artifact", "artifact"),
+}
+
+# Staged saves: sessions idle for longer than this many seconds are expired
+SAVE_SESSION_TTL = float(os.getenv("CHECKPOINT_SAVE_SESSION_TTL", "3600"))
+# Rows accepted per append, which bounds what one call holds in memory
+SAVE_CHUNK_MAX_ROWS = 1000
+# Generic staging columns, holding a table's CHILD_OPERATIONS columns in order
+STAGED_COLUMNS = ("c1", "c2", "c3", "c4")
+
+# Tools that block while waiting for changes; they run off the event loop
+# and do not count as activity for idle maintenance
+LONG_POLL_TOOLS = {"watch_checkpoints"}
+
+# Tools waiting on the local LLM; they run off the event loop as well
+LLM_TOOLS = {"summarize_file", "summarize_directory"}
+
+# Tools copying whole databases; they run off the event loop as well
+BACKUP_TOOLS = {"backup_checkpoints"}
+
+# Set when serving the shared transport: every tool then runs off the event
+# loop, so one client's call never stalls the other sessions
+OFFLOAD_ALL_TOOLS = False
 
 
 class CheckpointManager:
     """Manages checkpoint operations with SQLite database"""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, metrics: Optional[Metrics] = None, pool_size: int = POOL_SIZE):
         """Initialize database connection and create tables if needed"""
         self.db_path = db_path
+        self.metrics = metrics or Metrics()
+        self.pool = ConnectionPool(self._open, pool_size) if pool_size > 0 else None
+        self.semantic = SemanticIndex.from_env(db_path)
+        self.snapshots = SnapshotCache()
+        self._accessed: Dict[int, float] = {}
+        self._snapshot_accessed: Dict[str, float] = {}
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self._init_db()
 
+    def _open(self, **kwargs) -> sqlite3.Connection:
+        """
+        Open a new database connection (instrumented when metrics are
+        enabled) with the cold-storage archive attached
+        """
+        conn = self.metrics.connect(self.db_path, **kwargs)
+        cold_storage.attach(conn, self.db_path)
+        return conn
+
+    def _connect(self, **kwargs):
+        """
+        Connection for a with block: a pooled one, or a new one when there is
+        no pool or kwargs ask for special settings
+        """
+        if self.pool is None or kwargs:
+            return self._open(**kwargs)
+        return self.pool.lease()
+
+    @staticmethod
+    def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, declaration: str):
+        """Add a column to an existing table if an older schema lacks it"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    @staticmethod
+    def _delete_checkpoint_rows(cursor: sqlite3.Cursor, checkpoint_ids: List[int]):
+        """Delete checkpoints and their child rows (foreign keys are not enforced)"""
+        placeholders = ", ".join("?" for _ in checkpoint_ids)
+        for table in CHILD_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE checkpoint_id IN ({placeholders})", checkpoint_ids)
+        cursor.execute(f"DELETE FROM checkpoint_access WHERE checkpoint_id IN ({placeholders})", checkpoint_ids)
+        cold_storage.discard(cursor, checkpoint_ids)
+        cursor.execute(f"DELETE FROM checkpoints WHERE id IN ({placeholders})", checkpoint_ids)
+
+    @staticmethod
+    def _rehydrate(cursor: sqlite3.Cursor, checkpoint_id: int, name: str):
+        """
+        Move an archived checkpoint's child rows back into the hot tables, in
+        the caller's transaction (a no-op if another connection already did)
+        """
+        rows = cold_storage.rehydrate(cursor, checkpoint_id, CHILD_TABLES)
+        if rows is not None:
+            logger.info(f"Rehydrated {rows} rows of checkpoint '{name}' from cold storage")
+
+    def _ensure_hot(self, conn: sqlite3.Connection, names: List[str]):
+        """Rehydrate any of the named checkpoints that are archived, and commit"""
+        placeholders = ", ".join("?" for _ in names)
+        archived = conn.execute(
+            f"SELECT id, name FROM checkpoints WHERE archived = 1 AND name IN ({placeholders})", names
+        ).fetchall()
+        if archived:
+            cursor = conn.cursor()
+            for checkpoint_id, name in archived:
+                self._rehydrate(cursor, checkpoint_id, name)
+            conn.commit()
+
+    def _note_access(self, cursor: sqlite3.Cursor, checkpoint_id: int):
+        """Record that a checkpoint was read, at most once per ACCESS_RESOLUTION"""
+        now = time.monotonic()
+        if now - self._accessed.get(checkpoint_id, -ACCESS_RESOLUTION) < ACCESS_RESOLUTION:
+            return
+        self._accessed[checkpoint_id] = now
+        cursor.execute("""
+            INSERT INTO checkpoint_access (checkpoint_id, accessed_at) VALUES (?, CURRENT_TIMESTAMP)
+            ON CONFLICT(checkpoint_id) DO UPDATE SET accessed_at = excluded.accessed_at
+        """, (checkpoint_id,))
+
+    def _note_snapshot_access(self, name: str):
+        """Record a read served from a published snapshot, throttled like _note_access"""
+        now = time.monotonic()
+        if now - self._snapshot_accessed.get(name, -ACCESS_RESOLUTION) < ACCESS_RESOLUTION:
+            return
+        self._snapshot_accessed[name] = now
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    INSERT INTO checkpoint_access (checkpoint_id, accessed_at)
+                    SELECT id, CURRENT_TIMESTAMP FROM checkpoints WHERE name = ?
+                    ON CONFLICT(checkpoint_id) DO UPDATE SET accessed_at = excluded.accessed_at
+                """, (name,))
+                conn.commit()
+        except sqlite3.Error as e:
+            # Only tiering depends on it; never fail a read over it
+            logger.warning(f"Could not record access to checkpoint '{name}': {e}")
+
+    def _reindex(self, conn: sqlite3.Connection, checkpoint_ids: List[int]):
+        """Refresh semantic vectors of changed checkpoints once the index has been built"""
+        if not self.semantic.is_built():
+            return
+        try:
+            self.semantic.index_checkpoints(conn, checkpoint_ids)
+            conn.commit()
+        except Exception as e:
+            # The index can always be rebuilt; never fail a save over it
+            conn.rollback()
+            logger.warning(f"Semantic index update failed: {e}")
+
+    def _refresh_snapshot(self, name: str):
+        """Republish a checkpoint's snapshot after a change, if one is published"""
+        if os.path.exists(snapshot_path(self.db_path, name)):
+            self.publish_snapshot(name)
+
+    def _remove_snapshot(self, name: str):
+        path = snapshot_path(self.db_path, name)
+        self.snapshots.discard(path)
+        if os.path.exists(path):
+            os.remove(path)
+
     def _init_db(self):
         """Initialize database schema"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
+                # A new database starts in incremental auto-vacuum, so compact() never needs a full VACUUM
+                if not cursor.execute("SELECT 1 FROM sqlite_master").fetchone():
+                    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
                 # Create checkpoints table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS checkpoints (
@@ -56,10 +275,15 @@ class CheckpointManager:
                         working_directory TEXT,
                         git_branch TEXT,
                         git_status TEXT,
+                        git_head TEXT,
+                        pinned INTEGER DEFAULT 0,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
+                self._ensure_column(cursor, "checkpoints", "pinned", "INTEGER DEFAULT 0")
+                self._ensure_column(cursor, "checkpoints", "git_head", "TEXT")
+                self._ensure_column(cursor, "checkpoints", "archived", "INTEGER DEFAULT 0")
 
                 # Create todos table
                 cursor.execute("""
@@ -83,10 +307,16 @@ class CheckpointManager:
                         file_path TEXT NOT NULL,
                         status TEXT,
                         description TEXT,
+                        size INTEGER,
+                        mtime_ns INTEGER,
+                        blob_hash TEXT,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         FOREIGN KEY (checkpoint_id) REFERENCES checkpoints(id) ON DELETE CASCADE
                     )
                 """)
+                self._ensure_column(cursor, "file_modifications", "size", "INTEGER")
+                self._ensure_column(cursor, "file_modifications", "mtime_ns", "INTEGER")
+                self._ensure_column(cursor, "file_modifications", "blob_hash", "TEXT")
 
                 # Create key_decisions table
                 cursor.execute("""
@@ -115,62 +345,143 @@ class CheckpointManager:
                     )
                 """)
 
+                # Indexes for child lookups, deletes and retention ordering
+                for table in CHILD_TABLES:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_checkpoint_id ON {table}(checkpoint_id)"
+                    )
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at ON checkpoints(updated_at)"
+                )
+                # Staged saves: session scalars, and child rows staged until commit
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS save_sessions (
+                        id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        rows INTEGER DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_used REAL NOT NULL
+                    )
+                """)
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS staged_rows (
+                        session_id TEXT NOT NULL,
+                        section TEXT NOT NULL,
+                        seq INTEGER NOT NULL,
+                        {', '.join(f'{column} TEXT' for column in STAGED_COLUMNS)},
+                        PRIMARY KEY (session_id, section, seq)
+                    ) WITHOUT ROWID
+                """)
+
+                # Last read of each checkpoint, which decides when it goes to cold storage
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS checkpoint_access (
+                        checkpoint_id INTEGER PRIMARY KEY,
+                        accessed_at TIMESTAMP NOT NULL
+                    )
+                """)
+                cold_storage.ensure_schema(cursor)
+
+                # Partial and covering indexes behind the analytics reports
+                analytics.ensure_indexes(cursor)
+
+                # Trigram index of names, for suggestions when a name is not found
+                name_index.ensure_schema(cursor)
+
+                ensure_semantic_schema(cursor)
+                change_log.install(cursor, "checkpoints", (
+                    "name", "summary", "current_goal", "working_directory",
+                    "git_branch", "git_status", "git_head", "updated_at"
+                ))
+
                 conn.commit()
                 logger.info("Database initialized successfully")
         except sqlite3.Error as e:
             logger.error(f"Database initialization error: {e}")
             raise
 
-    def save_checkpoint(self, name: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Save or update a checkpoint with all related data"""
+    @staticmethod
+    def _upsert_checkpoint(cursor: sqlite3.Cursor, name: str, data: Dict[str, Any]):
+        """
+        Write a checkpoint's scalar fields, creating it or clearing the child
+        rows of the existing one. Returns (checkpoint_id, "created" or "updated").
+        """
+        # Check if checkpoint exists
+        cursor.execute("SELECT id FROM checkpoints WHERE name = ?", (name,))
+        existing = cursor.fetchone()
+
+        if existing:
+            checkpoint_id = existing[0]
+            # Update existing checkpoint
+            cursor.execute("""
+                UPDATE checkpoints
+                SET summary = ?, current_goal = ?, working_directory = ?,
+                    git_branch = ?, git_status = ?, git_head = ?, archived = 0,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (
+                data.get('summary'),
+                data.get('current_goal'),
+                data.get('working_directory'),
+                data.get('git_branch'),
+                data.get('git_status'),
+                data.get('git_head'),
+                checkpoint_id
+            ))
+            action = "updated"
+        else:
+            # Insert new checkpoint
+            cursor.execute("""
+                INSERT INTO checkpoints
+                (name, summary, current_goal, working_directory, git_branch, git_status, git_head)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                name,
+                data.get('summary'),
+                data.get('current_goal'),
+                data.get('working_directory'),
+                data.get('git_branch'),
+                data.get('git_status'),
+                data.get('git_head')
+            ))
+            checkpoint_id = cursor.lastrowid
+            action = "created"
+
+        # Clear related records for update
+        if existing:
+            cursor.execute("DELETE FROM todos WHERE checkpoint_id = ?", (checkpoint_id,))
+            cursor.execute("DELETE FROM file_modifications WHERE checkpoint_id = ?", (checkpoint_id,))
+            cursor.execute("DELETE FROM key_decisions WHERE checkpoint_id = ?", (checkpoint_id,))
+            cursor.execute("DELETE FROM artifacts WHERE checkpoint_id = ?", (checkpoint_id,))
+            cold_storage.discard(cursor, [checkpoint_id])
+
+        return checkpoint_id, action
+
+    def save_checkpoint(self, name: str, data: Dict[str, Any],
+                        capture_file_state: bool = False) -> Dict[str, Any]:
+        """
+        Save or update a checkpoint with all related data.
+
+        With capture_file_state, also record size, mtime and blob hash of each
+        modified file, and fill git branch/status/HEAD from the working
+        directory where the caller did not supply them.
+        """
+        # Capture happens before the transaction so git never runs under a lock
+        file_states: Dict[str, Dict[str, Any]] = {}
+        if capture_file_state:
+            provided = {key: value for key, value in data.items() if value}
+            data = dict(file_state.git_summary(data.get('working_directory')), **provided)
+            file_states = file_state.capture(
+                data.get('working_directory'),
+                [mod.get('file_path') for mod in data.get('file_modifications', []) if mod.get('file_path')]
+            )
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
-                # Check if checkpoint exists
-                cursor.execute("SELECT id FROM checkpoints WHERE name = ?", (name,))
-                existing = cursor.fetchone()
-
-                if existing:
-                    checkpoint_id = existing[0]
-                    # Update existing checkpoint
-                    cursor.execute("""
-                        UPDATE checkpoints
-                        SET summary = ?, current_goal = ?, working_directory = ?,
-                            git_branch = ?, git_status = ?, updated_at = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    """, (
-                        data.get('summary'),
-                        data.get('current_goal'),
-                        data.get('working_directory'),
-                        data.get('git_branch'),
-                        data.get('git_status'),
-                        checkpoint_id
-                    ))
-                    action = "updated"
-                else:
-                    # Insert new checkpoint
-                    cursor.execute("""
-                        INSERT INTO checkpoints
-                        (name, summary, current_goal, working_directory, git_branch, git_status)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        name,
-                        data.get('summary'),
-                        data.get('current_goal'),
-                        data.get('working_directory'),
-                        data.get('git_branch'),
-                        data.get('git_status')
-                    ))
-                    checkpoint_id = cursor.lastrowid
-                    action = "created"
-
-                # Clear related records for update
-                if existing:
-                    cursor.execute("DELETE FROM todos WHERE checkpoint_id = ?", (checkpoint_id,))
-                    cursor.execute("DELETE FROM file_modifications WHERE checkpoint_id = ?", (checkpoint_id,))
-                    cursor.execute("DELETE FROM key_decisions WHERE checkpoint_id = ?", (checkpoint_id,))
-                    cursor.execute("DELETE FROM artifacts WHERE checkpoint_id = ?", (checkpoint_id,))
+                checkpoint_id, action = self._upsert_checkpoint(cursor, name, data)
 
                 # Insert todos
                 for todo in data.get('todos', []):
@@ -185,16 +496,21 @@ class CheckpointManager:
                         todo.get('priority', 'medium')
                     ))
 
-                # Insert file modifications
+                # Insert file modifications (with captured state when available)
                 for mod in data.get('file_modifications', []):
+                    state = file_states.get(mod.get('file_path'), {})
                     cursor.execute("""
-                        INSERT INTO file_modifications (checkpoint_id, file_path, status, description)
-                        VALUES (?, ?, ?, ?)
+                        INSERT INTO file_modifications
+                        (checkpoint_id, file_path, status, description, size, mtime_ns, blob_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
                     """, (
                         checkpoint_id,
                         mod.get('file_path'),
                         mod.get('status'),
-                        mod.get('description')
+                        mod.get('description'),
+                        state.get('size'),
+                        state.get('mtime_ns'),
+                        state.get('blob_hash')
                     ))
 
                 # Insert key decisions
@@ -224,13 +540,18 @@ class CheckpointManager:
 
                 conn.commit()
                 logger.info(f"Checkpoint '{name}' {action} successfully (ID: {checkpoint_id})")
+                self._reindex(conn, [checkpoint_id])
+                self._refresh_snapshot(name)
 
-                return {
+                result = {
                     "status": "success",
                     "message": f"Checkpoint '{name}' {action} successfully",
                     "checkpoint_id": checkpoint_id,
                     "action": action
                 }
+                if capture_file_state:
+                    result["files_captured"] = len(file_states)
+                return result
         except sqlite3.IntegrityError as e:
             logger.error(f"Integrity error: {e}")
             raise ValueError(f"Checkpoint name must be unique: {e}")
@@ -238,93 +559,349 @@ class CheckpointManager:
             logger.error(f"Database error: {e}")
             raise
 
-    def resume_checkpoint(self, name: str) -> Dict[str, Any]:
-        """Load a checkpoint by name with all related data"""
+    @staticmethod
+    def _stage_rows(cursor: sqlite3.Cursor, session_id: str, section: str, rows: List[Dict[str, Any]]) -> int:
+        """Validate and stage one chunk of rows; returns the session's total staged rows"""
+        if section not in CHILD_OPERATIONS:
+            raise ValueError(f"Unknown section '{section}' (available: {', '.join(CHILD_TABLES)})")
+        if len(rows) > SAVE_CHUNK_MAX_ROWS:
+            raise ValueError(f"At most {SAVE_CHUNK_MAX_ROWS} rows per chunk (got {len(rows)})")
+        values = []
+        for index, row in enumerate(rows):
+            try:
+                values.append(CheckpointManager._child_values(section, row))
+            except ValueError as e:
+                raise ValueError(f"{section} row {index}: {e}") from None
+
+        # Bumping the counter first takes the write lock, so concurrent appends get distinct seqs
+        cursor.execute("UPDATE save_sessions SET rows = rows + ?, last_used = ? WHERE id = ?",
+                       (len(values), time.time(), session_id))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Save session '{session_id}' not found (committed, aborted or expired)")
+        cursor.execute("SELECT rows FROM save_sessions WHERE id = ?", (session_id,))
+        total = cursor.fetchone()[0]
+
+        columns = STAGED_COLUMNS[:len(CHILD_OPERATIONS[section][2])]
+        cursor.executemany(
+            f"INSERT INTO staged_rows (session_id, section, seq, {', '.join(columns)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in columns)})",
+            [[session_id, section, total - len(values) + i] + row for i, row in enumerate(values)],
+        )
+        return total
+
+    def begin_save(self, name: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Start a staged save for checkpoints too large for one save_checkpoint call.
+
+        Rows arrive in chunks through append_save and are staged in the
+        database, so the server never holds more than one chunk; commit_save
+        then replaces the checkpoint in a single transaction. Sessions idle for
+        longer than SAVE_SESSION_TTL seconds are expired.
+
+        Args:
+            name: Checkpoint name
+            data: Scalar fields as for save_checkpoint; any child sections
+                included are staged as a first chunk
+
+        Returns:
+            Dict with the session_id to pass to the other calls
+        """
+        data = data or {}
+        scalars = {key: value for key, value in data.items() if key not in CHILD_TABLES}
+        session_id = uuid.uuid4().hex
+        self.expire_save_sessions()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
                 cursor = conn.cursor()
-
-                # Fetch checkpoint
-                cursor.execute("SELECT * FROM checkpoints WHERE name = ?", (name,))
-                checkpoint_row = cursor.fetchone()
-
-                if not checkpoint_row:
-                    raise ValueError(f"Checkpoint '{name}' not found")
-
-                checkpoint_id = checkpoint_row['id']
-
-                # Build checkpoint dict
-                checkpoint_data = {
-                    "name": checkpoint_row['name'],
-                    "summary": checkpoint_row['summary'],
-                    "current_goal": checkpoint_row['current_goal'],
-                    "working_directory": checkpoint_row['working_directory'],
-                    "git_branch": checkpoint_row['git_branch'],
-                    "git_status": checkpoint_row['git_status'],
-                    "created_at": checkpoint_row['created_at'],
-                    "updated_at": checkpoint_row['updated_at'],
+                cursor.execute("INSERT INTO save_sessions (id, name, data, last_used) VALUES (?, ?, ?, ?)",
+                               (session_id, name, json.dumps(scalars), time.time()))
+                rows = 0
+                for section in CHILD_TABLES:
+                    if data.get(section):
+                        rows = self._stage_rows(cursor, session_id, section, data[section])
+                conn.commit()
+                logger.info(f"Save session {session_id} started for checkpoint '{name}'")
+                return {
+                    "status": "success",
+                    "session_id": session_id,
+                    "name": name,
+                    "staged_rows": rows,
+                    "expires_after_seconds": SAVE_SESSION_TTL
                 }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
 
-                # Fetch todos
-                cursor.execute("""
-                    SELECT title, description, status, priority
-                    FROM todos WHERE checkpoint_id = ?
-                    ORDER BY created_at
-                """, (checkpoint_id,))
-                checkpoint_data['todos'] = [dict(row) for row in cursor.fetchall()]
-
-                # Fetch file modifications
-                cursor.execute("""
-                    SELECT file_path, status, description
-                    FROM file_modifications WHERE checkpoint_id = ?
-                    ORDER BY created_at
-                """, (checkpoint_id,))
-                checkpoint_data['file_modifications'] = [dict(row) for row in cursor.fetchall()]
+    def append_save(self, session_id: str, section: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Stage one chunk of rows for a save session.
 
-                # Fetch key decisions
-                cursor.execute("""
-                    SELECT title, rationale, impact
-                    FROM key_decisions WHERE checkpoint_id = ?
-                    ORDER BY created_at
-                """, (checkpoint_id,))
-                checkpoint_data['key_decisions'] = [dict(row) for row in cursor.fetchall()]
+        Args:
+            session_id: From begin_save
+            section: todos, file_modifications, key_decisions or artifacts
+            rows: Rows as for save_checkpoint (at most SAVE_CHUNK_MAX_ROWS)
+        """
+        try:
+            with self._connect() as conn:
+                total = self._stage_rows(conn.cursor(), session_id, section, rows)
+                conn.commit()
+                return {
+                    "status": "success",
+                    "session_id": session_id,
+                    "section": section,
+                    "appended": len(rows),
+                    "staged_rows": total
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
 
-                # Fetch artifacts
-                cursor.execute("""
-                    SELECT name, artifact_type, path, description
-                    FROM artifacts WHERE checkpoint_id = ?
-                    ORDER BY created_at
-                """, (checkpoint_id,))
-                checkpoint_data['artifacts'] = [dict(row) for row in cursor.fetchall()]
+    def commit_save(self, session_id: str) -> Dict[str, Any]:
+        """
+        Replace the checkpoint with the session's scalars and staged rows in one
+        transaction (rows copied with INSERT ... SELECT, in append order), then
+        drop the session.
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT name, data, rows FROM save_sessions WHERE id = ?", (session_id,))
+                session = cursor.fetchone()
+                if not session:
+                    raise ValueError(f"Save session '{session_id}' not found (committed, aborted or expired)")
+                name, data, rows = session[0], json.loads(session[1]), session[2]
+
+                checkpoint_id, action = self._upsert_checkpoint(cursor, name, data)
+                for table, (_, _, columns) in CHILD_OPERATIONS.items():
+                    cursor.execute(f"""
+                        INSERT INTO {table} (checkpoint_id, {', '.join(columns)})
+                        SELECT ?, {', '.join(STAGED_COLUMNS[:len(columns)])}
+                        FROM staged_rows
+                        WHERE session_id = ? AND section = ?
+                        ORDER BY seq
+                    """, (checkpoint_id, session_id, table))
+                cursor.execute("DELETE FROM staged_rows WHERE session_id = ?", (session_id,))
+                cursor.execute("DELETE FROM save_sessions WHERE id = ?", (session_id,))
+                conn.commit()
 
-                # Convert to YAML for LLM consumption
-                yaml_content = yaml.dump(checkpoint_data, default_flow_style=False, sort_keys=False)
+                logger.info(f"Checkpoint '{name}' {action} from save session {session_id} ({rows} rows)")
+                self._reindex(conn, [checkpoint_id])
+                self._refresh_snapshot(name)
 
-                logger.info(f"Checkpoint '{name}' resumed successfully")
+                return {
+                    "status": "success",
+                    "message": f"Checkpoint '{name}' {action} successfully",
+                    "checkpoint_id": checkpoint_id,
+                    "action": action,
+                    "name": name,
+                    "rows": rows
+                }
+        except sqlite3.IntegrityError as e:
+            logger.error(f"Integrity error: {e}")
+            raise ValueError(f"Checkpoint name must be unique: {e}")
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
 
+    def abort_save(self, session_id: str) -> Dict[str, Any]:
+        """Discard a save session and its staged rows"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM staged_rows WHERE session_id = ?", (session_id,))
+                discarded = max(cursor.rowcount, 0)
+                cursor.execute("DELETE FROM save_sessions WHERE id = ?", (session_id,))
+                if cursor.rowcount == 0:
+                    raise ValueError(f"Save session '{session_id}' not found (committed, aborted or expired)")
+                conn.commit()
                 return {
                     "status": "success",
-                    "message": f"Checkpoint '{name}' loaded successfully",
-                    "checkpoint_yaml": yaml_content,
-                    "checkpoint_data": checkpoint_data
+                    "message": f"Save session '{session_id}' aborted",
+                    "discarded_rows": discarded
                 }
         except sqlite3.Error as e:
             logger.error(f"Database error: {e}")
             raise
 
-    def list_checkpoints(self) -> Dict[str, Any]:
+    def expire_save_sessions(self, ttl: Optional[float] = None) -> int:
+        """Drop save sessions idle for longer than ttl seconds; returns how many"""
+        cutoff = time.time() - (SAVE_SESSION_TTL if ttl is None else ttl)
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM save_sessions WHERE last_used < ?", (cutoff,))
+                expired = max(cursor.rowcount, 0)
+                if expired:
+                    cursor.execute("""
+                        DELETE FROM staged_rows
+                        WHERE session_id NOT IN (SELECT id FROM save_sessions)
+                    """)
+                    logger.info(f"Expired {expired} abandoned save sessions")
+                conn.commit()
+                return expired
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def _load_checkpoint(self, name: str, note_access: bool = True,
+                         conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """
+        Read a checkpoint with its child rows as column-oriented ChildRows,
+        never materialising a dict per row, through conn (default: a
+        connection leased for this call).
+        """
+        if conn is None:
+            with self._connect() as conn:
+                return self._load_checkpoint(name, note_access, conn)
+        try:
+            cursor = conn.cursor()
+
+            # Fetch checkpoint
+            cursor.execute("SELECT * FROM checkpoints WHERE name = ?", (name,))
+            values = cursor.fetchone()
+
+            if not values:
+                raise name_index.not_found(conn, name)
+
+            checkpoint_row = dict(zip([d[0] for d in cursor.description], values))
+            if checkpoint_row['archived']:
+                self._rehydrate(cursor, checkpoint_row['id'], name)
+                conn.commit()
+
+            # Build checkpoint dict
+            checkpoint_data = {
+                "name": checkpoint_row['name'],
+                "summary": checkpoint_row['summary'],
+                "current_goal": checkpoint_row['current_goal'],
+                "working_directory": checkpoint_row['working_directory'],
+                "git_branch": checkpoint_row['git_branch'],
+                "git_status": checkpoint_row['git_status'],
+                "git_head": checkpoint_row['git_head'],
+                "created_at": checkpoint_row['created_at'],
+                "updated_at": checkpoint_row['updated_at'],
+            }
+
+            for table, columns, interned, path_field in CHILD_QUERIES:
+                cursor.execute(f"""
+                    SELECT {columns}
+                    FROM {table} WHERE checkpoint_id = ?
+                    ORDER BY created_at
+                """, (checkpoint_row['id'],))
+                checkpoint_data[table] = ChildRows.from_cursor(cursor, interned, path_field)
+
+            if note_access:
+                self._note_access(cursor, checkpoint_row['id'])
+            return checkpoint_data
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def resume_checkpoint(self, name: str) -> Dict[str, Any]:
+        """Load a checkpoint by name with all related data"""
+        compact = self._load_checkpoint(name)
+
+        # Convert to YAML for LLM consumption
+        yaml_content = "".join(render_sections(compact).values())
+
+        checkpoint_data = {
+            key: value.to_dicts() if isinstance(value, ChildRows) else value
+            for key, value in compact.items()
+        }
+
+        logger.info(f"Checkpoint '{name}' resumed successfully")
+
+        return {
+            "status": "success",
+            "message": f"Checkpoint '{name}' loaded successfully",
+            "checkpoint_yaml": yaml_content,
+            "checkpoint_data": checkpoint_data
+        }
+
+    def publish_snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        Write the checkpoint's rendered YAML to an immutable, memory-mappable
+        snapshot file. Later resumes are served from it without SQLite, and
+        saves or updates through the manager republish it.
+        """
+        path = snapshot_path(self.db_path, name)
+        header = publish(path, self._load_checkpoint(name))
+        self.snapshots.discard(path)
+
+        logger.info(f"Published snapshot of checkpoint '{name}'")
+
+        return {
+            "status": "success",
+            "message": f"Snapshot of checkpoint '{name}' published",
+            "path": path,
+            "bytes": os.path.getsize(path),
+            "sections": {section: length for section, (_, length) in header["sections"].items()}
+        }
+
+    def unpublish_snapshot(self, name: str) -> Dict[str, Any]:
+        """Remove a checkpoint's snapshot so resumes read the database again"""
+        self._remove_snapshot(name)
+        return {
+            "status": "success",
+            "message": f"Snapshot of checkpoint '{name}' removed"
+        }
+
+    def resolve_name(self, name: str) -> str:
+        """
+        Return name if it exists, else the only checkpoint name starting with
+        it. Raises ValueError listing the matches when several names start
+        with it, and naming the closest checkpoints when none does.
+        """
+        try:
+            with self._connect() as conn:
+                resolved = name_index.resolve(conn, name)
+                if resolved is None:
+                    raise name_index.not_found(conn, name)
+                return resolved
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def resume_text(self, name: str, sections: Optional[List[str]] = None) -> str:
+        """
+        Checkpoint YAML for the resume tool, optionally limited to sections.
+
+        Served zero-copy from the published snapshot when there is one,
+        otherwise rendered from the database.
+        """
+        reader = self.snapshots.get(snapshot_path(self.db_path, name))
+        if reader is not None:
+            # Snapshot reads count too, or the most-read checkpoints would look idle and be archived
+            self._note_snapshot_access(name)
+            return reader.text(sections)
+
+        unknown = [section for section in sections or [] if section not in SNAPSHOT_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)} (available: {', '.join(SNAPSHOT_SECTIONS)})")
+
+        rendered = render_sections(self._load_checkpoint(name), sections)
+        logger.info(f"Checkpoint '{name}' resumed successfully")
+        return "".join(rendered[section] for section in sections or rendered)
+
+    def list_checkpoints(self, working_directory: Optional[str] = None) -> Dict[str, Any]:
         """List all checkpoints ordered by updated_at DESC"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
 
-                cursor.execute("""
-                    SELECT id, name, created_at, updated_at, summary
-                    FROM checkpoints
-                    ORDER BY updated_at DESC
-                """)
+                if working_directory:
+                    cursor.execute("""
+                        SELECT id, name, created_at, updated_at, summary
+                        FROM checkpoints
+                        WHERE working_directory = ?
+                        ORDER BY updated_at DESC
+                    """, (working_directory,))
+                else:
+                    cursor.execute("""
+                        SELECT id, name, created_at, updated_at, summary
+                        FROM checkpoints
+                        ORDER BY updated_at DESC
+                    """)
 
                 checkpoints = [dict(row) for row in cursor.fetchall()]
                 logger.info(f"Listed {len(checkpoints)} checkpoints")
@@ -341,7 +918,7 @@ class CheckpointManager:
     def delete_checkpoint(self, name: str) -> Dict[str, Any]:
         """Delete a checkpoint and all related records"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
                 # Check if checkpoint exists
@@ -349,11 +926,13 @@ class CheckpointManager:
                 checkpoint = cursor.fetchone()
 
                 if not checkpoint:
-                    raise ValueError(f"Checkpoint '{name}' not found")
+                    raise name_index.not_found(conn, name)
 
-                # Delete checkpoint (CASCADE will delete related records)
-                cursor.execute("DELETE FROM checkpoints WHERE name = ?", (name,))
+                # Delete checkpoint and related records
+                self.semantic.remove(conn, [checkpoint[0]])
+                self._delete_checkpoint_rows(cursor, [checkpoint[0]])
                 conn.commit()
+                self._remove_snapshot(name)
 
                 logger.info(f"Checkpoint '{name}' deleted successfully")
 
@@ -368,15 +947,15 @@ class CheckpointManager:
     def update_checkpoint(self, name: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Partially update a checkpoint"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
                 # Check if checkpoint exists
-                cursor.execute("SELECT id FROM checkpoints WHERE name = ?", (name,))
+                cursor.execute("SELECT id, archived FROM checkpoints WHERE name = ?", (name,))
                 checkpoint = cursor.fetchone()
 
                 if not checkpoint:
-                    raise ValueError(f"Checkpoint '{name}' not found")
+                    raise name_index.not_found(conn, name)
 
                 checkpoint_id = checkpoint[0]
 
@@ -384,22 +963,18 @@ class CheckpointManager:
                 update_fields = []
                 update_values = []
 
-                field_mapping = {
-                    'summary': 'summary',
-                    'current_goal': 'current_goal',
-                    'working_directory': 'working_directory',
-                    'git_branch': 'git_branch',
-                    'git_status': 'git_status'
-                }
-
-                for key, db_field in field_mapping.items():
-                    if key in updates:
-                        update_fields.append(f"{db_field} = ?")
-                        update_values.append(updates[key])
+                for field in UPDATABLE_FIELDS:
+                    if field in updates:
+                        update_fields.append(f"{field} = ?")
+                        update_values.append(updates[field])
 
                 if not update_fields:
                     raise ValueError("No valid fields to update")
 
+                # An updated checkpoint is warm again
+                if checkpoint[1]:
+                    self._rehydrate(cursor, checkpoint_id, name)
+
                 update_values.append(name)  # For WHERE clause
 
                 query = f"""
@@ -410,6 +985,9 @@ class CheckpointManager:
 
                 cursor.execute(query, update_values)
                 conn.commit()
+                if 'summary' in updates or 'current_goal' in updates:
+                    self._reindex(conn, [checkpoint_id])
+                self._refresh_snapshot(name)
 
                 logger.info(f"Checkpoint '{name}' updated successfully")
 
@@ -422,116 +1000,1338 @@ class CheckpointManager:
             logger.error(f"Database error: {e}")
             raise
 
+    @staticmethod
+    def _resolve_row(cursor: sqlite3.Cursor, table: str, key_column: str, checkpoint_id: int,
+                     operation: Dict[str, Any]) -> int:
+        """Row id targeted by an operation, given either its id or its key (title, path or name)"""
+        if operation.get("id") is not None:
+            cursor.execute(f"SELECT id FROM {table} WHERE id = ? AND checkpoint_id = ?",
+                           (operation["id"], checkpoint_id))
+            if cursor.fetchone() is None:
+                raise ValueError(f"No {table} row with id {operation['id']} in this checkpoint")
+            return operation["id"]
+        if operation.get("key") is None:
+            raise ValueError(f"Pass 'id' or 'key' ({key_column})")
+
+        cursor.execute(f"SELECT id FROM {table} WHERE checkpoint_id = ? AND {key_column} = ? LIMIT 11",
+                       (checkpoint_id, operation["key"]))
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            raise ValueError(f"No {table} row with {key_column} '{operation['key']}'")
+        if len(ids) > 1:
+            raise ValueError(f"{key_column} '{operation['key']}' matches several rows (ids {ids}); pass 'id'")
+        return ids[0]
+
+    @staticmethod
+    def _child_values(table: str, item: Dict[str, Any]) -> List[Any]:
+        """Validate a new child row and return its settable columns in order, defaults filled in"""
+        _, key_column, columns = CHILD_OPERATIONS[table]
+        unknown = [field for field in item if field not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown} (allowed: {', '.join(columns)})")
+        if not item.get(key_column):
+            raise ValueError(f"'{key_column}' is required")
+        values = dict(CHILD_DEFAULTS.get(table, {}), **item)
+        return [values.get(column) for column in columns]
+
+    def _apply_operation(self, cursor: sqlite3.Cursor, checkpoint_id: int,
+                         operation: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one granular operation inside the caller's transaction"""
+        kind = operation.get("op")
+        if kind == "update_checkpoint":
+            updates = {key: value for key, value in (operation.get("updates") or {}).items()
+                       if key in UPDATABLE_FIELDS}
+            if not updates:
+                raise ValueError("No valid fields to update")
+            assignments = ", ".join(f"{field} = ?" for field in updates)
+            cursor.execute(f"UPDATE checkpoints SET {assignments} WHERE id = ?",
+                           list(updates.values()) + [checkpoint_id])
+            return {"op": kind, "updated_fields": list(updates)}
+
+        if kind not in OPERATIONS:
+            raise ValueError(f"Unknown operation (available: update_checkpoint, {', '.join(OPERATIONS)})")
+        action, table = OPERATIONS[kind]
+        _, key_column, columns = CHILD_OPERATIONS[table]
+
+        if action == "add":
+            items = operation.get("items") or ([operation["item"]] if operation.get("item") else [])
+            if not items:
+                raise ValueError("Pass 'item' or 'items'")
+            ids = []
+            for item in items:
+                cursor.execute(
+                    f"INSERT INTO {table} (checkpoint_id, {', '.join(columns)}) "
+                    f"VALUES (?, {', '.join('?' for _ in columns)})",
+                    [checkpoint_id] + self._child_values(table, item),
+                )
+                ids.append(cursor.lastrowid)
+            return {"op": kind, "ids": ids}
+
+        row_id = self._resolve_row(cursor, table, key_column, checkpoint_id, operation)
+        if action == "remove":
+            cursor.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            return {"op": kind, "id": row_id}
+
+        fields = operation.get("fields") or {}
+        unknown = [field for field in fields if field not in columns]
+        if unknown or not fields:
+            raise ValueError(f"Pass 'fields' to change (allowed: {', '.join(columns)})")
+        if fields.get(key_column, True) in (None, ""):
+            raise ValueError(f"'{key_column}' cannot be empty")
+        assignments = [f"{field} = ?" for field in fields]
+        if table == "file_modifications" and "file_path" in fields:
+            # Captured state belonged to the old path
+            assignments += ["size = NULL", "mtime_ns = NULL", "blob_hash = NULL"]
+        cursor.execute(f"UPDATE {table} SET {', '.join(assignments)} WHERE id = ?",
+                       list(fields.values()) + [row_id])
+        return {"op": kind, "id": row_id}
+
+    def apply_operations(self, name: str, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply granular edits to one checkpoint atomically, touching only the
+        affected rows.
+
+        Args:
+            name: Checkpoint name
+            operations: Dicts with "op" plus its arguments:
+                add_<noun>: "item" or "items" (new rows)
+                update_<noun>: "id" or "key", and "fields" to change
+                remove_<noun>: "id" or "key"
+                update_checkpoint: "updates" (scalar fields)
+                where <noun> is todo, file_modification, decision or artifact and
+                "key" matches title, file_path, title or name respectively
+
+        Returns:
+            Dict with one result per operation (new ids, or the id changed)
+        """
+        if not operations:
+            raise ValueError("No operations given")
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, archived FROM checkpoints WHERE name = ?", (name,))
+                checkpoint = cursor.fetchone()
+                if not checkpoint:
+                    raise name_index.not_found(conn, name)
+                checkpoint_id = checkpoint[0]
+                if checkpoint[1]:
+                    self._rehydrate(cursor, checkpoint_id, name)
+
+                # Any failure propagates out of the with block, which rolls everything back
+                results = []
+                for index, operation in enumerate(operations):
+                    try:
+                        results.append(self._apply_operation(cursor, checkpoint_id, operation))
+                    except ValueError as e:
+                        raise ValueError(f"Operation {index} ({operation.get('op')}): {e}") from None
+                cursor.execute("UPDATE checkpoints SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                               (checkpoint_id,))
+                conn.commit()
 
-# Initialize checkpoint manager
-checkpoint_manager = CheckpointManager(DB_PATH)
+                # Decisions, artifacts, summary and goal feed the semantic index
+                if any(result["op"] == "update_checkpoint" or
+                       OPERATIONS[result["op"]][1] in ("key_decisions", "artifacts") for result in results):
+                    self._reindex(conn, [checkpoint_id])
+                self._refresh_snapshot(name)
 
+                logger.info(f"Applied {len(results)} operations to checkpoint '{name}'")
 
-# Register tools
-@server.list_tools()
-async def list_tools():
-    """List all available tools"""
-    return [
-        Tool(
-            name="save_checkpoint",
-            description="Save a new checkpoint or update an existing one with project state",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Unique name for the checkpoint"
-                    },
-                    "data": {
-                        "type": "object",
-                        "description": "Checkpoint data including summary, goals, and related items",
-                        "properties": {
-                            "summary": {"type": "string"},
-                            "current_goal": {"type": "string"},
-                            "working_directory": {"type": "string"},
-                            "git_branch": {"type": "string"},
-                            "git_status": {"type": "string"},
-                            "todos": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "title": {"type": "string"},
-                                        "description": {"type": "string"},
-                                        "status": {"type": "string"},
-                                        "priority": {"type": "string"}
-                                    }
-                                }
-                            },
-                            "file_modifications": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "file_path": {"type": "string"},
-                                        "status": {"type": "string"},
-                                        "description": {"type": "string"}
-                                    }
-                                }
-                            },
-                            "key_decisions": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "title": {"type": "string"},
-                                        "rationale": {"type": "string"},
-                                        "impact": {"type": "string"}
-                                    }
-                                }
-                            },
-                            "artifacts": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "name": {"type": "string"},
-                                        "artifact_type": {"type": "string"},
-                                        "path": {"type": "string"},
-                                        "description": {"type": "string"}
-                                    }
-                                }
-                            }
-                        },
-                        "required": ["summary"]
-                    }
-                },
-                "required": ["name", "data"]
-            }
-        ),
-        Tool(
-            name="resume_checkpoint",
-            description="Load a checkpoint by name with all related data",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Name of the checkpoint to resume"
-                    }
-                },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="list_checkpoints",
-            description="List all checkpoints ordered by most recent update",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="delete_checkpoint",
-            description="Delete a checkpoint and all its related data",
-            inputSchema={
-                "type": "object",
-                "properties": {
+                return {
+                    "status": "success",
+                    "message": f"Applied {len(results)} operations to checkpoint '{name}'",
+                    "results": results
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def search_checkpoints(self, query: str, working_directory: Optional[str] = None,
+                           limit: int = 20) -> Dict[str, Any]:
+        """Case-insensitive substring search over checkpoint names and summaries"""
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+
+                sql = """
+                    SELECT name, working_directory, git_branch, updated_at, summary
+                    FROM checkpoints
+                    WHERE (name LIKE ? OR summary LIKE ?)
+                """
+                params: List[Any] = [f"%{query}%", f"%{query}%"]
+                if working_directory:
+                    sql += " AND working_directory = ?"
+                    params.append(working_directory)
+                sql += " ORDER BY updated_at DESC LIMIT ?"
+                params.append(limit)
+
+                cursor.execute(sql, params)
+                matches = [dict(row) for row in cursor.fetchall()]
+
+                return {
+                    "status": "success",
+                    "count": len(matches),
+                    "checkpoints": matches
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def open_todos(self, working_directory: Optional[str] = None, git_branch: Optional[str] = None,
+                   status: Optional[str] = None, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Pending and in-progress todos across all checkpoints, without loading
+        any of them. Todos with the same title and description in one project
+        are listed once, from the most recent checkpoint holding them open,
+        and dropped when a newer checkpoint of the project (on git_branch, if
+        given) has them completed.
+        Checkpoints in cold storage are not included.
+
+        Args:
+            working_directory: Only checkpoints saved from this directory
+            git_branch: Only checkpoints on this branch
+            status: Only todos with this status (default: every status but completed)
+            limit: Maximum number of todos returned
+            offset: Number of todos to skip, for the next page
+
+        Returns:
+            Dict with the page of todos, the total and the next page's offset
+        """
+        if status == "completed":
+            raise ValueError("open_todos lists incomplete todos only")
+        where, params = [], {"limit": limit, "offset": offset}
+        for clause, key, value in (("c.working_directory = :working_directory", "working_directory", working_directory),
+                                   ("c.git_branch = :git_branch", "git_branch", git_branch),
+                                   ("t.status = :status", "status", status)):
+            if value is not None:
+                where.append(clause)
+                params[key] = value
+        # t.status != 'completed' keeps the lookup on the partial index idx_todos_open
+        sql = f"""
+            WITH occurrences AS (
+                SELECT t.title, t.description, t.status, t.priority, c.id, c.name, c.working_directory,
+                    c.git_branch, c.updated_at,
+                    ROW_NUMBER() OVER (content ORDER BY c.updated_at DESC, c.id DESC) AS recency,
+                    COUNT(*) OVER content AS occurrences
+                FROM checkpoints c JOIN todos t ON t.checkpoint_id = c.id AND t.status != 'completed'
+                {"WHERE " + " AND ".join(where) if where else ""}
+                WINDOW content AS (PARTITION BY c.working_directory, t.title, t.description)
+            ),
+            current AS (
+                SELECT * FROM occurrences o
+                WHERE recency = 1 AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c JOIN todos t ON t.checkpoint_id = c.id
+                    WHERE c.working_directory IS o.working_directory AND (c.updated_at, c.id) > (o.updated_at, o.id)
+                        AND t.status = 'completed' AND t.title = o.title AND t.description IS o.description
+                        {"AND c.git_branch = :git_branch" if git_branch is not None else ""}
+                )
+            )
+            SELECT title, description, status, priority, occurrences, name AS checkpoint,
+                working_directory, git_branch, updated_at, COUNT(*) OVER () AS total
+            FROM current
+            ORDER BY status = 'in_progress' DESC,
+                {PRIORITY_RANK_SQL},
+                updated_at DESC, title
+            LIMIT :limit OFFSET :offset
+        """
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                todos = [dict(row) for row in conn.execute(sql, params)]
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+        total = todos[0]["total"] if todos else 0
+        for todo in todos:
+            del todo["total"]
+        return {
+            "status": "success",
+            "count": len(todos),
+            "total": total,
+            "next_offset": offset + len(todos) if offset + len(todos) < total else None,
+            "todos": todos
+        }
+
+    def semantic_search_checkpoints(self, query: str, working_directory: Optional[str] = None,
+                                    limit: int = 10, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Rank checkpoints by meaning rather than exact wording.
+
+        Builds the vector index on first use (or when rebuild is set, e.g.
+        after checkpoints were written by the CLI scripts); later saves,
+        updates and deletes keep it current.
+        """
+        if not self.semantic.available:
+            raise RuntimeError("Semantic search requires numpy (pip install numpy)")
+        try:
+            with self._connect() as conn:
+                if rebuild or not self.semantic.is_built():
+                    self.semantic.rebuild(conn)
+                matches = self.semantic.search(conn, query, limit, working_directory)
+
+                return {
+                    "status": "success",
+                    "query": query,
+                    "count": len(matches),
+                    "checkpoints": matches
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def watch_checkpoints(self, since: Optional[int] = None, timeout: float = 0.0,
+                          limit: int = 500) -> Dict[str, Any]:
+        """
+        Checkpoints created, updated or deleted after a cursor.
+
+        Args:
+            since: Cursor returned by the previous call (None: start from now)
+            timeout: Seconds to wait for a change before returning empty
+            limit: Maximum checkpoints per response
+
+        Returns:
+            Changed names with their latest op and version, plus the next cursor
+        """
+        try:
+            result = change_log.watch(self._open, since, timeout, limit)
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+        return {"status": "success", **result}
+
+    def verify_checkpoint(self, name: str) -> Dict[str, Any]:
+        """Report files that drifted since the checkpoint captured their state"""
+        try:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+
+                cursor.execute(
+                    "SELECT id, working_directory, git_head, archived FROM checkpoints WHERE name = ?", (name,)
+                )
+                checkpoint = cursor.fetchone()
+                if not checkpoint:
+                    raise name_index.not_found(conn, name)
+                if checkpoint['archived']:
+                    self._rehydrate(cursor, checkpoint['id'], name)
+
+                cursor.execute("""
+                    SELECT file_path, status, size, mtime_ns, blob_hash
+                    FROM file_modifications WHERE checkpoint_id = ?
+                """, (checkpoint['id'],))
+                records = [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+        working_directory = checkpoint['working_directory']
+        report = file_state.verify(working_directory, records)
+
+        head = None
+        if checkpoint['git_head']:
+            current = file_state.git_summary(working_directory).get('git_head')
+            head = {
+                "saved": checkpoint['git_head'],
+                "current": current,
+                "moved": current != checkpoint['git_head']
+            }
+
+        clean = not (report["drifted"] or report["missing"] or report["reappeared"] or (head and head["moved"]))
+        logger.info(f"Checkpoint '{name}' verified ({len(report['drifted'])} drifted)")
+
+        return {
+            "status": "success",
+            "name": name,
+            "clean": clean,
+            "working_directory": working_directory,
+            "git_head": head,
+            **report
+        }
+
+    def diff_checkpoints(self, name_a: str, name_b: str, b_db_path: Optional[str] = None,
+                         limit: int = 200) -> Dict[str, Any]:
+        """Structured delta from checkpoint a to checkpoint b (b optionally in another database)"""
+        try:
+            with self._connect() as conn:
+                self._ensure_hot(conn, [name_a] if b_db_path else [name_a, name_b])
+                return diff_checkpoints(conn, name_a, name_b, attach_path=b_db_path, limit=limit)
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def set_pinned(self, name: str, pinned: bool = True) -> Dict[str, Any]:
+        """Pin a checkpoint so retention never prunes it (or unpin it)"""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("UPDATE checkpoints SET pinned = ? WHERE name = ?", (int(pinned), name))
+                if cursor.rowcount == 0:
+                    raise name_index.not_found(conn, name)
+                conn.commit()
+
+                state = "pinned" if pinned else "unpinned"
+                logger.info(f"Checkpoint '{name}' {state}")
+
+                return {
+                    "status": "success",
+                    "message": f"Checkpoint '{name}' {state}",
+                    "pinned": pinned
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def prune_checkpoints(self, policy: RetentionPolicy, batch_size: int = 50,
+                          dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete one batch of unpinned checkpoints that violate the retention policy.
+
+        Candidates are the oldest checkpoints beyond max_count overall, older
+        than max_age_days, or beyond max_per_branch within one
+        (working_directory, git_branch). Call repeatedly until nothing is pruned.
+        """
+        if policy.is_empty():
+            return {"status": "success", "pruned": []}
+
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, name FROM (
+                        SELECT id, name, pinned, updated_at,
+                            ROW_NUMBER() OVER (ORDER BY updated_at DESC, id DESC) AS overall_rank,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY working_directory, git_branch
+                                ORDER BY updated_at DESC, id DESC
+                            ) AS branch_rank
+                        FROM checkpoints
+                    )
+                    WHERE pinned = 0 AND (
+                        (:max_count IS NOT NULL AND overall_rank > :max_count)
+                        OR (:max_age IS NOT NULL AND updated_at < datetime('now', :max_age))
+                        OR (:max_per_branch IS NOT NULL AND branch_rank > :max_per_branch)
+                    )
+                    ORDER BY updated_at
+                    LIMIT :batch_size
+                """, {
+                    "max_count": policy.max_count,
+                    "max_age": f"-{policy.max_age_days} days" if policy.max_age_days is not None else None,
+                    "max_per_branch": policy.max_per_branch,
+                    "batch_size": batch_size
+                })
+                candidates = cursor.fetchall()
+
+                if candidates and not dry_run:
+                    self.semantic.remove(conn, [row[0] for row in candidates])
+                    self._delete_checkpoint_rows(cursor, [row[0] for row in candidates])
+                    conn.commit()
+
+                pruned = [row[1] for row in candidates]
+                if not dry_run:
+                    for pruned_name in pruned:
+                        self._remove_snapshot(pruned_name)
+                if pruned and not dry_run:
+                    logger.info(f"Pruned {len(pruned)} checkpoints by retention policy")
+
+                return {
+                    "status": "success",
+                    "dry_run": dry_run,
+                    "pruned": pruned
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def remove_orphans(self) -> int:
+        """
+        Delete child rows whose checkpoint no longer exists, left behind by
+        older deletes that relied on ON DELETE CASCADE. Scans every child
+        table, so it runs once per maintenance pass rather than per batch.
+
+        Returns:
+            Number of rows removed
+        """
+        try:
+            with self._connect() as conn:
+                removed = 0
+                for table in CHILD_TABLES:
+                    cursor = conn.execute(f"""
+                        DELETE FROM {table}
+                        WHERE checkpoint_id NOT IN (SELECT id FROM checkpoints)
+                    """)
+                    removed += max(cursor.rowcount, 0)
+                conn.commit()
+                if removed:
+                    logger.info(f"Removed {removed} orphaned child rows")
+                return removed
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def archive_checkpoints(self, after_days: float, batch_size: int = 50,
+                            dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Move one batch of unpinned checkpoints neither updated nor read for
+        after_days into cold storage, leaving stubs that rehydrate on load.
+        Call repeatedly until nothing is archived; compact afterwards to give
+        the freed pages back.
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT c.id, c.name
+                    FROM checkpoints c LEFT JOIN checkpoint_access a ON a.checkpoint_id = c.id
+                    WHERE c.archived = 0 AND c.pinned = 0
+                        AND c.updated_at < datetime('now', :age)
+                        AND (a.accessed_at IS NULL OR a.accessed_at < datetime('now', :age))
+                    ORDER BY c.updated_at
+                    LIMIT :batch_size
+                """, {"age": f"-{after_days} days", "batch_size": batch_size})
+                candidates = cursor.fetchall()
+
+                rows = raw_bytes = stored_bytes = 0
+                if not dry_run:
+                    for checkpoint_id, name in candidates:
+                        moved, raw, stored = cold_storage.archive(cursor, checkpoint_id, name, CHILD_TABLES)
+                        rows += moved
+                        raw_bytes += raw
+                        stored_bytes += stored
+                        cursor.execute("UPDATE checkpoints SET archived = 1 WHERE id = ?", (checkpoint_id,))
+                    conn.commit()
+
+                archived = [row[1] for row in candidates]
+                if archived and not dry_run:
+                    logger.info(f"Archived {len(archived)} checkpoints ({rows} rows) to cold storage")
+
+                return {
+                    "status": "success",
+                    "dry_run": dry_run,
+                    "archived": archived,
+                    "rows": rows,
+                    "raw_bytes": raw_bytes,
+                    "stored_bytes": stored_bytes
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def warm(self, working_directory: Optional[str], git_branch: Optional[str], limit: int,
+             deadline: float) -> Dict[str, Any]:
+        """
+        Fill the connection pool, then load and render up to limit of the most
+        recently updated checkpoints of working_directory (git_branch first;
+        the most recent anywhere when it has none) until the time.monotonic()
+        deadline, and run PRAGMA optimize. Loads are not recorded as accesses,
+        and archived checkpoints are left in cold storage.
+        """
+        connections = 0
+        if self.pool is not None:
+            # Leased together so each is a separate connection, then all returned idle
+            leases = [self.pool.lease() for _ in range(self.pool.size)]
+            for lease in leases:
+                with lease:
+                    pass
+            connections = len(leases)
+
+        loaded = []
+        try:
+            # One lease throughout: PRAGMA optimize acts on the queries its own connection ran
+            with self._connect() as conn:
+                names = [row[0] for row in conn.execute("""
+                    SELECT name FROM checkpoints
+                    WHERE archived = 0 AND working_directory = ?
+                    ORDER BY git_branch IS ? DESC, updated_at DESC
+                    LIMIT ?
+                """, (working_directory, git_branch, limit))]
+                if not names:
+                    names = [row[0] for row in conn.execute(
+                        "SELECT name FROM checkpoints WHERE archived = 0 ORDER BY updated_at DESC LIMIT ?",
+                        (limit,)
+                    )]
+
+                for name in names:
+                    if time.monotonic() >= deadline:
+                        break
+                    if self.snapshots.get(snapshot_path(self.db_path, name)) is None:
+                        try:
+                            render_sections(self._load_checkpoint(name, note_access=False, conn=conn))
+                        except ValueError:
+                            # Deleted since it was picked
+                            continue
+                    loaded.append(name)
+
+                # Once the loads have shown it which tables matter
+                conn.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+        return {
+            "status": "success",
+            "connections": connections,
+            "loaded": loaded,
+            "budget_exhausted": len(loaded) < len(names) and time.monotonic() >= deadline
+        }
+
+    def analytics(self, report: str, working_directory: Optional[str] = None,
+                  git_branch: Optional[str] = None, since: Optional[str] = None,
+                  period: str = "week", top: int = 10, limit: int = 100) -> Dict[str, Any]:
+        """Run one of the aggregate reports in analytics.REPORTS"""
+        try:
+            with self._connect() as conn:
+                return analytics.run_report(conn, report, working_directory, git_branch,
+                                            since, period, top, limit)
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def compact(self, analyze: bool = True, vacuum: bool = False) -> Dict[str, Any]:
+        """
+        Return free pages to the filesystem and refresh planner statistics.
+
+        Databases in incremental auto-vacuum mode (every database created by
+        this version) run PRAGMA incremental_vacuum. Older databases need a
+        one-off full VACUUM to convert, which rewrites the whole file and
+        blocks writers, so it only runs when vacuum is True; until then only
+        the statistics are refreshed.
+        """
+        try:
+            # Autocommit mode: VACUUM cannot run inside a transaction
+            conn = self._connect(isolation_level=None)
+            try:
+                cursor = conn.cursor()
+                page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+                pages_before = cursor.execute("PRAGMA page_count").fetchone()[0]
+                freelist = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+                if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                    # Stepped through a cursor the pragma frees a single page; a script runs it to completion
+                    conn.executescript("PRAGMA incremental_vacuum")
+                    mode = "incremental_vacuum"
+                elif vacuum:
+                    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    cursor.execute("VACUUM")
+                    mode = "vacuum"
+                else:
+                    mode = "vacuum_required"
+
+                pages_after = cursor.execute("PRAGMA page_count").fetchone()[0]
+
+                if analyze:
+                    cursor.execute("ANALYZE")
+                cursor.execute("PRAGMA optimize")
+            finally:
+                conn.close()
+
+            # A full VACUUM can grow the file (the auto-vacuum pointer map is added)
+            reclaimed = max(pages_before - pages_after, 0) * page_size
+            if mode == "vacuum_required":
+                logger.info("Database needs a one-off VACUUM (run_maintenance with vacuum) before it can be compacted")
+            else:
+                logger.info(f"Compacted database ({mode}), reclaimed {reclaimed} bytes")
+
+            return {
+                "status": "success",
+                "mode": mode,
+                "free_pages_before": freelist,
+                "bytes_before": pages_before * page_size,
+                "bytes_after": pages_after * page_size,
+                "reclaimed_bytes": reclaimed
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+
+class ShardedCheckpointManager:
+    """
+    Routes checkpoints to per-project shard databases.
+
+    Each project (git root of working_directory, else the directory itself)
+    gets its own CheckpointManager and database file under shards/, so saves
+    in different projects never contend for the same lock. A small catalog
+    database maps checkpoint names to shards for routing, listing and search.
+    Checkpoints without a working_directory go to the default shard.
+    """
+
+    def __init__(self, base_dir: str, metrics: Optional[Metrics] = None):
+        self.base_dir = os.path.expanduser(base_dir)
+        self.shard_dir = os.path.join(self.base_dir, "shards")
+        self.metrics = metrics or Metrics()
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.catalog = ShardCatalog(os.path.join(self.base_dir, "catalog.db"))
+        self._shards: Dict[str, CheckpointManager] = {}
+
+    def shard(self, key: str) -> CheckpointManager:
+        """Return (opening on first use) the manager for a shard"""
+        manager = self._shards.get(key)
+        if manager is None:
+            manager = CheckpointManager(os.path.join(self.shard_dir, f"{key}.db"), metrics=self.metrics)
+            self._shards[key] = manager
+        return manager
+
+    def shard_keys(self) -> List[str]:
+        """All shards on disk"""
+        return sorted(
+            filename[:-3] for filename in os.listdir(self.shard_dir) if filename.endswith(".db")
+        )
+
+    def _for_checkpoint(self, name: str) -> CheckpointManager:
+        """Manager of the shard holding an existing checkpoint"""
+        key = self.catalog.lookup(name)
+        if key is None:
+            raise self.catalog.not_found(name)
+        return self.shard(key)
+
+    def save_checkpoint(self, name: str, data: Dict[str, Any],
+                        capture_file_state: bool = False) -> Dict[str, Any]:
+        """Save into the project's shard, moving the checkpoint if its project changed"""
+        key = shard_key(data.get('working_directory'))
+        previous = self.catalog.lookup(name)
+
+        result = self.shard(key).save_checkpoint(name, data, capture_file_state)
+        self.catalog.register(name, key, data)
+
+        if previous is not None and previous != key:
+            self.shard(previous).delete_checkpoint(name)
+            result["action"] = "moved"
+            result["message"] = f"Checkpoint '{name}' moved to shard '{key}'"
+
+        result["shard"] = key
+        return result
+
+    def _for_session(self, session_id: str):
+        """Split a sharded session id ("<shard>:<id>") into the shard's manager and its own id"""
+        key, _, local_id = session_id.rpartition(":")
+        if not key or key not in self.shard_keys():
+            raise ValueError(f"Save session '{session_id}' not found (committed, aborted or expired)")
+        return self.shard(key), key, local_id
+
+    def begin_save(self, name: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Stage in the shard of the project the checkpoint will be saved to"""
+        key = shard_key((data or {}).get('working_directory'))
+        result = self.shard(key).begin_save(name, data)
+        result["session_id"] = f"{key}:{result['session_id']}"
+        return result
+
+    def append_save(self, session_id: str, section: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        manager, _, local_id = self._for_session(session_id)
+        return dict(manager.append_save(local_id, section, rows), session_id=session_id)
+
+    def commit_save(self, session_id: str) -> Dict[str, Any]:
+        """Commit in the session's shard, then register (or move) the checkpoint as save_checkpoint does"""
+        manager, key, local_id = self._for_session(session_id)
+        result = manager.commit_save(local_id)
+        name = result["name"]
+        with manager._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT working_directory, git_branch, summary FROM checkpoints WHERE name = ?",
+                               (name,)).fetchone()
+        previous = self.catalog.lookup(name)
+        self.catalog.register(name, key, dict(row))
+
+        if previous is not None and previous != key:
+            self.shard(previous).delete_checkpoint(name)
+            result["action"] = "moved"
+            result["message"] = f"Checkpoint '{name}' moved to shard '{key}'"
+
+        result["shard"] = key
+        return result
+
+    def abort_save(self, session_id: str) -> Dict[str, Any]:
+        manager, _, local_id = self._for_session(session_id)
+        return dict(manager.abort_save(local_id), message=f"Save session '{session_id}' aborted")
+
+    def expire_save_sessions(self, ttl: Optional[float] = None) -> int:
+        return sum(self.shard(key).expire_save_sessions(ttl) for key in self.shard_keys())
+
+    def resume_checkpoint(self, name: str) -> Dict[str, Any]:
+        return self._for_checkpoint(name).resume_checkpoint(name)
+
+    def resolve_name(self, name: str) -> str:
+        """Exact or unique-prefix match against the catalog"""
+        resolved = self.catalog.resolve(name)
+        if resolved is None:
+            raise self.catalog.not_found(name)
+        return resolved
+
+    def resume_text(self, name: str, sections: Optional[List[str]] = None) -> str:
+        return self._for_checkpoint(name).resume_text(name, sections)
+
+    def publish_snapshot(self, name: str) -> Dict[str, Any]:
+        return self._for_checkpoint(name).publish_snapshot(name)
+
+    def unpublish_snapshot(self, name: str) -> Dict[str, Any]:
+        return self._for_checkpoint(name).unpublish_snapshot(name)
+
+    def verify_checkpoint(self, name: str) -> Dict[str, Any]:
+        return self._for_checkpoint(name).verify_checkpoint(name)
+
+    def delete_checkpoint(self, name: str) -> Dict[str, Any]:
+        result = self._for_checkpoint(name).delete_checkpoint(name)
+        self.catalog.remove([name])
+        return result
+
+    def update_checkpoint(self, name: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Update in place; the checkpoint only changes shard on its next save"""
+        result = self._for_checkpoint(name).update_checkpoint(name, updates)
+        self.catalog.update(name, updates)
+        return result
+
+    def apply_operations(self, name: str, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        result = self._for_checkpoint(name).apply_operations(name, operations)
+        updates = {}
+        for operation in operations:
+            if operation.get("op") == "update_checkpoint":
+                updates.update(operation.get("updates") or {})
+        self.catalog.update(name, updates)
+        return result
+
+    def diff_checkpoints(self, name_a: str, name_b: str, b_db_path: Optional[str] = None,
+                         limit: int = 200) -> Dict[str, Any]:
+        """Diff across shards by attaching b's shard to a's connection"""
+        manager_a = self._for_checkpoint(name_a)
+        if b_db_path is None:
+            manager_b = self._for_checkpoint(name_b)
+            if manager_b is not manager_a:
+                with manager_b._connect() as conn:
+                    manager_b._ensure_hot(conn, [name_b])
+                b_db_path = manager_b.db_path
+        return manager_a.diff_checkpoints(name_a, name_b, b_db_path, limit)
+
+    def set_pinned(self, name: str, pinned: bool = True) -> Dict[str, Any]:
+        result = self._for_checkpoint(name).set_pinned(name, pinned)
+        self.catalog.update(name, {"pinned": int(pinned)}, touch=False)
+        return result
+
+    def list_checkpoints(self, working_directory: Optional[str] = None) -> Dict[str, Any]:
+        """List from the catalog without opening any shard"""
+        checkpoints = self.catalog.list(working_directory)
+        logger.info(f"Listed {len(checkpoints)} checkpoints")
+        return {
+            "status": "success",
+            "count": len(checkpoints),
+            "checkpoints": checkpoints
+        }
+
+    def search_checkpoints(self, query: str, working_directory: Optional[str] = None,
+                           limit: int = 20) -> Dict[str, Any]:
+        matches = self.catalog.search(query, working_directory, limit)
+        return {
+            "status": "success",
+            "count": len(matches),
+            "checkpoints": matches
+        }
+
+    def open_todos(self, working_directory: Optional[str] = None, git_branch: Optional[str] = None,
+                   status: Optional[str] = None, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """Open todos from the directory's shard, or every shard merged in the same order"""
+        keys = self.shard_keys()
+        if working_directory:
+            keys = [key for key in keys if key == shard_key(working_directory)]
+        # A project lives in one shard, so deduplication never spans shards
+        todos, total = [], 0
+        for key in keys:
+            result = self.shard(key).open_todos(working_directory, git_branch, status, limit + offset)
+            todos.extend(result["todos"])
+            total += result["total"]
+        todos.sort(key=lambda todo: todo["title"])
+        todos.sort(key=lambda todo: todo["updated_at"] or "", reverse=True)
+        todos.sort(key=lambda todo: (todo["status"] != "in_progress",
+                                     TODO_PRIORITY_ORDER.get(todo["priority"], len(TODO_PRIORITY_ORDER))))
+        todos = todos[offset:offset + limit]
+        return {
+            "status": "success",
+            "count": len(todos),
+            "total": total,
+            "next_offset": offset + len(todos) if offset + len(todos) < total else None,
+            "todos": todos
+        }
+
+    def semantic_search_checkpoints(self, query: str, working_directory: Optional[str] = None,
+                                    limit: int = 10, rebuild: bool = False) -> Dict[str, Any]:
+        """Search the directory's shard, or every shard merged by score"""
+        if working_directory:
+            key = shard_key(working_directory)
+            keys = [key] if key in self.shard_keys() else []
+        else:
+            keys = self.shard_keys()
+        matches = []
+        for key in keys:
+            result = self.shard(key).semantic_search_checkpoints(query, working_directory, limit, rebuild)
+            matches.extend(result["checkpoints"])
+        matches = sorted(matches, key=lambda match: match["score"], reverse=True)[:limit]
+        return {
+            "status": "success",
+            "query": query,
+            "count": len(matches),
+            "checkpoints": matches
+        }
+
+    def watch_checkpoints(self, since: Optional[int] = None, timeout: float = 0.0,
+                          limit: int = 500) -> Dict[str, Any]:
+        """Watch the catalog, whose own change log covers every shard"""
+        result = change_log.watch(self.catalog._connect, since, timeout, limit)
+        return {"status": "success", **result}
+
+    def prune_checkpoints(self, policy: RetentionPolicy, batch_size: int = 50,
+                          dry_run: bool = False) -> Dict[str, Any]:
+        """Apply the retention policy to each shard (max_count is per shard)"""
+        pruned: List[str] = []
+        for key in self.shard_keys():
+            result = self.shard(key).prune_checkpoints(policy, batch_size, dry_run=dry_run)
+            pruned.extend(result["pruned"])
+        if not dry_run:
+            self.catalog.remove(pruned)
+        return {
+            "status": "success",
+            "dry_run": dry_run,
+            "pruned": pruned
+        }
+
+    def remove_orphans(self) -> int:
+        """Remove orphaned child rows in every shard"""
+        return sum(self.shard(key).remove_orphans() for key in self.shard_keys())
+
+    def archive_checkpoints(self, after_days: float, batch_size: int = 50,
+                            dry_run: bool = False) -> Dict[str, Any]:
+        """Archive one batch per shard (each shard has its own archive)"""
+        totals = {"archived": [], "rows": 0, "raw_bytes": 0, "stored_bytes": 0}
+        for key in self.shard_keys():
+            result = self.shard(key).archive_checkpoints(after_days, batch_size, dry_run=dry_run)
+            for field in totals:
+                totals[field] += result[field]
+        return dict(totals, status="success", dry_run=dry_run)
+
+    def warm(self, working_directory: Optional[str], git_branch: Optional[str], limit: int,
+             deadline: float) -> Dict[str, Any]:
+        """Warm the project's shard, or the shard of the most recently updated checkpoint"""
+        key = shard_key(working_directory)
+        if key not in self.shard_keys():
+            recent = self.catalog.list(limit=1)
+            if not recent:
+                return {"status": "success", "connections": 0, "loaded": [], "budget_exhausted": False}
+            key = recent[0]["shard"]
+        return dict(self.shard(key).warm(working_directory, git_branch, limit, deadline), shard=key)
+
+    def analytics(self, report: str, working_directory: Optional[str] = None,
+                  git_branch: Optional[str] = None, since: Optional[str] = None,
+                  period: str = "week", top: int = 10, limit: int = 100) -> Dict[str, Any]:
+        """Run a report on the project's shard, or on every shard and merge the rows"""
+        keys = self.shard_keys()
+        if working_directory:
+            keys = [key for key in keys if key == shard_key(working_directory)]
+        results = [
+            self.shard(key).analytics(report, working_directory, git_branch, since, period, top, limit)
+            for key in keys
+        ]
+        if not results:
+            return {"report": report, "columns": [], "rows": []}
+        return analytics.merge(results, limit)
+
+    def compact(self, analyze: bool = True, vacuum: bool = False) -> Dict[str, Any]:
+        """Compact every shard and sum the results"""
+        totals = {"bytes_before": 0, "bytes_after": 0, "reclaimed_bytes": 0, "free_pages_before": 0}
+        for key in self.shard_keys():
+            result = self.shard(key).compact(analyze=analyze, vacuum=vacuum)
+            for field in totals:
+                totals[field] += result[field]
+        return dict(totals, status="success", mode="per-shard", shards=len(self.shard_keys()))
+
+    def rebuild_catalog(self) -> Dict[str, Any]:
+        """Recreate catalog entries from the shards themselves"""
+        total = 0
+        for key in self.shard_keys():
+            with self.shard(key)._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = [dict(row) for row in conn.execute("""
+                    SELECT name, working_directory, git_branch, summary, pinned, created_at, updated_at
+                    FROM checkpoints
+                """)]
+            self.catalog.replace_shard(key, rows)
+            total += len(rows)
+        logger.info(f"Rebuilt catalog with {total} checkpoints")
+        return {"status": "success", "count": total, "shards": len(self.shard_keys())}
+
+    def import_database(self, db_path: str) -> Dict[str, Any]:
+        """Copy every checkpoint from an unsharded database into the shards"""
+        source = CheckpointManager(db_path, metrics=self.metrics)
+        names = [cp["name"] for cp in source.list_checkpoints()["checkpoints"]]
+        for name in names:
+            self.save_checkpoint(name, source.resume_checkpoint(name)["checkpoint_data"])
+        logger.info(f"Imported {len(names)} checkpoints from {db_path}")
+        return {"status": "success", "imported": len(names)}
+
+
+# Initialize metrics and checkpoint manager
+metrics = Metrics.from_env()
+if SHARD_DIR:
+    checkpoint_manager = ShardedCheckpointManager(SHARD_DIR, metrics=metrics)
+else:
+    checkpoint_manager = CheckpointManager(DB_PATH, metrics=metrics)
+
+# Local-LLM usage, written in batches (flush thread started in __main__)
+usage_log = UsageLogger.from_env()
+
+# Anonymised tool-call trace for load replay; off unless CHECKPOINT_TRACE_FILE is set
+trace = TraceRecorder.from_env()
+
+# Cached local-LLM file summaries, stored beside the checkpoints
+summarizer = Summarizer.from_env(
+    checkpoint_manager.catalog.db_path if SHARD_DIR else DB_PATH, metrics=metrics,
+    on_usage=usage_log.recorder("checkpoint-manager")
+)
+summary_pipeline = SummaryPipeline.from_env(summarizer)
+
+# Background retention and compaction (started in __main__)
+maintenance = MaintenanceWorker.from_env(checkpoint_manager)
+backups = BackupScheduler.from_env(None if SHARD_DIR else DB_PATH, SHARD_DIR)
+
+# Startup warm-up of the pool, page cache and recent checkpoints (started in __main__)
+warmup = Warmup.from_env(checkpoint_manager, metrics)
+
+
+# Register tools
+@server.list_tools()
+async def list_tools():
+    """List all available tools"""
+    return [
+        Tool(
+            name="save_checkpoint",
+            description="Save a new checkpoint or update an existing one with project state",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Unique name for the checkpoint"
+                    },
+                    "data": {
+                        "type": "object",
+                        "description": "Checkpoint data including summary, goals, and related items",
+                        "properties": {
+                            "summary": {"type": "string"},
+                            "current_goal": {"type": "string"},
+                            "working_directory": {"type": "string"},
+                            "git_branch": {"type": "string"},
+                            "git_status": {"type": "string"},
+                            "todos": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "title": {"type": "string"},
+                                        "description": {"type": "string"},
+                                        "status": {"type": "string"},
+                                        "priority": {"type": "string"}
+                                    }
+                                }
+                            },
+                            "file_modifications": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "file_path": {"type": "string"},
+                                        "status": {"type": "string"},
+                                        "description": {"type": "string"}
+                                    }
+                                }
+                            },
+                            "key_decisions": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "title": {"type": "string"},
+                                        "rationale": {"type": "string"},
+                                        "impact": {"type": "string"}
+                                    }
+                                }
+                            },
+                            "artifacts": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "name": {"type": "string"},
+                                        "artifact_type": {"type": "string"},
+                                        "path": {"type": "string"},
+                                        "description": {"type": "string"}
+                                    }
+                                }
+                            }
+                        },
+                        "required": ["summary"]
+                    },
+                    "capture_file_state": {
+                        "type": "boolean",
+                        "description": "Record size, mtime and git blob hash of each modified file (and fill git branch/status/HEAD) so verify_checkpoint can detect drift"
+                    }
+                },
+                "required": ["name", "data"]
+            }
+        ),
+        Tool(
+            name="begin_checkpoint_save",
+            description="Start a staged save for a checkpoint too large for one save_checkpoint call; send rows with append_checkpoint_save, then commit_checkpoint_save",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Unique name for the checkpoint"
+                    },
+                    "data": {
+                        "type": "object",
+                        "description": "Scalar fields as for save_checkpoint (summary, current_goal, working_directory, git_branch, git_status)"
+                    }
+                },
+                "required": ["name", "data"]
+            }
+        ),
+        Tool(
+            name="append_checkpoint_save",
+            description=f"Stage a chunk of up to {SAVE_CHUNK_MAX_ROWS} rows of one section for a staged save",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "From begin_checkpoint_save"},
+                    "section": {
+                        "type": "string",
+                        "enum": list(CHILD_TABLES),
+                        "description": "Which rows the chunk holds"
+                    },
+                    "rows": {
+                        "type": "array",
+                        "items": {"type": "object"},
+                        "description": "Rows in the same shape as the section in save_checkpoint"
+                    }
+                },
+                "required": ["session_id", "section", "rows"]
+            }
+        ),
+        Tool(
+            name="commit_checkpoint_save",
+            description="Atomically replace the checkpoint with everything staged in a save session",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "From begin_checkpoint_save"}
+                },
+                "required": ["session_id"]
+            }
+        ),
+        Tool(
+            name="abort_checkpoint_save",
+            description="Discard a staged save session",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "From begin_checkpoint_save"}
+                },
+                "required": ["session_id"]
+            }
+        ),
+        Tool(
+            name="resume_checkpoint",
+            description="Load a checkpoint by name with all related data (a name that does not exist is answered with the closest names)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Name of the checkpoint to resume"
+                    },
+                    "sections": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["checkpoint", "todos", "file_modifications", "key_decisions", "artifacts"]
+                        },
+                        "description": "Only return these sections (default: everything)"
+                    },
+                    "resolve": {
+                        "type": "boolean",
+                        "description": "Also accept a unique prefix of the name"
+                    }
+                },
+                "required": ["name"]
+            }
+        ),
+        Tool(
+            name="publish_snapshot",
+            description="Publish a read-only snapshot of a checkpoint so many concurrent resumes are served from a memory-mapped file instead of the database",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Name of the checkpoint to snapshot"
+                    },
+                    "unpublish": {
+                        "type": "boolean",
+                        "description": "Remove the snapshot instead"
+                    }
+                },
+                "required": ["name"]
+            }
+        ),
+        Tool(
+            name="list_checkpoints",
+            description="List all checkpoints ordered by most recent update",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "working_directory": {
+                        "type": "string",
+                        "description": "Only list checkpoints saved from this directory"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="search_checkpoints",
+            description="Find checkpoints whose name or summary contains the query, across all projects",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Text to look for in checkpoint names and summaries"
+                    },
+                    "working_directory": {
+                        "type": "string",
+                        "description": "Restrict to checkpoints saved from this directory"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results (default 20)"
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
+        Tool(
+            name="open_todos",
+            description="Every pending or in-progress todo across all checkpoints (e.g. of this working directory) without resuming them: identical todos are listed once, from their most recent checkpoint, in progress first then by priority",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "working_directory": {
+                        "type": "string",
+                        "description": "Only checkpoints saved from this directory"
+                    },
+                    "git_branch": {
+                        "type": "string",
+                        "description": "Only checkpoints on this branch"
+                    },
+                    "status": {
+                        "type": "string",
+                        "description": "Only todos with this status, e.g. in_progress (default: all but completed)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of todos (default 50)"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Todos to skip; pass next_offset from the previous page"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="semantic_search_checkpoints",
+            description="Find checkpoints by meaning (summaries, goals, decisions, artifacts) even when the wording differs",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Natural-language description of what you are looking for"
+                    },
+                    "working_directory": {
+                        "type": "string",
+                        "description": "Only return checkpoints from this directory"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum results (default: 10)"
+                    },
+                    "rebuild": {
+                        "type": "boolean",
+                        "description": "Re-embed every checkpoint first (e.g. after saving with the CLI scripts)"
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
+        Tool(
+            name="watch_checkpoints",
+            description="Checkpoints created, updated or deleted since a cursor (long-poll instead of re-listing). Call without 'since' to get the current cursor, then pass the returned cursor each time",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "since": {
+                        "type": "integer",
+                        "description": "Cursor from the previous response"
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": "Seconds to wait for a change when there is none yet (default: 0, max: 60)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum checkpoints per response (default: 500)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="verify_checkpoint",
+            description="Check whether the checkpoint's modified files changed on disk since it was saved with capture_file_state",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Name of the checkpoint to verify"
+                    }
+                },
+                "required": ["name"]
+            }
+        ),
+        Tool(
+            name="diff_checkpoints",
+            description="Show what changed between two checkpoints: scalar fields plus added, removed and changed todos, files, decisions and artifacts",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "from_name": {
+                        "type": "string",
+                        "description": "Checkpoint to diff from (older)"
+                    },
+                    "to_name": {
+                        "type": "string",
+                        "description": "Checkpoint to diff to (newer)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum keys listed per category (default 200; counts are exact)"
+                    }
+                },
+                "required": ["from_name", "to_name"]
+            }
+        ),
+        Tool(
+            name="delete_checkpoint",
+            description="Delete a checkpoint and all its related data",
+            inputSchema={
+                "type": "object",
+                "properties": {
                     "name": {
                         "type": "string",
                         "description": "Name of the checkpoint to delete"
@@ -564,54 +2364,648 @@ async def list_tools():
                 },
                 "required": ["name", "updates"]
             }
+        ),
+        Tool(
+            name="add_todo",
+            description="Add one todo to a checkpoint without resending the rest of it",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "todo": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "status": {"type": "string"},
+                            "priority": {"type": "string"}
+                        },
+                        "required": ["title"]
+                    }
+                },
+                "required": ["name", "todo"]
+            }
+        ),
+        Tool(
+            name="update_todo",
+            description="Change fields of one todo, found by id or by title",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "id": {"type": "integer", "description": "Todo id (as returned by add_todo)"},
+                    "key": {"type": "string", "description": "Todo title, when the id is not known"},
+                    "fields": {
+                        "type": "object",
+                        "description": "New values (title, description, status, priority)",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "status": {"type": "string"},
+                            "priority": {"type": "string"}
+                        }
+                    }
+                },
+                "required": ["name", "fields"]
+            }
+        ),
+        Tool(
+            name="remove_todo",
+            description="Remove one todo, found by id or by title",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "id": {"type": "integer", "description": "Todo id"},
+                    "key": {"type": "string", "description": "Todo title, when the id is not known"}
+                },
+                "required": ["name"]
+            }
+        ),
+        Tool(
+            name="append_file_modifications",
+            description="Append file modifications to a checkpoint",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "file_modifications": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "file_path": {"type": "string"},
+                                "status": {"type": "string"},
+                                "description": {"type": "string"}
+                            },
+                            "required": ["file_path"]
+                        }
+                    }
+                },
+                "required": ["name", "file_modifications"]
+            }
+        ),
+        Tool(
+            name="append_decision",
+            description="Append one key decision to a checkpoint",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "decision": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "rationale": {"type": "string"},
+                            "impact": {"type": "string"}
+                        },
+                        "required": ["title"]
+                    }
+                },
+                "required": ["name", "decision"]
+            }
+        ),
+        Tool(
+            name="attach_artifact",
+            description="Attach one artifact to a checkpoint",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "artifact": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "artifact_type": {"type": "string"},
+                            "path": {"type": "string"},
+                            "description": {"type": "string"}
+                        },
+                        "required": ["name"]
+                    }
+                },
+                "required": ["name", "artifact"]
+            }
+        ),
+        Tool(
+            name="batch_update_checkpoint",
+            description="Apply several granular edits to one checkpoint atomically (all or nothing)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Checkpoint name"},
+                    "operations": {
+                        "type": "array",
+                        "description": (
+                            "Each item has 'op' plus its arguments: add_<noun> takes 'item' or 'items'; "
+                            "update_<noun> takes 'id' or 'key' and 'fields'; remove_<noun> takes 'id' or 'key'; "
+                            "update_checkpoint takes 'updates'. <noun> is todo, file_modification, decision "
+                            "or artifact, keyed by title, file_path, title and name"
+                        ),
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {"type": "string", "enum": ["update_checkpoint"] + list(OPERATIONS)},
+                                "id": {"type": "integer"},
+                                "key": {"type": "string"},
+                                "item": {"type": "object"},
+                                "items": {"type": "array", "items": {"type": "object"}},
+                                "fields": {"type": "object"},
+                                "updates": {"type": "object"}
+                            },
+                            "required": ["op"]
+                        }
+                    }
+                },
+                "required": ["name", "operations"]
+            }
+        ),
+        Tool(
+            name="pin_checkpoint",
+            description="Pin a checkpoint so retention never prunes it, or unpin it",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "Name of the checkpoint to pin"
+                    },
+                    "pinned": {
+                        "type": "boolean",
+                        "description": "True to pin (default), false to unpin"
+                    }
+                },
+                "required": ["name"]
+            }
+        ),
+        Tool(
+            name="run_maintenance",
+            description="Apply the retention policy and cold-storage tiering now and optionally compact the database",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "dry_run": {
+                        "type": "boolean",
+                        "description": "Only report which checkpoints would be pruned"
+                    },
+                    "compact": {
+                        "type": "boolean",
+                        "description": "Force compaction on or off (default: only when idle)"
+                    },
+                    "vacuum": {
+                        "type": "boolean",
+                        "description": "Allow the one-off full VACUUM an older database needs before it can be compacted incrementally (blocks writers while it runs)"
+                    },
+                    "archive_after_days": {
+                        "type": "number",
+                        "description": "Move checkpoints untouched this many days to cold storage (default: CHECKPOINT_ARCHIVE_AFTER_DAYS)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="backup_checkpoints",
+            description="Take an online backup of the checkpoint database (copied a few pages at a time so saves keep flowing), verify it with PRAGMA quick_check and rotate old backups",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "destination": {
+                        "type": "string",
+                        "description": "Backup directory (default: CHECKPOINT_BACKUP_DIR or backups/ next to the database)"
+                    },
+                    "keep": {
+                        "type": "integer",
+                        "description": "Timestamped backups to retain, 0 keeps all (default: CHECKPOINT_BACKUP_KEEP or 7)"
+                    },
+                    "pages_per_step": {
+                        "type": "integer",
+                        "description": "Pages copied per step, -1 for a single step (default 64)"
+                    },
+                    "sleep_seconds": {
+                        "type": "number",
+                        "description": "Pause between steps (default 0.005)"
+                    },
+                    "verify": {
+                        "type": "boolean",
+                        "description": "Run PRAGMA quick_check on the copy (default true)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="summarize_file",
+            description="Summarize a file with the local LLM; results are cached by content hash, type and model",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "File to summarize"
+                    },
+                    "summary_type": {
+                        "type": "string",
+                        "enum": SUMMARY_TYPES,
+                        "description": "Kind of summary (default: detailed)"
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "Ignore cached summaries and regenerate"
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="summarize_directory",
+            description="Summarize every text file in a directory with the local LLM, plus a rollup summary",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Directory to summarize"
+                    },
+                    "summary_type": {
+                        "type": "string",
+                        "enum": SUMMARY_TYPES,
+                        "description": "Kind of summary (default: detailed)"
+                    },
+                    "max_files": {
+                        "type": "integer",
+                        "description": f"Most files to summarize (default: {SUMMARY_MAX_FILES})"
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "Ignore cached summaries and regenerate"
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="get_lm_usage",
+            description="Local LLM calls and estimated tokens per day, agent and model",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "group_by": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(USAGE_GROUPS)},
+                        "description": "Dimensions to group by (default: day, agent, model)"
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "First day included (YYYY-MM-DD)"
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Last day included (YYYY-MM-DD)"
+                    },
+                    "agent": {
+                        "type": "string",
+                        "description": "Only this agent"
+                    },
+                    "model": {
+                        "type": "string",
+                        "description": "Only this model"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="analytics",
+            description="Aggregate reports across checkpoints per project and branch: open todos in each branch's latest checkpoint, todo completion over time, most-touched files, decision volume (checkpoints in cold storage count without their rows)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "report": {
+                        "type": "string",
+                        "enum": list(analytics.REPORTS),
+                        "description": "; ".join(f"{report}: {spec[1]}" for report, spec in analytics.REPORTS.items())
+                    },
+                    "working_directory": {
+                        "type": "string",
+                        "description": "Only this project"
+                    },
+                    "git_branch": {
+                        "type": "string",
+                        "description": "Only this branch"
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only checkpoints updated on or after this date (YYYY-MM-DD)"
+                    },
+                    "period": {
+                        "type": "string",
+                        "enum": list(analytics.PERIODS),
+                        "description": "Bucket for completion and decisions (default: week)"
+                    },
+                    "top": {
+                        "type": "integer",
+                        "description": "Files per project for top_files (default: 10)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum rows (default: 100)"
+                    }
+                },
+                "required": ["report"]
+            }
+        ),
+        Tool(
+            name="get_metrics",
+            description="Per-tool latency, payload and SQL statement metrics (enable with CHECKPOINT_METRICS=1)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {
+                        "type": "string",
+                        "enum": ["json", "prometheus"],
+                        "description": "Output format (default: json)"
+                    },
+                    "reset": {
+                        "type": "boolean",
+                        "description": "Clear collected metrics after reading them"
+                    }
+                }
+            }
         )
     ]
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> Any:
-    """Handle tool calls"""
-    try:
-        if name == "save_checkpoint":
-            result = checkpoint_manager.save_checkpoint(
-                arguments["name"],
-                arguments["data"]
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+def dispatch_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Run a tool and return its response content"""
+    if name == "save_checkpoint":
+        result = checkpoint_manager.save_checkpoint(
+            arguments["name"],
+            arguments["data"],
+            arguments.get("capture_file_state", False)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "begin_checkpoint_save":
+        result = checkpoint_manager.begin_save(arguments["name"], arguments.get("data"))
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "append_checkpoint_save":
+        result = checkpoint_manager.append_save(
+            arguments["session_id"],
+            arguments["section"],
+            arguments.get("rows", [])
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "commit_checkpoint_save":
+        result = checkpoint_manager.commit_save(arguments["session_id"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "abort_checkpoint_save":
+        result = checkpoint_manager.abort_save(arguments["session_id"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "resume_checkpoint":
+        # Return YAML for token efficiency (from the snapshot when published)
+        checkpoint_name = arguments["name"]
+        if arguments.get("resolve"):
+            checkpoint_name = checkpoint_manager.resolve_name(checkpoint_name)
+        text = checkpoint_manager.resume_text(checkpoint_name, arguments.get("sections"))
+        return [TextContent(type="text", text=text)]
+
+    elif name == "publish_snapshot":
+        if arguments.get("unpublish"):
+            result = checkpoint_manager.unpublish_snapshot(arguments["name"])
+        else:
+            result = checkpoint_manager.publish_snapshot(arguments["name"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "list_checkpoints":
+        result = checkpoint_manager.list_checkpoints(arguments.get("working_directory"))
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "search_checkpoints":
+        result = checkpoint_manager.search_checkpoints(
+            arguments["query"],
+            arguments.get("working_directory"),
+            arguments.get("limit", 20)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "open_todos":
+        result = checkpoint_manager.open_todos(
+            arguments.get("working_directory"),
+            arguments.get("git_branch"),
+            arguments.get("status"),
+            arguments.get("limit", 50),
+            arguments.get("offset", 0)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "semantic_search_checkpoints":
+        result = checkpoint_manager.semantic_search_checkpoints(
+            arguments["query"],
+            arguments.get("working_directory"),
+            arguments.get("limit", 10),
+            arguments.get("rebuild", False)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "watch_checkpoints":
+        result = checkpoint_manager.watch_checkpoints(
+            arguments.get("since"),
+            arguments.get("timeout", 0),
+            arguments.get("limit", 500)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-        elif name == "resume_checkpoint":
-            result = checkpoint_manager.resume_checkpoint(arguments["name"])
-            # Return YAML for token efficiency
-            return [TextContent(type="text", text=result["checkpoint_yaml"])]
+    elif name == "verify_checkpoint":
+        result = checkpoint_manager.verify_checkpoint(arguments["name"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-        elif name == "list_checkpoints":
-            result = checkpoint_manager.list_checkpoints()
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    elif name == "diff_checkpoints":
+        result = checkpoint_manager.diff_checkpoints(
+            arguments["from_name"],
+            arguments["to_name"],
+            limit=arguments.get("limit", 200)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-        elif name == "delete_checkpoint":
-            result = checkpoint_manager.delete_checkpoint(arguments["name"])
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    elif name == "delete_checkpoint":
+        result = checkpoint_manager.delete_checkpoint(arguments["name"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-        elif name == "update_checkpoint":
-            result = checkpoint_manager.update_checkpoint(
-                arguments["name"],
-                arguments["updates"]
-            )
-            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+    elif name == "update_checkpoint":
+        result = checkpoint_manager.update_checkpoint(
+            arguments["name"],
+            arguments["updates"]
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name in GRANULAR_TOOLS:
+        op, rows_argument = GRANULAR_TOOLS[name]
+        operation = {key: arguments[key] for key in ("id", "key", "fields") if key in arguments}
+        operation["op"] = op
+        if rows_argument:
+            rows = arguments[rows_argument]
+            operation["items"] = rows if isinstance(rows, list) else [rows]
+        result = checkpoint_manager.apply_operations(arguments["name"], [operation])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "batch_update_checkpoint":
+        result = checkpoint_manager.apply_operations(arguments["name"], arguments["operations"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "pin_checkpoint":
+        result = checkpoint_manager.set_pinned(arguments["name"], arguments.get("pinned", True))
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "run_maintenance":
+        previous_run = maintenance.last_report
+        result = maintenance.run_once(
+            dry_run=arguments.get("dry_run", False),
+            compact=arguments.get("compact"),
+            archive_after_days=arguments.get("archive_after_days"),
+            vacuum=arguments.get("vacuum", False)
+        )
+        result = dict(result, previous_run=previous_run)
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "backup_checkpoints":
+        previous_backup = backups.last_report
+        result = backups.run_once(
+            dest_dir=arguments.get("destination"),
+            keep=arguments.get("keep"),
+            pages=arguments.get("pages_per_step"),
+            sleep=arguments.get("sleep_seconds"),
+            verify=arguments.get("verify", True)
+        )
+        result = dict(result, previous_backup=previous_backup and previous_backup["backup"])
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "summarize_file":
+        path = os.path.expanduser(arguments["path"])
+        if not os.path.isfile(path):
+            raise ValueError(f"File not found: {path}")
+        result = summary_pipeline.summarize_path(
+            path,
+            arguments.get("summary_type", "detailed"),
+            arguments.get("refresh", False)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "summarize_directory":
+        path = os.path.expanduser(arguments["path"])
+        if not os.path.isdir(path):
+            raise ValueError(f"Directory not found: {path}")
+        result = summary_pipeline.summarize_path(
+            path,
+            arguments.get("summary_type", "detailed"),
+            arguments.get("refresh", False),
+            arguments.get("max_files", SUMMARY_MAX_FILES)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "get_lm_usage":
+        result = usage_log.totals(
+            arguments.get("group_by", ["day", "agent", "model"]),
+            arguments.get("since"),
+            arguments.get("until"),
+            arguments.get("agent"),
+            arguments.get("model")
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+    elif name == "analytics":
+        start = time.perf_counter()
+        result = checkpoint_manager.analytics(
+            arguments["report"],
+            arguments.get("working_directory"),
+            arguments.get("git_branch"),
+            arguments.get("since"),
+            arguments.get("period", "week"),
+            arguments.get("top", 10),
+            arguments.get("limit", 100)
+        )
+        result = dict(
+            result,
+            status="success",
+            count=len(result["rows"]),
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 1)
+        )
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
+    elif name == "get_metrics":
+        if arguments.get("format") == "prometheus":
+            text = metrics.render_prometheus()
         else:
-            raise ValueError(f"Unknown tool: {name}")
+            text = json.dumps(metrics.snapshot(), indent=2)
+        if arguments.get("reset"):
+            metrics.reset()
+        return [TextContent(type="text", text=text)]
+
+    else:
+        raise ValueError(f"Unknown tool: {name}")
+
 
+@server.call_tool()
+async def call_tool(name: str, arguments: Dict[str, Any]) -> Any:
+    """Handle tool calls"""
+    if name not in LONG_POLL_TOOLS:
+        maintenance.note_activity()
+    token = metrics.start_tool(name)
+    started = time.time()
+    start = time.perf_counter()
+    error = False
+
+    try:
+        if OFFLOAD_ALL_TOOLS or name in LONG_POLL_TOOLS or name in LLM_TOOLS or name in BACKUP_TOOLS:
+            content = await asyncio.to_thread(dispatch_tool, name, arguments)
+        else:
+            content = dispatch_tool(name, arguments)
     except Exception as e:
         logger.error(f"Error calling tool {name}: {e}")
+        error = True
         error_response = {
             "status": "error",
             "message": str(e),
             "tool": name
         }
-        return [TextContent(type="text", text=json.dumps(error_response, indent=2))]
+        content = [TextContent(type="text", text=json.dumps(error_response, indent=2))]
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if token is not None:
+        metrics.finish_tool(
+            token,
+            name,
+            elapsed_ms,
+            len(json.dumps(arguments)),
+            sum(len(item.text) for item in content),
+            error
+        )
+    if trace is not None:
+        try:
+            session = server.request_context.session
+        except LookupError:
+            session = None
+        trace.record(name, arguments, started, elapsed_ms, "".join(item.text for item in content), error, session)
+    return content
 
 
 if __name__ == "__main__":
-    logger.info("Starting Checkpoint Manager MCP Server")
-    mcp.server.stdio.run(server)
+    parser = argparse.ArgumentParser(description="Checkpoint Manager MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "sse"], default=os.getenv("CHECKPOINT_TRANSPORT", "stdio"),
+                        help="stdio serves the launching client; sse serves every client from one process")
+    parser.add_argument("--host", default=os.getenv("CHECKPOINT_SERVER_HOST", transport.DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHECKPOINT_SERVER_PORT", transport.DEFAULT_PORT)))
+    parser.add_argument("--socket", default=os.getenv("CHECKPOINT_SERVER_SOCKET"),
+                        help="Serve sse on this Unix socket instead of host:port")
+    args = parser.parse_args()
+
+    logger.info(f"Starting Checkpoint Manager MCP Server ({args.transport})")
+    maintenance.start()
+    backups.start()
+    usage_log.start()
+    warmup.start()
+    if args.transport == "sse":
+        OFFLOAD_ALL_TOOLS = True
+        transport.run_shared(server, args.host, args.port, args.socket)
+    else:
+        asyncio.run(transport.run_stdio(server))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Shard Administration
+Maintenance commands for the sharded checkpoint layout (CHECKPOINT_SHARD_DIR).
+
+Usage:
+    shard_admin.py import <db-path>   Copy checkpoints from an unsharded database
+    shard_admin.py rebuild            Recreate catalog.db from the shard files
+    shard_admin.py list               Show shards and their checkpoint counts
+"""
+
+import json
+import os
+import sys
+
+from server import ShardedCheckpointManager, SHARD_DIR, metrics
+
+
+def main():
+    """Main entry point."""
+    if not SHARD_DIR:
+        print("Error: CHECKPOINT_SHARD_DIR is not set", file=sys.stderr)
+        sys.exit(1)
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "rebuild", "list"):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    manager = ShardedCheckpointManager(SHARD_DIR, metrics=metrics)
+    command = sys.argv[1]
+
+    if command == "import":
+        if len(sys.argv) < 3 or not os.path.exists(sys.argv[2]):
+            print("Usage: shard_admin.py import <db-path>", file=sys.stderr)
+            sys.exit(1)
+        result = manager.import_database(sys.argv[2])
+    elif command == "rebuild":
+        result = manager.rebuild_catalog()
+    else:
+        counts = {}
+        for entry in manager.catalog.list():
+            counts[entry["shard"]] = counts.get(entry["shard"], 0) + 1
+        result = {
+            "status": "success",
+            "shards": [
+                {"shard": key, "checkpoints": counts.get(key, 0),
+                 "bytes": os.path.getsize(os.path.join(manager.shard_dir, f"{key}.db"))}
+                for key in manager.shard_keys()
+            ]
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
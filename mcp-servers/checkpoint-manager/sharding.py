@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Sharding
+Maps projects to per-project shard databases and keeps a small catalog
+database recording which shard holds each checkpoint, so listing and search
+never have to open every shard.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+import change_log
+import name_index
+
+DEFAULT_SHARD = "default"
+
+
+def project_root(working_directory: Optional[str]) -> Optional[str]:
+    """Return the git root containing working_directory, else the path itself"""
+    if not working_directory:
+        return None
+    path = os.path.abspath(os.path.expanduser(working_directory))
+    current = path
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return path
+        current = parent
+
+
+def shard_key(working_directory: Optional[str]) -> str:
+    """Stable, filesystem-safe shard name for a project directory"""
+    root = project_root(working_directory)
+    if root is None:
+        return DEFAULT_SHARD
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", os.path.basename(root) or "root").strip("-") or "root"
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}"
+
+
+class ShardCatalog:
+    """Global name -> shard index with enough metadata to list and search"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            # WAL so listing never waits on a concurrent save in another project
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS catalog (
+                    name TEXT PRIMARY KEY,
+                    shard TEXT NOT NULL,
+                    working_directory TEXT,
+                    git_branch TEXT,
+                    summary TEXT,
+                    pinned INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_updated_at ON catalog(updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_shard ON catalog(shard)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_catalog_working_directory "
+                "ON catalog(working_directory, updated_at)"
+            )
+            # Every save, update and delete passes through the catalog
+            change_log.install(conn.cursor(), "catalog", (
+                "name", "shard", "working_directory", "git_branch", "summary", "updated_at"
+            ))
+            name_index.ensure_schema(conn.cursor(), "catalog", "rowid")
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Shard holding the checkpoint, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT shard FROM catalog WHERE name = ?", (name,)).fetchone()
+        return row["shard"] if row else None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """The name itself if catalogued, else the only name it is a prefix of"""
+        with self._connect() as conn:
+            return name_index.resolve(conn, name, "catalog")
+
+    def not_found(self, name: str) -> ValueError:
+        """Error for a missing checkpoint, naming the closest catalogued ones"""
+        with self._connect() as conn:
+            return name_index.not_found(conn, name, "catalog", "rowid")
+
+    def register(self, name: str, shard: str, data: Dict[str, Any]):
+        """Insert or refresh a catalog entry after a save"""
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO catalog (name, shard, working_directory, git_branch, summary)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    shard = excluded.shard,
+                    working_directory = excluded.working_directory,
+                    git_branch = excluded.git_branch,
+                    summary = excluded.summary,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (name, shard, data.get("working_directory"), data.get("git_branch"), data.get("summary")))
+
+    def update(self, name: str, fields: Dict[str, Any], touch: bool = True):
+        """
+        Refresh catalog metadata columns that changed in place, and updated_at
+        unless touch is False (pinning is not an update of the checkpoint)
+        """
+        columns = [key for key in ("working_directory", "git_branch", "summary", "pinned") if key in fields]
+        assignments = [f"{column} = ?" for column in columns]
+        if touch:
+            assignments.append("updated_at = CURRENT_TIMESTAMP")
+        if not assignments:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE catalog SET {', '.join(assignments)} WHERE name = ?",
+                [fields[column] for column in columns] + [name],
+            )
+
+    def remove(self, names: List[str]):
+        """Drop catalog entries"""
+        if not names:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM catalog WHERE name = ?", [(name,) for name in names])
+
+    def list(self, working_directory: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries ordered by most recent update, optionally for one directory"""
+        query = """
+            SELECT name, shard, working_directory, git_branch, created_at, updated_at, summary
+            FROM catalog
+        """
+        params: List[Any] = []
+        if working_directory:
+            query += " WHERE working_directory = ?"
+            params.append(working_directory)
+        query += " ORDER BY updated_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def search(self, query: str, working_directory: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Case-insensitive substring match on name and summary"""
+        pattern = f"%{query}%"
+        sql = """
+            SELECT name, shard, working_directory, git_branch, updated_at, summary
+            FROM catalog
+            WHERE (name LIKE ? OR summary LIKE ?)
+        """
+        params: List[Any] = [pattern, pattern]
+        if working_directory:
+            sql += " AND working_directory = ?"
+            params.append(working_directory)
+        sql += " ORDER BY updated_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def shards(self) -> List[str]:
+        """Distinct shards referenced by the catalog"""
+        with self._connect() as conn:
+            return [row["shard"] for row in conn.execute("SELECT DISTINCT shard FROM catalog")]
+
+    def replace_shard(self, shard: str, rows: List[Dict[str, Any]]):
+        """Rewrite all catalog entries for one shard (used when rebuilding)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM catalog WHERE shard = ?", (shard,))
+            conn.executemany("""
+                INSERT OR REPLACE INTO catalog
+                (name, shard, working_directory, git_branch, summary, pinned, created_at, updated_at)
+                VALUES (:name, :shard, :working_directory, :git_branch, :summary, :pinned, :created_at, :updated_at)
+            """, [dict(row, shard=shard) for row in rows])
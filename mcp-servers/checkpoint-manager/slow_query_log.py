@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Slow Query Log
+Records SQLite statements slower than a threshold, with the shape of their
+bound parameters (types and sizes, never values) and EXPLAIN QUERY PLAN
+output, to a size-rotated JSON-lines file.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, List, Optional
+
+DEFAULT_LOG_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/slow_queries.log")
+
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+
+def param_shape(params: Any) -> Any:
+    """Describe bound parameters by type and size without recording values"""
+    def shape(value):
+        if value is None:
+            return "null"
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}({len(value)})"
+        return type(value).__name__
+
+    if isinstance(params, dict):
+        return {key: shape(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [shape(value) for value in params]
+    return shape(params)
+
+
+class SlowQueryLog:
+    """
+    Writes statements exceeding threshold_ms to a rotating log file.
+
+    Args:
+        threshold_ms: Statements at or above this duration are logged
+        path: Log file location
+        max_bytes: Rotate once the file reaches this size
+        backup_count: Number of rotated files to keep
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        path: str = DEFAULT_LOG_PATH,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 3,
+    ):
+        self.threshold_ms = threshold_ms
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        # Dedicated logger so entries never reach the server's stderr log
+        self._logger = logging.getLogger(f"checkpoint-manager.slow-queries.{self.path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    @classmethod
+    def from_env(cls) -> Optional["SlowQueryLog"]:
+        """Build from CHECKPOINT_SLOW_QUERY_* variables; None when no threshold is set"""
+        threshold = os.getenv("CHECKPOINT_SLOW_QUERY_MS")
+        if not threshold:
+            return None
+        return cls(
+            threshold_ms=float(threshold),
+            path=os.getenv("CHECKPOINT_SLOW_QUERY_LOG", DEFAULT_LOG_PATH),
+        )
+
+    def observe(self, conn: sqlite3.Connection, sql: str, params: Any, elapsed_ms: float):
+        """Log the statement if it was slow"""
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "sql": sql.strip(),
+            "params": param_shape(params),
+            "plan": self.explain(conn, sql, params),
+        }
+        self._logger.info(json.dumps(entry))
+
+    @staticmethod
+    def explain(conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+        """Return EXPLAIN QUERY PLAN detail lines, indented by tree depth"""
+        if not sql.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            # A plain cursor, so explaining is never itself instrumented
+            cursor = conn.cursor(sqlite3.Cursor)
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            return [f"<explain failed: {e}>"]
+
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines
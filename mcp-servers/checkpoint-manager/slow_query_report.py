@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Slow Query Report
+Aggregates the slow query log (including rotated files) by statement and
+prints the worst offenders with their most recent query plan.
+
+Usage:
+    slow_query_report.py [--log PATH] [--top N] [--sort total|max|count]
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from metrics import normalize_sql
+from slow_query_log import DEFAULT_LOG_PATH
+
+SEPARATOR = "=" * 80
+
+
+def read_entries(log_path: str) -> List[Dict[str, Any]]:
+    """Read entries from the log and its rotated backups, oldest first"""
+    paths = []
+    index = 1
+    while os.path.exists(f"{log_path}.{index}"):
+        paths.append(f"{log_path}.{index}")
+        index += 1
+    paths.reverse()
+    if os.path.exists(log_path):
+        paths.append(log_path)
+
+    entries = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Skip partially written lines
+    return entries
+
+
+def aggregate(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group entries by normalised statement"""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        key = normalize_sql(entry["sql"])
+        group = groups.setdefault(key, {
+            "sql": key,
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_seen": None,
+            "params": None,
+            "plan": [],
+        })
+        group["count"] += 1
+        group["total_ms"] += entry["elapsed_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["elapsed_ms"])
+        group["last_seen"] = entry["timestamp"]
+        group["params"] = entry.get("params")
+        group["plan"] = entry.get("plan", [])
+    return list(groups.values())
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Summarise the checkpoint slow query log")
+    parser.add_argument("--log", default=os.getenv("CHECKPOINT_SLOW_QUERY_LOG", DEFAULT_LOG_PATH))
+    parser.add_argument("--top", type=int, default=10, help="Number of statements to show")
+    parser.add_argument("--sort", choices=["total", "max", "count"], default="total")
+    parser.add_argument("--json", action="store_true", help="Emit the aggregated report as JSON")
+    args = parser.parse_args()
+
+    entries = read_entries(args.log)
+    if not entries:
+        print(f"No slow queries logged at {args.log}")
+        print("Set CHECKPOINT_SLOW_QUERY_MS=<threshold> to start logging.")
+        return 0
+
+    sort_key = {"total": "total_ms", "max": "max_ms", "count": "count"}[args.sort]
+    groups = sorted(aggregate(entries), key=lambda g: g[sort_key], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps(groups, indent=2))
+        return 0
+
+    print(SEPARATOR)
+    print(f"SLOW QUERIES ({len(entries)} entries, top {len(groups)} by {args.sort})")
+    print(SEPARATOR)
+    print()
+
+    for idx, group in enumerate(groups, 1):
+        mean_ms = group["total_ms"] / group["count"]
+        print(f"{idx}. {group['sql'][:200]}")
+        print(f"   Count: {group['count']} | Total: {group['total_ms']:.1f} ms | "
+              f"Mean: {mean_ms:.1f} ms | Max: {group['max_ms']:.1f} ms")
+        print(f"   Last seen: {group['last_seen']} | Params: {json.dumps(group['params'])}")
+        if group["plan"]:
+            print("   Plan:")
+            for line in group["plan"]:
+                print(f"     {line}")
+        print()
+
+    print(SEPARATOR)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Snapshots
+Immutable, pre-rendered copies of a checkpoint for fan-out resume. A snapshot
+file holds the checkpoint's YAML split into sections plus an offset index, so
+readers mmap it once and slice any section without touching SQLite or
+re-rendering YAML. Republishing writes a new file and renames it over the
+old one, so open readers keep a consistent view.
+
+File layout:
+    MAGIC | uint32 header length | JSON header | section bytes...
+The header maps each section to its [offset, length] within the section bytes.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from records import dump_section
+
+MAGIC = b"CKPTSNP1"
+HEADER_LENGTH = struct.Struct("<I")
+
+# Sections in document order; "checkpoint" holds the scalar fields
+SECTIONS = ["checkpoint", "todos", "file_modifications", "key_decisions", "artifacts"]
+
+
+def snapshot_dir(db_path: str) -> str:
+    """Directory holding the snapshots of one database"""
+    return f"{os.path.splitext(db_path)[0]}.snapshots"
+
+
+def snapshot_path(db_path: str, name: str) -> str:
+    """Filesystem-safe snapshot file for a checkpoint name"""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-")[:60] or "checkpoint"
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(snapshot_dir(db_path), f"{slug}-{digest}.snap")
+
+
+def render_sections(data: Dict[str, Any], only: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Render checkpoint data as YAML, one string per section.
+
+    Concatenating the sections in SECTIONS order gives the same document as
+    dumping the whole dict at once. Child sections may be lists of dicts or
+    records.ChildRows; `only` limits rendering to some sections.
+    """
+    sections = {}
+    if not only or "checkpoint" in only:
+        scalars = {key: value for key, value in data.items() if key not in SECTIONS}
+        sections["checkpoint"] = yaml.dump(scalars, default_flow_style=False, sort_keys=False)
+    for section in SECTIONS[1:]:
+        if section in data and (not only or section in only):
+            sections[section] = dump_section(section, data[section])
+    return sections
+
+
+def publish(path: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write a snapshot atomically (temp file + fsync + rename).
+
+    Returns:
+        The snapshot header (name, updated_at and section offsets)
+    """
+    sections = render_sections(data)
+    encoded = [(section, sections[section].encode("utf-8")) for section in SECTIONS if section in sections]
+
+    index = {}
+    offset = 0
+    for section, body in encoded:
+        index[section] = [offset, len(body)]
+        offset += len(body)
+    header = {"name": data.get("name"), "updated_at": data.get("updated_at"), "sections": index}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".publish-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            for _, body in encoded:
+                f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return header
+
+
+class SnapshotReader:
+    """Read-only memory map of one snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        if self._view[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a checkpoint snapshot: {path}")
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (length,) = HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        self.header = json.loads(bytes(self._view[start:start + length]))
+        self._payload = self._view[start + length:]
+
+    @property
+    def sections(self) -> List[str]:
+        return list(self.header["sections"])
+
+    def section(self, name: str) -> memoryview:
+        """Zero-copy view of one section's UTF-8 bytes"""
+        if name not in self.header["sections"]:
+            raise ValueError(f"Unknown snapshot section '{name}' (available: {', '.join(self.sections)})")
+        offset, length = self.header["sections"][name]
+        return self._payload[offset:offset + length]
+
+    def text(self, sections: Optional[List[str]] = None) -> str:
+        """Decoded YAML of the given sections (default: the whole checkpoint)"""
+        if not sections:
+            return str(self._payload, "utf-8")
+        return "".join(str(self.section(name), "utf-8") for name in sections)
+
+    def close(self):
+        if hasattr(self, "_payload"):
+            self._payload.release()
+        self._view.release()
+        self._map.close()
+
+
+class SnapshotCache:
+    """
+    Open readers shared across calls, keyed by path.
+
+    A reader is reopened when the file on disk was replaced by a republish;
+    the previous mapping is left for the garbage collector so a caller still
+    holding its views is unaffected.
+    """
+
+    def __init__(self):
+        self._readers: Dict[str, SnapshotReader] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[SnapshotReader]:
+        """Current reader for path, or None if no snapshot is published"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.discard(path)
+            return None
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is None or reader.identity != (stat.st_ino, stat.st_mtime_ns):
+                reader = SnapshotReader(path)
+                self._readers[path] = reader
+            return reader
+
+    def discard(self, path: str):
+        with self._lock:
+            self._readers.pop(path, None)
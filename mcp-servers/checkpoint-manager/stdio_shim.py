@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Stdio Shim
+Lets a client that can only launch stdio MCP servers use the shared
+checkpoint server: configure this script in place of server.py and it
+relays every message between its stdin/stdout and one session on the shared
+HTTP+SSE transport. When nothing answers, it starts the shared server
+itself (detached, so it outlives this session) and waits for it.
+
+Usage:
+    python3 stdio_shim.py [--host 127.0.0.1] [--port 8765] [--socket PATH] [--no-autostart]
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import anyio
+from mcp.client.sse import sse_client
+from mcp.server.stdio import stdio_server
+
+import transport
+
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("checkpoint-manager")
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+DEFAULT_LOG_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/shared-server.log")
+STARTUP_TIMEOUT = 15.0
+
+
+def ensure_server(host: str, port: int, socket_path: str = None, autostart: bool = True):
+    """Make sure a shared server answers, starting one if allowed"""
+    if transport.health(host, port, socket_path) is not None:
+        return
+    if not autostart:
+        raise RuntimeError(f"No shared checkpoint server at {socket_path or f'{host}:{port}'}")
+
+    command = [sys.executable, SERVER_SCRIPT, "--transport", "sse", "--host", host, "--port", str(port)]
+    if socket_path:
+        command += ["--socket", socket_path]
+    log_path = os.getenv("CHECKPOINT_SHARED_LOG", DEFAULT_LOG_PATH)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        if transport.health(host, port, socket_path) is not None:
+            return
+    raise RuntimeError(f"Shared checkpoint server did not start within {STARTUP_TIMEOUT:.0f}s (see {log_path})")
+
+
+async def relay(source, sink):
+    """Forward messages until source closes; transport errors are logged, not forwarded"""
+    async for message in source:
+        if isinstance(message, Exception):
+            logger.warning(f"Dropped unreadable message: {message}")
+            continue
+        await sink.send(message)
+
+
+async def bridge(url: str, socket_path: str = None):
+    """Relay between this process's stdio and one session of the shared server"""
+    async with stdio_server() as (local_read, local_write):
+        async with sse_client(url, httpx_client_factory=transport.http_client_factory(socket_path)) as (
+            remote_read, remote_write
+        ):
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(relay, remote_read, local_write)
+                await relay(local_read, remote_write)
+                # The client closed stdin: end the session
+                tasks.cancel_scope.cancel()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Bridge a stdio MCP client to the shared checkpoint server")
+    parser.add_argument("--host", default=os.getenv("CHECKPOINT_SERVER_HOST", transport.DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHECKPOINT_SERVER_PORT", transport.DEFAULT_PORT)))
+    parser.add_argument("--socket", default=os.getenv("CHECKPOINT_SERVER_SOCKET"))
+    parser.add_argument("--no-autostart", action="store_true", help="Fail instead of starting the shared server")
+    args = parser.parse_args()
+
+    try:
+        ensure_server(args.host, args.port, args.socket, autostart=not args.no_autostart)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    anyio.run(bridge, transport.server_url(args.host, args.port, args.socket) + transport.SSE_PATH, args.socket)
+
+
+if __name__ == "__main__":
+    main()
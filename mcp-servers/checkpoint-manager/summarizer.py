@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Local LLM Summaries
+Summarises files through a local OpenAI-compatible endpoint (LM Studio by
+default) and caches each result in SQLite keyed by (content hash, summary
+type, model), so an unchanged file is summarised once per type and model.
+
+Files larger than one chunk are summarised map-reduce style: every chunk is
+summarised on its own (and cached under its own hash, so editing one part of
+a large file only re-summarises that part), then the partial summaries are
+combined into the requested summary type. Requests reuse one keep-alive HTTP
+connection per thread instead of opening a socket per call.
+
+Usage:
+    python3 summarizer.py <file> [brief|structure|detailed] [--refresh]
+
+Environment:
+    CHECKPOINT_LM_URL          Endpoint base URL (default http://localhost:1234/v1)
+    CHECKPOINT_LM_MODEL        Model name (default meta-llama-3.1-8b-instruct)
+    CHECKPOINT_LM_CHUNK_CHARS  Characters per map chunk (default 12000)
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from chunking import pack, split_structural
+from metrics import Metrics
+from usage_log import UsageLogger
+
+logger = logging.getLogger("checkpoint-manager")
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/mcp-servers/checkpoint-manager/checkpoints.db")
+DEFAULT_LM_URL = "http://localhost:1234/v1"
+DEFAULT_MODEL = "meta-llama-3.1-8b-instruct"
+DEFAULT_CHUNK_CHARS = 12000
+REQUEST_TIMEOUT = 300
+
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes file content concisely and accurately."
+
+# Same prompts as scripts/lm-read-file.sh; unknown types get a plain summary
+PROMPTS = {
+    "brief": "Provide a brief 2-3 sentence summary of this file content:",
+    "structure": (
+        "Analyze the structure of this file and provide: 1) File type/format, 2) Main sections, "
+        "3) Key information contained. Be concise."
+    ),
+    "detailed": (
+        "Provide a detailed summary of this file including: 1) Purpose, 2) Key sections and their content, "
+        "3) Important details, 4) Any action items or todos mentioned."
+    ),
+}
+GENERAL_PROMPT = "Summarize this file content:"
+SUMMARY_TYPES = sorted(PROMPTS)
+
+# Map step: one part of a larger file, independent of the final summary type
+CHUNK_TYPE = "chunk"
+CHUNK_PROMPT = (
+    "This is one part of a larger file. Summarize it, keeping names of functions, classes, sections, "
+    "settings and any todos, so the summary can later be merged with summaries of the other parts:"
+)
+# Reduce step: prefixed to the type prompt when the input is partial summaries,
+# by what the parts make up. Combined summaries are cached as "<scope>:<type>".
+COMBINE_PREFIXES = {
+    "file": "The following are summaries of consecutive parts of one file. Treat them as the whole file.",
+    "directory": (
+        "The following are summaries of the files in one directory, labelled by path. "
+        "Treat the directory as the file to describe."
+    ),
+}
+
+
+def ensure_schema(cursor: sqlite3.Cursor):
+    """Create the summary cache table"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            content_hash TEXT NOT NULL,
+            summary_type TEXT NOT NULL,
+            model TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            source_chars INTEGER,
+            chunks INTEGER DEFAULT 1,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (content_hash, summary_type, model)
+        ) WITHOUT ROWID
+    """)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def type_prompt(summary_type: str) -> str:
+    if summary_type == CHUNK_TYPE:
+        return CHUNK_PROMPT
+    return PROMPTS.get(summary_type, GENERAL_PROMPT)
+
+
+class LMClient:
+    """
+    Minimal OpenAI-compatible chat completions client.
+
+    Each thread keeps one persistent HTTP/1.1 connection to the endpoint; a
+    connection the server has closed while idle is reopened once and the
+    request retried.
+
+    Args:
+        base_url: Endpoint root, e.g. http://localhost:1234/v1
+        model: Model name sent with every request
+        timeout: Socket timeout in seconds
+    """
+
+    def __init__(self, base_url: str = DEFAULT_LM_URL, model: str = DEFAULT_MODEL,
+                 timeout: float = REQUEST_TIMEOUT):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid LM endpoint URL: {base_url}")
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = f"{parts.path}/chat/completions"
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "LMClient":
+        """Build from CHECKPOINT_LM_URL and CHECKPOINT_LM_MODEL"""
+        return cls(
+            os.getenv("CHECKPOINT_LM_URL", DEFAULT_LM_URL),
+            os.getenv("CHECKPOINT_LM_MODEL", DEFAULT_MODEL),
+        )
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._scheme == "https":
+                conn = http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _discard(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def chat(self, prompt: str, system: str = SYSTEM_PROMPT, max_tokens: int = 1000,
+             temperature: float = 0.3) -> Tuple[str, Dict[str, Any]]:
+        """
+        Send one chat completion request.
+
+        Returns:
+            (message content, usage dict as reported by the server)
+        """
+        body = json.dumps({
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self._path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError) as e:
+                # Stale keep-alive socket: reconnect once
+                self._discard()
+                if attempt:
+                    raise RuntimeError(f"LM endpoint {self.base_url} closed the connection: {e}") from e
+                continue
+            except OSError as e:
+                self._discard()
+                raise RuntimeError(f"LM endpoint {self.base_url} unreachable: {e}") from e
+
+            if response.will_close:
+                self._discard()
+            if response.status != 200:
+                raise RuntimeError(
+                    f"LM endpoint returned HTTP {response.status}: {payload[:200].decode('utf-8', 'replace')}"
+                )
+            try:
+                data = json.loads(payload)
+                content = data["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise RuntimeError(f"Unexpected LM response: {payload[:200].decode('utf-8', 'replace')}") from e
+            return content or "", data.get("usage") or {}
+
+    def close(self):
+        self._discard()
+
+
+class Summarizer:
+    """
+    Cached, chunked file summaries.
+
+    Args:
+        db_path: SQLite database holding the summary_cache table
+        client: LMClient used for cache misses
+        chunk_chars: Largest input sent in one request; bigger inputs are map-reduced
+        metrics: Optional Metrics for instrumented connections
+        on_usage: Called as on_usage(prompt_chars, response_chars, model, task)
+                  after every completed LLM request
+    """
+
+    def __init__(self, db_path: str, client: Optional[LMClient] = None,
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS, metrics: Optional[Metrics] = None,
+                 on_usage: Optional[Callable[[int, int, str, str], None]] = None):
+        self.db_path = db_path
+        self.client = client or LMClient.from_env()
+        self.chunk_chars = chunk_chars
+        self.metrics = metrics or Metrics()
+        self.on_usage = on_usage
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            ensure_schema(conn.cursor())
+
+    @classmethod
+    def from_env(cls, db_path: str, metrics: Optional[Metrics] = None, **kwargs) -> "Summarizer":
+        """Build from CHECKPOINT_LM_* environment variables"""
+        chunk_chars = os.getenv("CHECKPOINT_LM_CHUNK_CHARS")
+        return cls(
+            db_path,
+            LMClient.from_env(),
+            chunk_chars=int(chunk_chars) if chunk_chars else DEFAULT_CHUNK_CHARS,
+            metrics=metrics,
+            **kwargs,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return self.metrics.connect(self.db_path)
+
+    def lookup(self, digest: str, summary_type: str) -> Optional[str]:
+        try:
+            with self._connect() as conn:
+                key = (digest, summary_type, self.client.model)
+                row = conn.execute(
+                    "SELECT summary FROM summary_cache WHERE content_hash = ? AND summary_type = ? AND model = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("""
+                    UPDATE summary_cache SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                    WHERE content_hash = ? AND summary_type = ? AND model = ?
+                """, key)
+                return row[0]
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def store(self, digest: str, summary_type: str, summary: str, source_chars: int, chunks: int):
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO summary_cache
+                        (content_hash, summary_type, model, summary, source_chars, chunks)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (digest, summary_type, self.client.model, summary, source_chars, chunks))
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+    def _complete(self, prompt: str, text: str) -> str:
+        full_prompt = f"{prompt}\n\n{text}"
+        summary, _ = self.client.chat(full_prompt)
+        if self.on_usage:
+            self.on_usage(len(full_prompt), len(summary), self.client.model, "file-reading")
+        return summary
+
+    def summarize_unit(self, text: str, summary_type: str, refresh: bool = False,
+                       prompt: Optional[str] = None, cache_type: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Summary of text that fits one request: from the cache, else one completion.
+        Safe to call from several threads at once.
+
+        Args:
+            prompt: Instruction to use instead of the summary type's prompt
+            cache_type: Cache key to use instead of summary_type
+
+        Returns:
+            (summary, True when it came from the cache)
+        """
+        digest = content_hash(text)
+        cache_type = cache_type or summary_type
+        if not refresh:
+            cached = self.lookup(digest, cache_type)
+            if cached is not None:
+                return cached, True
+        summary = self._complete(prompt or type_prompt(summary_type), text)
+        self.store(digest, cache_type, summary, len(text), 1)
+        return summary, False
+
+    def combine_inputs(self, partials: List[str], labels: Optional[List[str]] = None) -> List[str]:
+        """
+        Labelled partial summaries packed into request-sized texts. One text
+        means the partials can be combined in a single request; otherwise each
+        text is condensed first (one more reduce level).
+        """
+        labels = labels or [f"Part {i}" for i in range(1, len(partials) + 1)]
+        labelled = [f"[{label}]\n{partial}" for label, partial in zip(labels, partials)]
+        texts = ["\n\n".join(group) for group in pack(labelled, self.chunk_chars, "\n\n")]
+        if len(texts) == len(partials) > 1:
+            # Every partial fills a request by itself; condensing them would not converge
+            return ["\n\n".join(labelled)]
+        return texts
+
+    def combine_unit(self, text: str, summary_type: str, refresh: bool = False,
+                     scope: str = "file") -> Tuple[str, bool]:
+        """Combine one text of labelled partial summaries (see COMBINE_PREFIXES) into summary_type"""
+        return self.summarize_unit(
+            text, summary_type, refresh,
+            prompt=f"{COMBINE_PREFIXES[scope]} {type_prompt(summary_type)}",
+            cache_type=f"{scope}:{summary_type}",
+        )
+
+    @staticmethod
+    def _tally(stats: Dict[str, int], result: Tuple[str, bool]) -> str:
+        summary, cached = result
+        stats["cache_hits" if cached else "llm_calls"] += 1
+        return summary
+
+    def _summarize_text(self, text: str, summary_type: str, refresh: bool,
+                        stats: Dict[str, int], path: Optional[str] = None) -> str:
+        """Summary of text (cache first); map-reduces inputs over chunk_chars"""
+        chunks = split_structural(text, self.chunk_chars, path)
+        stats["chunks"] = len(chunks)
+        if len(chunks) == 1:
+            return self._tally(stats, self.summarize_unit(text, summary_type, refresh))
+
+        digest = content_hash(text)
+        if not refresh:
+            cached = self.lookup(digest, summary_type)
+            if cached is not None:
+                stats["cache_hits"] += 1
+                return cached
+
+        # Map: chunk summaries are cached on their own and shared by all summary types
+        partials = [self._tally(stats, self.summarize_unit(chunk, CHUNK_TYPE, refresh)) for chunk in chunks]
+        # Reduce: condense groups of partials until they fit one request
+        while True:
+            texts = self.combine_inputs(partials)
+            if len(texts) == 1:
+                summary = self._tally(stats, self.combine_unit(texts[0], summary_type, refresh))
+                break
+            partials = [self._tally(stats, self.combine_unit(t, CHUNK_TYPE, refresh)) for t in texts]
+        self.store(digest, summary_type, summary, len(text), len(chunks))
+        return summary
+
+    def summarize(self, text: str, summary_type: str = "detailed", refresh: bool = False,
+                  path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarise text, reusing a cached summary of identical content.
+
+        Args:
+            text: Content to summarise
+            summary_type: brief, structure, detailed (anything else gets a plain summary)
+            refresh: Ignore cached summaries and regenerate them
+            path: File name the text came from (picks the chunk boundaries)
+
+        Returns:
+            Dict with summary, cached flag, chunk count, LLM calls made and size figures
+        """
+        stats = {"llm_calls": 0, "cache_hits": 0, "chunks": 1}
+        summary = self._summarize_text(text, summary_type, refresh, stats, path) if text.strip() else ""
+        original_chars = len(text)
+        return {
+            "status": "success",
+            "summary_type": summary_type,
+            "model": self.client.model,
+            "summary": summary,
+            "cached": stats["llm_calls"] == 0,
+            "chunks": stats["chunks"],
+            "llm_calls": stats["llm_calls"],
+            "cache_hits": stats["cache_hits"],
+            "original_chars": original_chars,
+            "summary_chars": len(summary),
+            "estimated_token_savings": original_chars // 4 - len(summary) // 4,
+        }
+
+    def summarize_file(self, path: str, summary_type: str = "detailed", refresh: bool = False) -> Dict[str, Any]:
+        """Summarise a file (see summarize)"""
+        path = os.path.expanduser(path)
+        if not os.path.isfile(path):
+            raise ValueError(f"File not found: {path}")
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8", errors="replace")
+        start = time.perf_counter()
+        result = self.summarize(text, summary_type, refresh, path)
+        result["file"] = path
+        result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def clear_cache(self, older_than_days: Optional[int] = None) -> int:
+        """Delete cached summaries (all, or those unused for older_than_days)"""
+        try:
+            with self._connect() as conn:
+                if older_than_days is None:
+                    cursor = conn.execute("DELETE FROM summary_cache")
+                else:
+                    cursor = conn.execute(
+                        "DELETE FROM summary_cache WHERE last_used_at < datetime('now', ?)",
+                        (f"-{int(older_than_days)} days",),
+                    )
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a file with the local LLM (cached)")
+    parser.add_argument("file", help="File to summarise")
+    parser.add_argument("summary_type", nargs="?", default="detailed",
+                        help="brief, structure or detailed (default: detailed)")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached summaries")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args()
+
+    db_path = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH)
+    try:
+        summarizer = Summarizer.from_env(db_path, on_usage=UsageLogger.from_env().recorder("file-reader"))
+        result = summarizer.summarize_file(args.file, args.summary_type, args.refresh)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    original, size = result["original_chars"], result["summary_chars"]
+    print(f"=== FILE: {args.file} ===")
+    print(f"=== ORIGINAL SIZE: {original} chars (~{original // 4} tokens) ===")
+    print(f"=== SUMMARY SIZE: {size} chars (~{size // 4} tokens) ===")
+    print(f"=== TOKEN SAVINGS: ~{result['estimated_token_savings']} tokens ===")
+    if result["cached"]:
+        print("=== CACHED ===")
+    print("")
+    print(result["summary"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Summary Pipeline
+Concurrent summaries of large files and whole directories on top of
+summarizer.Summarizer. Files are split on structural boundaries (see
+chunking.py); every chunk request of every file shares one asyncio
+semaphore, so up to `concurrency` requests are in flight against the local
+endpoint at once. Partial summaries are reduced hierarchically, each level
+condensing request-sized groups in parallel, and a directory gets one more
+reduction over its per-file summaries. All levels go through the summary
+cache, so re-running over a mostly unchanged tree only pays for what changed.
+
+Usage:
+    python3 summary_pipeline.py <file-or-directory> [--type detailed] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from chunking import split_structural
+from summarizer import CHUNK_TYPE, DEFAULT_DB_PATH, SUMMARY_TYPES, Summarizer, content_hash
+from usage_log import UsageLogger
+
+DEFAULT_CONCURRENCY = 4
+
+# Directory walking limits
+MAX_FILES = 200
+MAX_FILE_BYTES = 1024 * 1024
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", "dist", "build"}
+SKIP_PATTERNS = ("*.db", "*.db-*", "*.sqlite", "*.lock", "*.min.js", "*.map", "*.snap", "*.vectors")
+
+
+def _is_text(path: str) -> bool:
+    """Heuristic: no NUL byte in the first 8KB"""
+    try:
+        with open(path, "rb") as f:
+            return b"\0" not in f.read(8192)
+    except OSError:
+        return False
+
+
+def walk(root: str, max_files: int = MAX_FILES) -> Dict[str, List[str]]:
+    """
+    Text files under root (or root itself), in sorted order.
+
+    Returns:
+        {"files": [...], "skipped": [...]}; skipped lists oversized, binary and
+        over-limit files relative to root
+    """
+    root = os.path.expanduser(root)
+    if os.path.isfile(root):
+        return {"files": [root], "skipped": []}
+    if not os.path.isdir(root):
+        raise ValueError(f"Path not found: {root}")
+
+    files: List[str] = []
+    skipped: List[str] = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            if filename.startswith(".") or any(fnmatch.fnmatch(filename, p) for p in SKIP_PATTERNS):
+                continue
+            relative = os.path.relpath(path, root)
+            try:
+                too_big = os.path.getsize(path) > MAX_FILE_BYTES
+            except OSError:
+                continue
+            if too_big or not _is_text(path) or len(files) >= max_files:
+                skipped.append(relative)
+            else:
+                files.append(path)
+    return {"files": files, "skipped": skipped}
+
+
+class SummaryPipeline:
+    """
+    Bounded-concurrency map-reduce summaries.
+
+    Args:
+        summarizer: Provides the cache, the LM client and chunk size
+        concurrency: Maximum LM requests in flight at once
+    """
+
+    def __init__(self, summarizer: Summarizer, concurrency: int = DEFAULT_CONCURRENCY):
+        self.summarizer = summarizer
+        self.concurrency = max(1, concurrency)
+        # Long-lived workers, so their keep-alive connections outlive a single run
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="summary")
+
+    @classmethod
+    def from_env(cls, summarizer: Summarizer) -> "SummaryPipeline":
+        """Build from CHECKPOINT_LM_CONCURRENCY"""
+        concurrency = os.getenv("CHECKPOINT_LM_CONCURRENCY")
+        return cls(summarizer, int(concurrency) if concurrency else DEFAULT_CONCURRENCY)
+
+    async def _request(self, run: Dict[str, Any], fn, *args) -> str:
+        """Run one blocking summarizer unit on a worker thread once a slot is free"""
+        async with run["semaphore"]:
+            summary, cached = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        run["cache_hits" if cached else "llm_calls"] += 1
+        return summary
+
+    async def _reduce(self, run: Dict[str, Any], partials: List[str], summary_type: str, refresh: bool,
+                      labels: Optional[List[str]] = None, scope: str = "file") -> str:
+        """Combine partial summaries level by level, each level's groups in parallel"""
+        while True:
+            texts = self.summarizer.combine_inputs(partials, labels)
+            if len(texts) == 1:
+                return await self._request(run, self.summarizer.combine_unit, texts[0], summary_type, refresh, scope)
+            partials = await asyncio.gather(*(
+                self._request(run, self.summarizer.combine_unit, text, CHUNK_TYPE, refresh, scope) for text in texts
+            ))
+            labels = None
+
+    async def _summarize_file(self, run: Dict[str, Any], path: str, summary_type: str, refresh: bool) -> Dict[str, Any]:
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8", errors="replace")
+        chunks = split_structural(text, self.summarizer.chunk_chars, path) if text.strip() else []
+        entry = {"file": path, "chunks": len(chunks), "original_chars": len(text)}
+
+        if not chunks:
+            summary = ""
+        elif len(chunks) == 1:
+            summary = await self._request(run, self.summarizer.summarize_unit, text, summary_type, refresh)
+        else:
+            digest = content_hash(text)
+            cached = None if refresh else self.summarizer.lookup(digest, summary_type)
+            if cached is not None:
+                run["cache_hits"] += 1
+                summary = cached
+            else:
+                partials = await asyncio.gather(*(
+                    self._request(run, self.summarizer.summarize_unit, chunk, CHUNK_TYPE, refresh) for chunk in chunks
+                ))
+                summary = await self._reduce(run, list(partials), summary_type, refresh)
+                self.summarizer.store(digest, summary_type, summary, len(text), len(chunks))
+        entry["summary"] = summary
+        entry["summary_chars"] = len(summary)
+        return entry
+
+    async def run(self, path: str, summary_type: str = "detailed", refresh: bool = False,
+                  max_files: int = MAX_FILES) -> Dict[str, Any]:
+        """
+        Summarise a file, or every text file in a directory plus a rollup.
+
+        Args:
+            path: File or directory
+            summary_type: brief, structure, detailed
+            refresh: Ignore cached summaries and regenerate them
+            max_files: Directory files summarised at most (the rest are listed as skipped)
+
+        Returns:
+            Dict with the summary, per-file summaries for directories, request
+            counts and throughput
+        """
+        run = {"semaphore": asyncio.Semaphore(self.concurrency), "llm_calls": 0, "cache_hits": 0}
+        start = time.perf_counter()
+
+        found = walk(path, max_files)
+        entries = await asyncio.gather(*(
+            self._summarize_file(run, file_path, summary_type, refresh) for file_path in found["files"]
+        ))
+
+        is_directory = os.path.isdir(os.path.expanduser(path))
+        if is_directory:
+            root = os.path.expanduser(path)
+            for entry in entries:
+                entry["file"] = os.path.relpath(entry["file"], root)
+            described = [entry for entry in entries if entry["summary"]]
+            summary = await self._reduce(
+                run, [entry["summary"] for entry in described], summary_type, refresh,
+                labels=[entry["file"] for entry in described], scope="directory",
+            ) if described else ""
+        else:
+            summary = entries[0]["summary"]
+
+        elapsed = time.perf_counter() - start
+        original_chars = sum(entry["original_chars"] for entry in entries)
+        result = {
+            "status": "success",
+            "path": path,
+            "summary_type": summary_type,
+            "model": self.summarizer.client.model,
+            "summary": summary,
+            "cached": run["llm_calls"] == 0,
+            "chunks": sum(entry["chunks"] for entry in entries),
+            "llm_calls": run["llm_calls"],
+            "cache_hits": run["cache_hits"],
+            "concurrency": self.concurrency,
+            "original_chars": original_chars,
+            "summary_chars": len(summary),
+            "estimated_token_savings": original_chars // 4 - len(summary) // 4,
+            "duration_ms": round(elapsed * 1000, 1),
+            "requests_per_second": round(run["llm_calls"] / elapsed, 2) if elapsed else None,
+        }
+        if is_directory:
+            result["files"] = [
+                {key: entry[key] for key in ("file", "chunks", "summary")} for entry in entries
+            ]
+            result["skipped"] = found["skipped"]
+        return result
+
+    def summarize_path(self, path: str, summary_type: str = "detailed", refresh: bool = False,
+                       max_files: int = MAX_FILES) -> Dict[str, Any]:
+        """Blocking wrapper around run() for callers without an event loop"""
+        return asyncio.run(self.run(path, summary_type, refresh, max_files))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a file or directory with the local LLM")
+    parser.add_argument("path", help="File or directory to summarise")
+    parser.add_argument("--type", dest="summary_type", default="detailed", choices=SUMMARY_TYPES)
+    parser.add_argument("--concurrency", type=int, help=f"Requests in flight (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--max-files", type=int, default=MAX_FILES)
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached summaries")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args()
+
+    summarizer = Summarizer.from_env(
+        os.getenv("CHECKPOINT_DB_PATH", DEFAULT_DB_PATH), on_usage=UsageLogger.from_env().recorder("file-reader")
+    )
+    if args.concurrency:
+        pipeline = SummaryPipeline(summarizer, args.concurrency)
+    else:
+        pipeline = SummaryPipeline.from_env(summarizer)
+    try:
+        result = pipeline.summarize_path(args.path, args.summary_type, args.refresh, args.max_files)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"=== PATH: {args.path} ===")
+    print(f"=== ORIGINAL SIZE: {result['original_chars']} chars (~{result['original_chars'] // 4} tokens) ===")
+    print(f"=== SUMMARY SIZE: {result['summary_chars']} chars (~{result['summary_chars'] // 4} tokens) ===")
+    print(f"=== REQUESTS: {result['llm_calls']} ({result['cache_hits']} cached) in {result['duration_ms']} ms ===")
+    print("")
+    for entry in result.get("files", []):
+        print(f"--- {entry['file']} ---")
+        print(entry["summary"])
+        print("")
+    print(result["summary"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Shared fixtures for the checkpoint manager tests"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# server.py opens its module-level stores on import; keep them out of ~/.claude
+_ENV_DIR = tempfile.mkdtemp(prefix="checkpoint-manager-tests-")
+os.environ["CHECKPOINT_DB_PATH"] = os.path.join(_ENV_DIR, "checkpoints.db")
+os.environ["CHECKPOINT_USAGE_DB_PATH"] = os.path.join(_ENV_DIR, "usage.db")
+for variable in ("CHECKPOINT_SHARD_DIR", "CHECKPOINT_METRICS", "CHECKPOINT_SLOW_QUERY_MS", "CHECKPOINT_TRACE_FILE"):
+    os.environ.pop(variable, None)
+
+from metrics import Metrics  # noqa: E402
+from server import CheckpointManager  # noqa: E402
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A CheckpointManager on a fresh database, metrics disabled"""
+    return CheckpointManager(str(tmp_path / "checkpoints.db"), metrics=Metrics(enabled=False))
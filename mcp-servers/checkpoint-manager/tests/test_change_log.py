@@ -0,0 +1,59 @@
+"""Change log events behind watch_checkpoints"""
+
+import sqlite3
+
+
+def events(manager, since: int) -> list:
+    return [(change["name"], change["op"]) for change in manager.watch_checkpoints(since)["changes"]]
+
+
+def cursor(manager) -> int:
+    return manager.watch_checkpoints()["cursor"]
+
+
+def test_saves_updates_and_deletes_are_logged(manager):
+    start = cursor(manager)
+    manager.save_checkpoint("alpha", {"summary": "first"})
+    manager.save_checkpoint("beta", {"summary": "second"})
+    assert events(manager, start) == [("alpha", "created"), ("beta", "created")]
+
+    start = cursor(manager)
+    manager.update_checkpoint("alpha", {"summary": "changed"})
+    manager.delete_checkpoint("beta")
+    assert events(manager, start) == [("alpha", "updated"), ("beta", "deleted")]
+
+
+def test_same_second_edits_are_logged(manager):
+    manager.save_checkpoint("alpha", {"summary": "first", "todos": [{"title": "a", "status": "pending"}]})
+
+    # Within the second of the save, so updated_at keeps its value
+    start = cursor(manager)
+    manager.apply_operations("alpha", [{"op": "update_todo", "key": "a", "fields": {"status": "completed"}}])
+    assert events(manager, start) == [("alpha", "updated")]
+
+    start = cursor(manager)
+    manager.save_checkpoint("alpha", {"summary": "first", "todos": [{"title": "a"}, {"title": "b"}]})
+    assert events(manager, start) == [("alpha", "updated")]
+
+
+def test_bookkeeping_writes_are_not_logged(manager):
+    manager.save_checkpoint("alpha", {"summary": "first", "todos": [{"title": "a", "status": "pending"}]})
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.execute("UPDATE checkpoints SET updated_at = datetime('now', '-30 days')")
+    start = cursor(manager)
+
+    manager.set_pinned("alpha", True)
+    manager.set_pinned("alpha", False)
+    assert manager.archive_checkpoints(7)["archived"] == ["alpha"]
+    # Reading rehydrates the archived rows
+    assert manager.resume_checkpoint("alpha")["checkpoint_data"]["todos"][0]["title"] == "a"
+    assert events(manager, start) == []
+
+
+def test_watch_reports_latest_op_per_checkpoint(manager):
+    start = cursor(manager)
+    manager.save_checkpoint("alpha", {"summary": "first"})
+    manager.update_checkpoint("alpha", {"summary": "changed"})
+    result = manager.watch_checkpoints(start)
+    assert [(c["name"], c["op"]) for c in result["changes"]] == [("alpha", "updated")]
+    assert manager.watch_checkpoints(result["cursor"])["changes"] == []
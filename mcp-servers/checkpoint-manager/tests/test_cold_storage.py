@@ -0,0 +1,107 @@
+"""Cold-storage tiering round trips"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from metrics import Metrics
+from server import CheckpointManager
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA = {
+    "summary": "cache resume output",
+    "todos": [{"title": "add LRU", "status": "pending", "priority": "high"},
+              {"title": "benchmark", "status": "completed"}],
+    "file_modifications": [{"file_path": "server.py", "action": "modified", "description": "cache"}],
+    "key_decisions": [{"title": "use mmap", "rationale": "zero copy"}],
+    "artifacts": [{"name": "bench.json", "artifact_type": "report", "description": "numbers"}],
+}
+
+
+def age(manager, days: int = 30):
+    """Make every checkpoint look untouched for days"""
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.execute(f"UPDATE checkpoints SET updated_at = datetime('now', '-{days} days')")
+        conn.execute(f"UPDATE checkpoint_access SET accessed_at = datetime('now', '-{days} days')")
+
+
+def hot_rows(manager) -> int:
+    with sqlite3.connect(manager.db_path) as conn:
+        return sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                   for table in ("todos", "file_modifications", "key_decisions", "artifacts"))
+
+
+def test_archive_and_rehydrate_round_trip(manager):
+    manager.save_checkpoint("alpha", DATA)
+    age(manager)
+    # Read through another instance, so this one's access throttle stays clear
+    before = CheckpointManager(manager.db_path, metrics=Metrics(enabled=False)).resume_checkpoint("alpha")
+    age(manager)
+
+    result = manager.archive_checkpoints(7)
+    assert result["archived"] == ["alpha"] and result["rows"] == 5
+    assert hot_rows(manager) == 0
+    assert [cp["name"] for cp in manager.list_checkpoints()["checkpoints"]] == ["alpha"]
+
+    assert manager.resume_checkpoint("alpha")["checkpoint_data"] == before["checkpoint_data"]
+    assert hot_rows(manager) == 5
+    # Just read, so not archived again
+    assert manager.archive_checkpoints(7)["archived"] == []
+
+
+def test_snapshot_reads_count_as_access(manager):
+    manager.save_checkpoint("alpha", DATA)
+    manager.publish_snapshot("alpha")
+    age(manager)
+
+    assert "add LRU" in manager.resume_text("alpha")
+    assert manager.archive_checkpoints(7)["archived"] == []
+
+
+def test_cli_resume_rehydrates(manager):
+    manager.save_checkpoint("alpha", DATA)
+    age(manager)
+    manager.archive_checkpoints(7)
+
+    output = subprocess.run(
+        [sys.executable, os.path.join(SERVER_DIR, "resume_checkpoint.py"), "alpha", "--format", "json"],
+        env=dict(os.environ, CHECKPOINT_DB_PATH=manager.db_path),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    for value in ("add LRU", "server.py", "use mmap", "bench.json"):
+        assert value in output
+    assert hot_rows(manager) == 5
+
+
+def test_cli_diff_rehydrates(manager):
+    manager.save_checkpoint("alpha", DATA)
+    age(manager)
+    manager.archive_checkpoints(7)
+    manager.save_checkpoint("beta", dict(DATA, todos=DATA["todos"] + [{"title": "ship"}]))
+
+    output = subprocess.run(
+        [sys.executable, os.path.join(SERVER_DIR, "diff_checkpoints.py"), "alpha", "beta", "--json"],
+        env=dict(os.environ, CHECKPOINT_DB_PATH=manager.db_path),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    delta = json.loads(output)
+    assert delta["todos"]["added"] == ["ship"] and delta["todos"]["removed"] == []
+    assert not any(sum(delta[table]["counts"].values())
+                   for table in ("file_modifications", "key_decisions", "artifacts"))
+    assert hot_rows(manager) == 11
+
+
+def test_diff_refuses_archived_checkpoint_in_other_database(manager, tmp_path):
+    other = CheckpointManager(str(tmp_path / "other.db"), metrics=Metrics(enabled=False))
+    other.save_checkpoint("alpha", DATA)
+    age(other)
+    other.archive_checkpoints(7)
+    manager.save_checkpoint("alpha", DATA)
+
+    with pytest.raises(ValueError, match="cold storage"):
+        manager.diff_checkpoints("alpha", "alpha", b_db_path=other.db_path)
@@ -0,0 +1,25 @@
+"""File state capture when files change under it"""
+
+import subprocess
+
+import file_state
+
+
+def test_fallback_skips_files_that_vanished(tmp_path, monkeypatch):
+    present = tmp_path / "present.txt"
+    present.write_text("hello\n")
+    gone = tmp_path / "gone.txt"
+    expected = file_state.hash_files([str(present)])
+
+    def git_fails(*args, **kwargs):
+        raise subprocess.CalledProcessError(128, args[0])
+
+    monkeypatch.setattr(file_state.subprocess, "run", git_fails)
+    assert file_state.hash_files([str(present), str(gone)]) == expected
+
+    records = [{"file_path": str(present), "status": "modified", "size": 6, "mtime_ns": 0,
+                "blob_hash": expected[str(present)]}]
+    assert file_state.verify(None, records)["unchanged"] == 1
+    present.write_text("world\n")
+    result = file_state.verify(None, records)
+    assert result["drifted"] == [{"file_path": str(present), "reason": "content"}]
@@ -0,0 +1,32 @@
+"""apply_operations edits are all-or-nothing"""
+
+import pytest
+
+
+def test_failing_operation_rolls_back_earlier_ones(manager):
+    manager.save_checkpoint("alpha", {"summary": "before", "todos": [{"title": "keep", "status": "pending"}]})
+
+    with pytest.raises(ValueError, match=r"Operation 2 \(update_todo\)"):
+        manager.apply_operations("alpha", [
+            {"op": "add_todo", "item": {"title": "added"}},
+            {"op": "update_checkpoint", "updates": {"summary": "after"}},
+            {"op": "update_todo", "key": "missing", "fields": {"status": "completed"}},
+        ])
+
+    data = manager.resume_checkpoint("alpha")["checkpoint_data"]
+    assert data["summary"] == "before"
+    assert [(t["title"], t["status"]) for t in data["todos"]] == [("keep", "pending")]
+
+
+def test_operations_apply_together(manager):
+    manager.save_checkpoint("alpha", {"todos": [{"title": "keep"}, {"title": "drop"}]})
+
+    result = manager.apply_operations("alpha", [
+        {"op": "add_todo", "item": {"title": "added"}},
+        {"op": "update_todo", "key": "keep", "fields": {"status": "completed"}},
+        {"op": "remove_todo", "key": "drop"},
+    ])
+
+    assert len(result["results"]) == 3
+    todos = manager.resume_checkpoint("alpha")["checkpoint_data"]["todos"]
+    assert sorted((t["title"], t["status"]) for t in todos) == [("added", "pending"), ("keep", "completed")]
@@ -0,0 +1,43 @@
+"""Statement instrumentation in metrics.py"""
+
+from metrics import Metrics
+
+
+def statement(metrics: Metrics, sql: str) -> dict:
+    return next(s for s in metrics.snapshot()["statements"] if s["sql"] == sql)
+
+
+def test_connection_execute_is_instrumented():
+    metrics = Metrics(enabled=True)
+    conn = metrics.connect(":memory:")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(5)])
+    assert conn.execute("SELECT x FROM t").fetchall() == [(i,) for i in range(5)]
+    assert list(conn.execute("SELECT x FROM t WHERE x > 2")) == [(3,), (4,)]
+    conn.executescript("CREATE TABLE u (y INTEGER);")
+
+    assert statement(metrics, "CREATE TABLE t (x INTEGER)")["latency"]["count"] == 1
+    assert statement(metrics, "INSERT INTO t VALUES (?)")["rows_written"] == 5
+    assert statement(metrics, "SELECT x FROM t")["rows_read"] == 5
+    assert statement(metrics, "SELECT x FROM t WHERE x > 2")["rows_read"] == 2
+    assert statement(metrics, "CREATE TABLE u (y INTEGER);")["latency"]["count"] == 1
+
+
+def test_rows_are_attributed_to_the_running_tool():
+    metrics = Metrics(enabled=True)
+    conn = metrics.connect(":memory:")
+    token = metrics.start_tool("list_checkpoints")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1), (2)")
+    conn.execute("SELECT x FROM t").fetchall()
+    metrics.finish_tool(token, "list_checkpoints", 1.0, 0, 0, False)
+
+    tool = metrics.snapshot()["tools"]["list_checkpoints"]
+    assert tool["statements"] == 3
+    assert tool["rows_written"] == 2
+    assert tool["rows_read"] == 2
+
+
+def test_disabled_metrics_use_plain_connections():
+    conn = Metrics(enabled=False).connect(":memory:")
+    assert type(conn).__name__ == "Connection"
@@ -0,0 +1,32 @@
+"""Name resolution and suggestions in name_index.py"""
+
+import pytest
+
+
+def test_resolve_exact_and_unique_prefix(manager):
+    for name in ("alpha-cache", "alpha-auth", "beta-search"):
+        manager.save_checkpoint(name, {"summary": name})
+    assert manager.resolve_name("alpha-cache") == "alpha-cache"
+    assert manager.resolve_name("beta") == "beta-search"
+
+
+def test_ambiguous_prefix_lists_matches(manager):
+    for name in ("alpha-cache", "alpha-auth", "beta-search"):
+        manager.save_checkpoint(name, {"summary": name})
+    with pytest.raises(ValueError, match="ambiguous prefix, matches: alpha-auth, alpha-cache$"):
+        manager.resolve_name("alp")
+
+
+def test_exact_name_wins_over_longer_names(manager):
+    manager.save_checkpoint("alpha", {"summary": "short"})
+    manager.save_checkpoint("alpha-2", {"summary": "longer"})
+    assert manager.resolve_name("alpha") == "alpha"
+
+
+def test_miss_suggests_closest_names(manager):
+    for name in ("refactor-cache-layer", "fix-auth-tokens", "docs-readme"):
+        manager.save_checkpoint(name, {"summary": name})
+    with pytest.raises(ValueError, match="not found. Closest names: refactor-cache-layer"):
+        manager.resolve_name("refactor-cahce-layer")
+    with pytest.raises(ValueError, match="Closest names: fix-auth-tokens"):
+        manager.resume_checkpoint("fix-auth-token")
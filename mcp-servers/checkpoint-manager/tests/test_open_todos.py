@@ -0,0 +1,48 @@
+"""open_todos across checkpoints of one project"""
+
+import sqlite3
+
+
+def save(manager, name, todos, working_directory="/work/project"):
+    manager.save_checkpoint(name, {"working_directory": working_directory, "todos": todos})
+
+
+def space_saves(manager):
+    """One save per minute, in save order, so "most recent" is unambiguous"""
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.execute("""
+            UPDATE checkpoints
+            SET updated_at = datetime('now', (id - (SELECT MAX(id) FROM checkpoints)) || ' minutes')
+        """)
+
+
+def test_same_todo_listed_once_from_newest_checkpoint(manager):
+    save(manager, "first", [{"title": "write tests", "status": "pending"}])
+    save(manager, "second", [{"title": "write tests", "status": "in_progress"}])
+    save(manager, "other", [{"title": "write tests"}], working_directory="/work/other")
+    space_saves(manager)
+
+    todos = manager.open_todos(working_directory="/work/project")["todos"]
+    assert [(t["title"], t["checkpoint"], t["status"], t["occurrences"]) for t in todos] == [
+        ("write tests", "second", "in_progress", 2)
+    ]
+    assert manager.open_todos()["total"] == 2
+
+
+def test_todo_completed_in_newer_checkpoint_is_dropped(manager):
+    save(manager, "first", [{"title": "done later"}, {"title": "still open"}])
+    save(manager, "second", [{"title": "done later", "status": "completed"}])
+    space_saves(manager)
+
+    assert [t["title"] for t in manager.open_todos()["todos"]] == ["still open"]
+
+
+def test_pages(manager):
+    save(manager, "first", [{"title": f"todo {i}"} for i in range(5)])
+
+    page = manager.open_todos(limit=2)
+    assert (page["count"], page["total"], page["next_offset"]) == (2, 5, 2)
+    last = manager.open_todos(limit=2, offset=4)
+    assert (last["count"], last["next_offset"]) == (1, None)
+    titles = [t["title"] for offset in (0, 2, 4) for t in manager.open_todos(limit=2, offset=offset)["todos"]]
+    assert sorted(titles) == [f"todo {i}" for i in range(5)]
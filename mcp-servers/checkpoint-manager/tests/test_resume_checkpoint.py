@@ -0,0 +1,36 @@
+"""resume_checkpoint.py output for checkpoints saved by the server"""
+
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA = {
+    "summary": "cache resume output",
+    "todos": [{"title": "add LRU", "description": "bounded by bytes", "status": "in_progress"},
+              {"title": "benchmark", "status": "completed"}],
+    "file_modifications": [{"file_path": "server.py", "status": "modified", "description": "cache"}],
+    "key_decisions": [{"title": "use mmap", "rationale": "zero copy", "impact": "flat memory"}],
+    "artifacts": [{"name": "bench.json", "artifact_type": "report", "path": "out/bench.json",
+                   "description": "numbers"}],
+}
+
+
+def run(manager, *args) -> str:
+    return subprocess.run(
+        [sys.executable, os.path.join(SERVER_DIR, "resume_checkpoint.py"), *args],
+        env=dict(os.environ, CHECKPOINT_DB_PATH=manager.db_path),
+        capture_output=True, text=True, check=True,
+    ).stdout
+
+
+def test_text_output_shows_every_section(manager):
+    manager.save_checkpoint("alpha-cache", DATA)
+
+    output = run(manager, "alpha-cache")
+    for line in ("CHECKPOINT: alpha-cache", "[→] add LRU", "bounded by bytes", "[✓] benchmark",
+                 "- server.py (modified): cache", "1. use mmap", "zero copy", "Impact: flat memory",
+                 "1. bench.json (type: report)", "Path: out/bench.json", "numbers"):
+        assert line in output
+    assert run(manager, "alpha", "--resolve") == output
@@ -0,0 +1,43 @@
+"""Vector file handling in semantic_index.py"""
+
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from semantic_index import SemanticIndex  # noqa: E402
+
+
+def test_rebuild_replaces_the_file_and_other_instances_remap(manager):
+    manager.save_checkpoint("cache", {"summary": "add an LRU cache for resume"})
+    manager.save_checkpoint("auth", {"summary": "rotate oauth tokens"})
+    manager.semantic_search_checkpoints("cache")
+
+    # A second process's view of the same index, with the old file mapped
+    other = SemanticIndex(manager.db_path)
+    with manager._connect() as conn:
+        assert other.search(conn, "oauth tokens")[0]["name"] == "auth"
+    old_inode = os.stat(manager.semantic.vectors_path).st_ino
+
+    manager.save_checkpoint("tokens", {"summary": "refresh oauth tokens before expiry"})
+    manager.semantic_search_checkpoints("oauth", rebuild=True)
+    assert os.stat(manager.semantic.vectors_path).st_ino != old_inode
+    assert not [name for name in os.listdir(os.path.dirname(manager.db_path)) if name.endswith(".tmp")]
+
+    with manager._connect() as conn:
+        names = [match["name"] for match in other.search(conn, "refresh oauth tokens expiry")]
+    assert names[0] == "tokens"
+
+
+def test_incremental_updates_reuse_rows(manager):
+    manager.save_checkpoint("cache", {"summary": "add an LRU cache for resume"})
+    manager.semantic_search_checkpoints("cache")
+    manager.save_checkpoint("cache", {"summary": "replace the LRU cache with a snapshot"})
+    manager.save_checkpoint("auth", {"summary": "rotate oauth tokens"})
+
+    with manager._connect() as conn:
+        rows = conn.execute("SELECT row, checkpoint_id FROM semantic_vectors ORDER BY row").fetchall()
+    assert len(rows) == len({row for row, _ in rows}) == 2
+    result = manager.semantic_search_checkpoints("snapshot")
+    assert result["checkpoints"][0]["name"] == "cache"
@@ -0,0 +1,40 @@
+"""Slow query capture in slow_query_log.py"""
+
+import json
+
+from metrics import Metrics
+from slow_query_log import SlowQueryLog
+
+SLOW_SQL = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    SELECT COUNT(*) FROM n
+"""
+
+
+def entries(path) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_slow_connection_execute_is_logged(tmp_path):
+    path = tmp_path / "slow.log"
+    conn = Metrics(slow_query_log=SlowQueryLog(threshold_ms=1, path=str(path))).connect(":memory:")
+    conn.execute("SELECT 1").fetchone()
+    assert conn.execute(SLOW_SQL, (500000,)).fetchone() == (500000,)
+
+    logged = entries(path)
+    assert [entry["sql"] for entry in logged] == [SLOW_SQL.strip()]
+    assert logged[0]["elapsed_ms"] >= 1
+    assert logged[0]["params"] == ["int"]
+    assert logged[0]["plan"]
+
+
+def test_parameters_are_logged_by_shape_only(tmp_path):
+    path = tmp_path / "slow.log"
+    conn = Metrics(slow_query_log=SlowQueryLog(threshold_ms=0, path=str(path))).connect(":memory:")
+    conn.execute("CREATE TABLE t (name TEXT, body BLOB)")
+    conn.execute("INSERT INTO t VALUES (:name, :body)", {"name": "secret", "body": None})
+
+    entry = entries(path)[-1]
+    assert entry["params"] == {"name": "str(6)", "body": "null"}
+    assert "secret" not in json.dumps(entry)
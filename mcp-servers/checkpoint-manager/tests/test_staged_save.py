@@ -0,0 +1,52 @@
+"""Staged saves: nothing is visible until commit, abandoned sessions expire"""
+
+import sqlite3
+
+import pytest
+
+
+def staged_rows(manager) -> int:
+    with sqlite3.connect(manager.db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM staged_rows").fetchone()[0]
+
+
+def test_commit_replaces_checkpoint_at_once(manager):
+    manager.save_checkpoint("alpha", {"summary": "old", "todos": [{"title": "old todo"}]})
+
+    session_id = manager.begin_save("alpha", {"summary": "new"})["session_id"]
+    manager.append_save(session_id, "todos", [{"title": f"todo {i}"} for i in range(3)])
+    manager.append_save(session_id, "todos", [{"title": "todo 3"}])
+    manager.append_save(session_id, "key_decisions", [{"title": "stage rows", "rationale": "bounded memory"}])
+    # Still the old checkpoint until commit
+    data = manager.resume_checkpoint("alpha")["checkpoint_data"]
+    assert data["summary"] == "old" and [t["title"] for t in data["todos"]] == ["old todo"]
+
+    assert manager.commit_save(session_id)["rows"] == 5
+    data = manager.resume_checkpoint("alpha")["checkpoint_data"]
+    assert data["summary"] == "new"
+    assert [t["title"] for t in data["todos"]] == [f"todo {i}" for i in range(4)]
+    assert [d["title"] for d in data["key_decisions"]] == ["stage rows"]
+    assert staged_rows(manager) == 0
+    with pytest.raises(ValueError, match="not found"):
+        manager.commit_save(session_id)
+
+
+def test_failed_or_aborted_session_writes_nothing(manager):
+    session_id = manager.begin_save("alpha", {"summary": "draft"})["session_id"]
+    manager.append_save(session_id, "todos", [{"title": "first"}])
+    with pytest.raises(ValueError):
+        manager.append_save(session_id, "not_a_section", [{"title": "second"}])
+
+    assert manager.abort_save(session_id)["discarded_rows"] == 1
+    assert staged_rows(manager) == 0
+    assert manager.list_checkpoints()["checkpoints"] == []
+
+
+def test_idle_sessions_expire(manager):
+    session_id = manager.begin_save("alpha", {"todos": [{"title": "first"}]})["session_id"]
+
+    assert manager.expire_save_sessions(ttl=-1) == 1
+    assert staged_rows(manager) == 0
+    with pytest.raises(ValueError, match="not found"):
+        manager.append_save(session_id, "todos", [{"title": "second"}])
+    assert manager.list_checkpoints()["checkpoints"] == []
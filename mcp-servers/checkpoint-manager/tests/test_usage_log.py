@@ -0,0 +1,41 @@
+"""Daily rollup of usage_log.py"""
+
+import sqlite3
+
+from usage_log import INSERT_SQL, UsageLogger
+
+
+def test_rollup_counts_buffered_and_direct_inserts(tmp_path):
+    usage = UsageLogger(str(tmp_path / "usage.db"), session_id="s", batch_size=10)
+    usage.record("agent-a", 400, 400, "model-x", "summarize", timestamp=0)
+    usage.record("agent-a", 40, 40, "model-x", "summarize", timestamp=60)
+    usage.flush()
+
+    # As the shell script's sqlite3 fallback inserts
+    with sqlite3.connect(usage.db_path) as conn:
+        conn.execute("""
+            INSERT INTO lm_studio_usage (session_id, agent_name, prompt_length, response_length,
+                total_chars, estimated_tokens, model_used, task_type, timestamp)
+            VALUES ('s', 'agent-b', 8, 8, 16, 4, 'model-x', 'review', '1970-01-01 00:05:00')
+        """)
+
+    result = usage.totals(["agent"])
+    assert result["rows"] == [
+        {"agent_name": "agent-a", "calls": 2, "prompt_chars": 440, "response_chars": 440, "estimated_tokens": 220},
+        {"agent_name": "agent-b", "calls": 1, "prompt_chars": 8, "response_chars": 8, "estimated_tokens": 4},
+    ]
+    usage.close()
+
+
+def test_rollup_is_recomputed_for_databases_without_the_trigger(tmp_path):
+    path = str(tmp_path / "usage.db")
+    usage = UsageLogger(path, session_id="s")
+    usage.record("agent-a", 4, 4, "model-x", "summarize", timestamp=0)
+    usage.close()
+
+    # An older version: rollup maintained by flushes only, rows inserted behind its back
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TRIGGER lm_studio_usage_rollup")
+        conn.execute(INSERT_SQL, ("s", "agent-a", 4, 4, 8, 2, "model-x", "summarize", "1970-01-01 00:00:10"))
+
+    assert UsageLogger(path).totals([])["total"]["calls"] == 2
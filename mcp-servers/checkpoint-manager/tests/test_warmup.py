@@ -0,0 +1,27 @@
+"""Startup warm-up"""
+
+import sqlite3
+import time
+
+
+def test_warm_loads_project_checkpoints_on_one_connection(manager):
+    manager.save_checkpoint("elsewhere", {"working_directory": "/work/other"})
+    for name in ("old", "new"):
+        manager.save_checkpoint(name, {"working_directory": "/work/project", "todos": [{"title": name}]})
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.execute("UPDATE checkpoints SET updated_at = datetime('now', (id - 10) || ' minutes')")
+
+    leased = []
+    lease = manager.pool.lease
+
+    def counting_lease():
+        leased.append(1)
+        return lease()
+    manager.pool.lease = counting_lease
+
+    report = manager.warm("/work/project", None, 5, time.monotonic() + 10)
+    assert report["loaded"] == ["new", "old"]
+    # The pool fill, then one lease for the loads and PRAGMA optimize
+    assert len(leased) == manager.pool.size + 1
+    with sqlite3.connect(manager.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM checkpoint_access").fetchone()[0] == 0
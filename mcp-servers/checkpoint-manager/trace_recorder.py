@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tool Call Trace Recorder
+Opt-in recording of the tool calls the server handles, for replaying real
+traffic against it later (benchmarks/replay_trace.py). Each call becomes one
+JSON line with its start time, session, tool name, timing and response size,
+plus an anonymised template of its arguments: free text is reduced to its
+length, identifiers (checkpoint names, titles, paths) to salted pseudonyms
+that stay consistent within the trace, while enum-like fields, numbers and
+booleans are kept as they are so the replay takes the same code paths.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional
+
+# Identifier fields: replaced by pseudonyms so later calls still refer to them
+IDENTIFIER_KEYS = frozenset({
+    "name", "from_name", "to_name", "session_id", "key", "title", "file_path",
+    "working_directory", "path", "destination", "agent", "model",
+})
+
+# Categorical fields whose values carry no user content
+LITERAL_KEYS = frozenset({
+    "status", "priority", "section", "op", "summary_type", "format", "group_by",
+    "artifact_type", "since", "until", "sections",
+})
+
+# Identifiers the server hands back, recorded so a replay can map them
+RESULT_ID_KEYS = ("session_id",)
+
+STRING_PATTERN = re.compile(r"^<str:(\d+)>$")
+IDENTIFIER_PATTERN = re.compile(r"^<id:([0-9a-f]+)>$")
+
+
+class TraceRecorder:
+    """
+    Appends one anonymised JSON line per tool call to a size-rotated file.
+
+    Args:
+        path: Trace file; "{pid}" is replaced by the process id so several
+            stdio servers can record side by side
+        salt: Key for identifier pseudonyms; random per process unless given,
+            so traces cannot be matched against guessed names
+        max_bytes: Rotate once the file reaches this size
+        backup_count: Number of rotated files to keep
+    """
+
+    def __init__(
+        self,
+        path: str,
+        salt: Optional[str] = None,
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 3,
+    ):
+        self.path = os.path.expanduser(path.replace("{pid}", str(os.getpid())))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._salt = (salt or secrets.token_hex(16)).encode()
+        self._sessions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        # Dedicated logger so entries never reach the server's stderr log
+        self._logger = logging.getLogger(f"checkpoint-manager.trace.{self.path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    @classmethod
+    def from_env(cls) -> Optional["TraceRecorder"]:
+        """Build from CHECKPOINT_TRACE_* variables; None unless CHECKPOINT_TRACE_FILE is set"""
+        path = os.getenv("CHECKPOINT_TRACE_FILE")
+        if not path:
+            return None
+        return cls(
+            path,
+            salt=os.getenv("CHECKPOINT_TRACE_SALT"),
+            max_bytes=int(os.getenv("CHECKPOINT_TRACE_MAX_BYTES", 50 * 1024 * 1024)),
+        )
+
+    def pseudonym(self, value: str) -> str:
+        digest = hmac.new(self._salt, value.encode(), hashlib.sha256).hexdigest()[:12]
+        return f"<id:{digest}>"
+
+    def template(self, value: Any, key: Optional[str] = None) -> Any:
+        """Anonymise an argument value, keeping its structure and sizes"""
+        if isinstance(value, dict):
+            return {k: self.template(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.template(item, key) for item in value]
+        if isinstance(value, str):
+            if key in LITERAL_KEYS:
+                return value
+            if key in IDENTIFIER_KEYS:
+                return self.pseudonym(value)
+            return f"<str:{len(value)}>"
+        return value
+
+    def session_number(self, session: Any) -> int:
+        """Small stable number for a client session (0 when unknown)"""
+        if session is None:
+            return 0
+        with self._lock:
+            return self._sessions.setdefault(id(session), len(self._sessions) + 1)
+
+    def record(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        started: float,
+        elapsed_ms: float,
+        response: str,
+        error: bool,
+        session: Any = None,
+    ):
+        """
+        Write one call to the trace.
+
+        Args:
+            tool: Tool name
+            arguments: Arguments as received
+            started: Wall-clock start time (time.time())
+            elapsed_ms: Handling time
+            response: Response text, measured and scanned for returned ids
+            error: Whether the call failed
+            session: The client session object, to tell sessions apart
+        """
+        entry = {
+            "ts": round(started, 4),
+            "session": self.session_number(session),
+            "tool": tool,
+            "args": self.template(arguments),
+            "arg_bytes": len(json.dumps(arguments)),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "response_bytes": len(response),
+            "error": error,
+        }
+        if not error and any(key in response for key in RESULT_ID_KEYS):
+            try:
+                result = json.loads(response)
+            except ValueError:
+                result = None
+            if isinstance(result, dict):
+                ids = {key: self.pseudonym(result[key]) for key in RESULT_ID_KEYS if isinstance(result.get(key), str)}
+                if ids:
+                    entry["result_ids"] = ids
+        self._logger.info(json.dumps(entry))
+
+
+def load_trace(path: str):
+    """Yield the entries of a trace file, skipping unreadable lines"""
+    with open(os.path.expanduser(path)) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "tool" in entry and "ts" in entry:
+                yield entry
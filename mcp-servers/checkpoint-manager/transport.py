@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Server Transports
+How server.py talks to its clients. stdio (the default) serves the single
+client that launched the process. The shared transport serves MCP over
+HTTP with Server-Sent Events on a loopback port or a Unix socket, so one
+long-lived process, with one connection pool and one set of caches,
+multiplexes every session; stdio_shim.py bridges clients that only speak
+stdio to it.
+"""
+
+import logging
+import os
+import socket
+from typing import Optional
+
+import httpx
+import mcp.server.stdio
+from mcp.server import Server
+
+logger = logging.getLogger("checkpoint-manager")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+HEALTH_PATH = "/health"
+
+
+async def run_stdio(app: Server):
+    """Serve one client over stdin/stdout until it disconnects"""
+    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+        await app.run(read_stream, write_stream, app.create_initialization_options())
+
+
+def build_app(app: Server):
+    """Starlette app: GET /sse opens a session, POST /messages/ carries its requests"""
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Mount, Route
+
+    sse = SseServerTransport(MESSAGES_PATH)
+    state = {"clients": 0, "sessions": 0}
+
+    async def handle_sse(request):
+        state["clients"] += 1
+        state["sessions"] += 1
+        try:
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await app.run(read_stream, write_stream, app.create_initialization_options())
+        finally:
+            state["clients"] -= 1
+        return Response()
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "pid": os.getpid(), **state})
+
+    return Starlette(routes=[
+        Route(SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+        Route(HEALTH_PATH, endpoint=health, methods=["GET"]),
+        Mount(MESSAGES_PATH, app=sse.handle_post_message),
+    ])
+
+
+def _socket_in_use(path: str) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def run_shared(app: Server, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None):
+    """
+    Serve any number of clients over HTTP+SSE until interrupted.
+
+    Args:
+        app: The MCP server
+        host, port: Loopback address to listen on (ignored with socket_path)
+        socket_path: Listen on this Unix socket instead
+    """
+    import uvicorn
+
+    if socket_path:
+        socket_path = os.path.expanduser(socket_path)
+        if os.path.exists(socket_path):
+            if _socket_in_use(socket_path):
+                raise RuntimeError(f"Another server is listening on {socket_path}")
+            os.remove(socket_path)
+        logger.info(f"Serving shared transport on unix:{socket_path}")
+    else:
+        logger.info(f"Serving shared transport on http://{host}:{port}{SSE_PATH}")
+    uvicorn.run(build_app(app), host=host, port=port, uds=socket_path, log_level="warning")
+
+
+def server_url(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None) -> str:
+    """Base URL of a shared server (the host part is ignored over a Unix socket)"""
+    return "http://localhost" if socket_path else f"http://{host}:{port}"
+
+
+def http_client_factory(socket_path: Optional[str] = None):
+    """httpx client factory for mcp's sse_client, routed over socket_path when given"""
+    def factory(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+        kwargs = {"timeout": timeout or httpx.Timeout(30.0, read=300.0)}
+        if headers is not None:
+            kwargs["headers"] = headers
+        if auth is not None:
+            kwargs["auth"] = auth
+        if socket_path:
+            kwargs["transport"] = httpx.AsyncHTTPTransport(uds=os.path.expanduser(socket_path))
+        return httpx.AsyncClient(**kwargs)
+    return factory
+
+
+def health(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: Optional[str] = None,
+           timeout: float = 1.0) -> Optional[dict]:
+    """The shared server's /health report, or None when nothing answers"""
+    transport = httpx.HTTPTransport(uds=os.path.expanduser(socket_path)) if socket_path else None
+    try:
+        with httpx.Client(transport=transport, timeout=timeout) as client:
+            response = client.get(server_url(host, port, socket_path) + HEALTH_PATH)
+            return response.json() if response.status_code == 200 else None
+    except (httpx.HTTPError, ValueError):
+        return None
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+LM Usage Log
+Records local-LLM calls in the lm_studio_usage table (the same table
+scripts/log-lmstudio-usage.sh writes). Events are buffered in memory and
+written in batched transactions with parameterised statements. A trigger on
+lm_studio_usage folds every inserted row into lm_studio_usage_daily, a per
+day/agent/model rollup, so token totals never scan the raw log and rows
+inserted by other writers (the shell script's sqlite3 fallback, older
+installed copies of it) are counted too.
+
+Usage:
+    python3 usage_log.py log <agent_name> <prompt_length> <response_length> <model_used> <task_type>
+    python3 usage_log.py log --batch < events.jsonl
+    python3 usage_log.py report [--by agent,model,day] [--since 2026-01-01] [--format table|json]
+
+Environment:
+    CHECKPOINT_USAGE_DB_PATH        Database file (default ~/.claude/conversations.db)
+    CHECKPOINT_USAGE_BATCH          Events buffered before a flush (default 100)
+    CHECKPOINT_USAGE_FLUSH_SECONDS  Background flush interval once started (default 5)
+    CLAUDE_SESSION_ID               Session recorded with each event
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("checkpoint-manager")
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.claude/conversations.db")
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_SECONDS = 5.0
+
+# Report dimensions -> rollup column
+GROUP_COLUMNS = {"day": "day", "agent": "agent_name", "model": "model_used"}
+
+INSERT_SQL = """
+    INSERT INTO lm_studio_usage (
+        session_id, agent_name, prompt_length, response_length,
+        total_chars, estimated_tokens, model_used, task_type, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+ROLLUP_TRIGGER_SQL = """
+    CREATE TRIGGER IF NOT EXISTS lm_studio_usage_rollup AFTER INSERT ON lm_studio_usage
+    WHEN NEW.timestamp IS NOT NULL
+    BEGIN
+        INSERT INTO lm_studio_usage_daily (
+            day, agent_name, model_used, calls, prompt_chars, response_chars, estimated_tokens
+        ) VALUES (
+            date(NEW.timestamp), coalesce(NEW.agent_name, ''), coalesce(NEW.model_used, ''), 1,
+            coalesce(NEW.prompt_length, 0), coalesce(NEW.response_length, 0), coalesce(NEW.estimated_tokens, 0)
+        )
+        ON CONFLICT (day, agent_name, model_used) DO UPDATE SET
+            calls = calls + 1,
+            prompt_chars = prompt_chars + excluded.prompt_chars,
+            response_chars = response_chars + excluded.response_chars,
+            estimated_tokens = estimated_tokens + excluded.estimated_tokens;
+    END
+"""
+
+
+def estimate_tokens(char_count: int) -> int:
+    """Rough token estimate: 4 characters per token"""
+    return char_count // 4
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    """
+    Create the usage log, its indexes, the daily rollup and the trigger that
+    maintains it. The rollup is recomputed from the log whenever the trigger
+    is created, covering rows logged before it existed.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lm_studio_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            agent_name TEXT,
+            prompt_length INTEGER,
+            response_length INTEGER,
+            total_chars INTEGER,
+            estimated_tokens INTEGER,
+            model_used TEXT,
+            task_type TEXT,
+            timestamp DATETIME
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lm_usage_timestamp ON lm_studio_usage(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lm_usage_session ON lm_studio_usage(session_id, timestamp)")
+
+    maintained = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'lm_studio_usage_rollup'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS lm_studio_usage_daily (
+            day TEXT NOT NULL,
+            agent_name TEXT NOT NULL,
+            model_used TEXT NOT NULL,
+            calls INTEGER NOT NULL,
+            prompt_chars INTEGER NOT NULL,
+            response_chars INTEGER NOT NULL,
+            estimated_tokens INTEGER NOT NULL,
+            PRIMARY KEY (day, agent_name, model_used)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lm_usage_daily_agent ON lm_studio_usage_daily(agent_name, day)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lm_usage_daily_model ON lm_studio_usage_daily(model_used, day)")
+    if not maintained:
+        # Rows logged before the trigger existed, also by versions that only rolled up their own flushes
+        conn.execute("DELETE FROM lm_studio_usage_daily")
+        conn.execute("""
+            INSERT INTO lm_studio_usage_daily
+            SELECT date(timestamp), coalesce(agent_name, ''), coalesce(model_used, ''), COUNT(*),
+                   coalesce(SUM(prompt_length), 0), coalesce(SUM(response_length), 0),
+                   coalesce(SUM(estimated_tokens), 0)
+            FROM lm_studio_usage
+            WHERE timestamp IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+        conn.execute(ROLLUP_TRIGGER_SQL)
+
+
+class UsageLogger:
+    """
+    Buffered writer for LM usage events.
+
+    record() only appends to an in-memory buffer; the buffer is written in one
+    transaction when it reaches batch_size, on flush(), every flush_interval
+    seconds once start() was called, and at interpreter exit.
+
+    Args:
+        db_path: Database holding lm_studio_usage
+        session_id: Session recorded with each event
+        batch_size: Events buffered before record() flushes
+        flush_interval: Seconds between background flushes (see start)
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, session_id: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_SECONDS):
+        self.db_path = db_path
+        self.session_id = session_id or os.getenv("CLAUDE_SESSION_ID", "unknown")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "UsageLogger":
+        """Build from CHECKPOINT_USAGE_* environment variables"""
+        batch_size = os.getenv("CHECKPOINT_USAGE_BATCH")
+        flush_seconds = os.getenv("CHECKPOINT_USAGE_FLUSH_SECONDS")
+        return cls(
+            os.getenv("CHECKPOINT_USAGE_DB_PATH", DEFAULT_DB_PATH),
+            batch_size=int(batch_size) if batch_size else DEFAULT_BATCH_SIZE,
+            flush_interval=float(flush_seconds) if flush_seconds else DEFAULT_FLUSH_SECONDS,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connection reused by every flush (callers hold _write_lock)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                ensure_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def record(self, agent_name: str, prompt_length: int, response_length: int,
+               model_used: str, task_type: str, timestamp: Optional[float] = None):
+        """Buffer one event (timestamped now unless given, as seconds since the epoch)"""
+        total_chars = prompt_length + response_length
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+        event = (self.session_id, agent_name, prompt_length, response_length, total_chars,
+                 estimate_tokens(total_chars), model_used, task_type, stamp)
+        with self._buffer_lock:
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def recorder(self, agent_name: str) -> Callable[[int, int, str, str], None]:
+        """Callback recording events as agent_name (fits Summarizer's on_usage)"""
+        def record(prompt_length: int, response_length: int, model_used: str, task_type: str):
+            self.record(agent_name, prompt_length, response_length, model_used, task_type)
+        return record
+
+    def flush(self) -> int:
+        """Write buffered events in one transaction; returns how many were written"""
+        with self._write_lock:
+            with self._buffer_lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return 0
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(INSERT_SQL, events)
+            except sqlite3.Error as e:
+                logger.error(f"Database error: {e}")
+                # Keep the events for the next flush
+                with self._buffer_lock:
+                    self._buffer[:0] = events
+                raise
+            return len(events)
+
+    def start(self):
+        """Flush on a daemon thread every flush_interval seconds"""
+        if self._thread is not None or self.flush_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="usage-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # Already logged; retried next interval
+
+    def close(self):
+        """Stop the flush thread and write what is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        try:
+            self.flush()
+        finally:
+            with self._write_lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    def totals(self, group_by: Sequence[str] = ("day", "agent", "model"), since: Optional[str] = None,
+               until: Optional[str] = None, agent: Optional[str] = None,
+               model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Token and character totals from the daily rollup.
+
+        Args:
+            group_by: Any of day, agent, model (empty for a grand total)
+            since: First day included (YYYY-MM-DD)
+            until: Last day included (YYYY-MM-DD)
+            agent: Only this agent
+            model: Only this model
+
+        Returns:
+            Dict with rows (one per group, newest day first) and the grand total
+        """
+        unknown = [key for key in group_by if key not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown group_by {unknown} (choose from {', '.join(GROUP_COLUMNS)})")
+        self.flush()
+
+        where, params = [], []
+        for clause, value in (("day >= ?", since), ("day <= ?", until),
+                              ("agent_name = ?", agent), ("model_used = ?", model)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        columns = [GROUP_COLUMNS[key] for key in group_by]
+        select = ", ".join(columns + [
+            "SUM(calls) AS calls", "SUM(prompt_chars) AS prompt_chars",
+            "SUM(response_chars) AS response_chars", "SUM(estimated_tokens) AS estimated_tokens",
+        ])
+        sql = f"SELECT {select} FROM lm_studio_usage_daily"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if columns:
+            order = ", ".join(f"{column} DESC" if column == "day" else column for column in columns)
+            sql += f" GROUP BY {', '.join(columns)} ORDER BY {order}"
+
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                conn.row_factory = sqlite3.Row
+                try:
+                    rows = [dict(row) for row in conn.execute(sql, params)]
+                finally:
+                    conn.row_factory = None
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+
+        rows = [row for row in rows if row["calls"]]
+        total = {
+            key: sum(row[key] for row in rows)
+            for key in ("calls", "prompt_chars", "response_chars", "estimated_tokens")
+        }
+        return {"status": "success", "group_by": list(group_by), "rows": rows, "total": total}
+
+
+def _format_table(result: Dict[str, Any]) -> str:
+    columns = [GROUP_COLUMNS[key] for key in result["group_by"]] + ["calls", "estimated_tokens"]
+    lines = ["\t".join(columns)]
+    lines += ["\t".join(str(row[column]) for column in columns) for row in result["rows"]]
+    total = result["total"]
+    lines.append(f"Total: {total['calls']} calls, ~{total['estimated_tokens']} tokens")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log and report local LLM usage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    log_parser = commands.add_parser("log", help="Record usage events")
+    log_parser.add_argument("fields", nargs="*",
+                            help="agent_name prompt_length response_length model_used task_type")
+    log_parser.add_argument("--batch", action="store_true",
+                            help="Read JSON lines with those keys from stdin and write them in batches")
+
+    report_parser = commands.add_parser("report", help="Token totals by day, agent and model")
+    report_parser.add_argument("--by", default="day,agent,model", help="Comma-separated: day, agent, model")
+    report_parser.add_argument("--since", help="First day (YYYY-MM-DD)")
+    report_parser.add_argument("--until", help="Last day (YYYY-MM-DD)")
+    report_parser.add_argument("--agent")
+    report_parser.add_argument("--model")
+    report_parser.add_argument("--format", choices=["table", "json"], default="table")
+    args = parser.parse_args()
+
+    usage = UsageLogger.from_env()
+    if args.command == "log":
+        if args.batch:
+            for line in sys.stdin:
+                if line.strip():
+                    event = json.loads(line)
+                    usage.record(event["agent_name"], int(event["prompt_length"]), int(event["response_length"]),
+                                 event["model_used"], event["task_type"])
+        elif len(args.fields) == 5:
+            agent_name, prompt_length, response_length, model_used, task_type = args.fields
+            usage.record(agent_name, int(prompt_length), int(response_length), model_used, task_type)
+        else:
+            print("Usage: usage_log.py log <agent_name> <prompt_length> <response_length> <model_used> <task_type>")
+            sys.exit(1)
+        usage.close()
+        return
+
+    group_by = [key.strip() for key in args.by.split(",") if key.strip()]
+    try:
+        result = usage.totals(group_by, args.since, args.until, args.agent, args.model)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(json.dumps(result, indent=2) if args.format == "json" else _format_table(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Startup Warm-up
+The first resume after the server starts pays for everything that is still
+cold: opening pooled connections and parsing the schema, reading the
+checkpoint's pages from disk and the first pass through the YAML renderer.
+Right after start a background thread pays those costs instead, while the
+server is already answering: it fills the connection pool, runs PRAGMA
+optimize and loads the most recently updated checkpoints of the directory
+the server was started in (its current branch first), within a time budget.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import file_state
+
+logger = logging.getLogger("checkpoint-manager")
+
+
+class Warmup:
+    """
+    Runs one warm-up pass on a daemon thread at startup.
+
+    Args:
+        manager: CheckpointManager (or ShardedCheckpointManager) to warm
+        working_directory: Project whose checkpoints are loaded (default: the
+            server's current directory)
+        checkpoints: Most recently updated checkpoints to load (0 disables)
+        budget_ms: Time after which no further checkpoint is loaded
+        metrics: Metrics receiving the report, next to first-call latencies
+    """
+
+    def __init__(
+        self,
+        manager,
+        working_directory: Optional[str] = None,
+        checkpoints: int = 5,
+        budget_ms: float = 2000.0,
+        metrics=None,
+    ):
+        self.manager = manager
+        self.working_directory = working_directory or os.getcwd()
+        self.checkpoints = checkpoints
+        self.budget_ms = budget_ms
+        self.metrics = metrics
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, manager, metrics=None) -> "Warmup":
+        """Build from CHECKPOINT_WARMUP_* environment variables"""
+        return cls(
+            manager,
+            working_directory=os.getenv("CHECKPOINT_WARMUP_DIRECTORY"),
+            checkpoints=int(os.getenv("CHECKPOINT_WARMUP_CHECKPOINTS", "5")),
+            budget_ms=float(os.getenv("CHECKPOINT_WARMUP_BUDGET_MS", "2000")),
+            metrics=metrics,
+        )
+
+    def start(self):
+        """Start the warm-up thread (no-op when disabled or already started)"""
+        if self.checkpoints <= 0 or self.budget_ms <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="checkpoint-warmup", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Warm the manager for working_directory within budget_ms.
+
+        Returns:
+            Report with the checkpoints loaded and the time taken
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.budget_ms / 1000
+        git_branch = file_state.git_summary(self.working_directory).get("git_branch")
+        report = self.manager.warm(self.working_directory, git_branch, self.checkpoints, deadline)
+        report = dict(
+            report,
+            working_directory=self.working_directory,
+            git_branch=git_branch,
+            budget_ms=self.budget_ms,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        self.last_report = report
+        if self.metrics is not None:
+            self.metrics.record_warmup(report)
+        return report
+
+    def _run(self):
+        try:
+            report = self.run_once()
+            logger.info(
+                f"Warm-up loaded {len(report['loaded'])} checkpoints in {report['elapsed_ms']:.0f}ms"
+                f"{' (budget exhausted)' if report['budget_exhausted'] else ''}"
+            )
+        except Exception as e:
+            # A cold cache only costs latency; never take the server down over it
+            logger.warning(f"Warm-up failed: {e}")
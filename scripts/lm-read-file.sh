@@ -9,6 +9,13 @@ if [[ ! -f "$FILE_PATH" ]]; then
     exit 1
 fi
 
+# Prefer the cached Python summarizer installed with the checkpoint manager:
+# unchanged files are answered from its cache and large files are chunked
+SUMMARIZER="$HOME/.claude/mcp-servers/checkpoint-manager/summarizer.py"
+if [[ -f "$SUMMARIZER" ]] && command -v python3 > /dev/null; then
+    exec python3 "$SUMMARIZER" "$FILE_PATH" "$SUMMARY_TYPE"
+fi
+
 # Read file content
 CONTENT=$(cat "$FILE_PATH")
 CHAR_COUNT=${#CONTENT}
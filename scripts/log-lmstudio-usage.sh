@@ -7,6 +7,15 @@ REPO_ROOT="$(dirname "$SCRIPT_DIR")"
 
 DB_PATH="${DB_PATH:-$REPO_ROOT/conversations.db}"
 
+# Prefer the Python logger (parameterised insert, indexed daily rollup) when
+# the checkpoint manager is installed or this is a repo checkout
+for USAGE_LOG in "$HOME/.claude/mcp-servers/checkpoint-manager/usage_log.py" \
+                 "$REPO_ROOT/mcp-servers/checkpoint-manager/usage_log.py"; do
+    if [[ $# -ge 5 && -f "$USAGE_LOG" ]] && command -v python3 > /dev/null; then
+        CHECKPOINT_USAGE_DB_PATH="$DB_PATH" exec python3 "$USAGE_LOG" log "$1" "$2" "$3" "$4" "$5"
+    fi
+done
+
 # Initiate DB if needed
 sqlite3 "$DB_PATH" "CREATE TABLE IF NOT EXISTS lm_studio_usage (
     id INTEGER PRIMARY KEY AUTOINCREMENT,